@@ -2,15 +2,9 @@
 # 빗썸 API와 연동하는 함수 모음
 
 import os
-import uuid
-import hashlib
 import time
 import json
-from urllib.parse import urlencode
-import requests
-from requests.exceptions import RequestException
-import jwt
-from dotenv import load_dotenv
+import threading
 import sys
 from pathlib import Path
 
@@ -26,11 +20,19 @@ if str(base_path) not in sys.path:
     sys.path.insert(0, str(base_path))
 
 from utils.telegram import send_telegram_message
+from utils.startup import lazy_import, getenv
+from api.order_cache import OrderDetailCache, order_data
+from api.jwt_signer import JwtSigner, query_hash
+from api.resilience import (get_breaker, get_latency, hedge_delay, hedged, HEDGE_READS, CLOSED,
+                            call_policy, timeout_for, backoff_delay, retry_budget)
+from shared import metrics
 
-# .env 파일 로드
-load_dotenv()
-accessKey = os.getenv("BITHUMB_API_KEY")
-secretKey = os.getenv("BITHUMB_API_SECRET")
+# requests는 첫 요청 때 import (워커 재시작·GUI 창 표시를 늦추지 않게)
+requests = lazy_import('requests')
+
+# API 키는 첫 서명 요청 때 .env에서 읽는다 (서명기도 그때 만든다)
+_credentials = None
+_signer = None
 
 # 서버 시간 보정값 (ms)
 _server_time_offset_ms = 0
@@ -39,12 +41,46 @@ _TIME_SYNC_INTERVAL = 300  # 5분 간격으로만 동기화
 
 def _alert(msg: str):
     try:
-        send_telegram_message(msg)
+        send_telegram_message(msg, critical=True)
     except Exception:
         # 텔레그램 전송 실패는 무시하고 넘어간다.
         pass
 apiUrl = 'https://api.bithumb.com'
 
+# 공개 시세 조회용 세션 (연결 재사용)
+_public_session = None
+_public_session_lock = threading.Lock()
+
+# 전체 원화 마켓 시세 캐시 (GUI 시세 패널 등 여러 화면이 같은 응답을 나눠 씀)
+TICKER_TTL = 2.0  # 초
+_ticker_cache = {"at": 0.0, "prices": {}}
+_ticker_lock = threading.Lock()
+
+# 개별 주문 조회 캐시 (끝난 주문은 메모리 LRU + logs/order_cache/, 미체결은 잠깐만)
+_order_cache = OrderDetailCache(os.path.join(base_path, 'logs', 'order_cache'))
+
+# 거래소에 살아 있거나 체결된 주문 상태 (cancel 제외)
+LIVE_ORDER_STATES = ('wait', 'watch', 'done')
+
+# "그런 주문 없음" 오류 이름. 이 밖의 오류(expired_jwt/인증/요청 제한/파라미터 등)는 주문이 있는지 모르는 것으로 본다
+ORDER_NOT_FOUND_ERRORS = ('order_not_found',)
+
+
+def is_order_not_found(res):
+    """거래소가 해당 주문이 없다고 확정한 응답인지"""
+    err = res.get('error') if isinstance(res, dict) else None
+    return isinstance(err, dict) and err.get('name') in ORDER_NOT_FOUND_ERRORS
+
+
+def _get_public_session():
+    global _public_session
+    with _public_session_lock:
+        if _public_session is None:
+            session = requests.Session()
+            session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            _public_session = session
+        return _public_session
+
 
 def _sync_server_time(force: bool = False):
     """공개 시세 API를 이용해 서버 시간과의 차이를 보정한다."""
@@ -79,16 +115,42 @@ def _is_expired_jwt(resp_json):
     return False
 
 
-def _signed_request(method, path, query=None, body=None, retries=3, delay=1, backoff=2, timeout=5, alert_label=None):
-    """JWT 서명 요청 + 만료 시 재시도 공통 헬퍼"""
-    cur_delay = delay
-    url = f"{apiUrl}{path}"
+def _retry_allowed(endpoint):
+    """프로세스 재시도 예산 확인 (소진되면 재시도하지 않고 실패 처리)"""
+    if retry_budget.try_spend():
+        metrics.inc('api_retries_total', endpoint)
+        return True
+    metrics.inc('api_retry_budget_exhausted_total', endpoint)
+    return False
 
-    for attempt in range(1, retries + 1):
-        headers = _make_token(body if body else query)
+
+def _signed_request(method, path, query=None, body=None, retries=None, delay=None, backoff=None, timeout=None,
+                    alert_label=None, hedge=False, call_class=None):
+    """
+    JWT 서명 요청 + 만료 시 재시도 공통 헬퍼
+    엔드포인트별 회로 차단기가 열려 있으면 보내지 않고 즉시 {"status": "9998"}을 돌려준다.
+    :param hedge: 여러 번 보내도 되는 조회 요청이면 True - p95 응답 시간 안에 응답이 없으면 한 번 더 보낸다
+    :param call_class: 'write'(주문/취소) / 'read'(조회) - 생략하면 메서드로 판단. 재시도 횟수·간격과
+                       타임아웃(지정하지 않으면 최근 응답 시간 기반)은 이 종류의 정책을 따른다
+    """
+    call_class = call_class or ('write' if method in ('POST', 'DELETE') else 'read')
+    policy = call_policy(call_class)
+    retries = retries or policy['retries']
+    cur_delay = policy['delay'] if delay is None else delay
+    backoff = policy['backoff'] if backoff is None else backoff
+    url = f"{apiUrl}{path}"
+    endpoint = f"{method} {path}"
+    breaker = get_breaker(endpoint)
+    latency = get_latency(endpoint)
+    req_timeout = timeout
+    qhash = query_hash(body if body else query)  # 재시도해도 쿼리는 같으므로 한 번만 계산
+
+    def send():
+        headers = _make_token(qhash=qhash)
         if body is not None:
             headers['Content-Type'] = 'application/json'
-
+        started = time.perf_counter()
+        used_timeout = req_timeout
         try:
             resp = requests.request(
                 method,
@@ -96,43 +158,83 @@ def _signed_request(method, path, query=None, body=None, retries=3, delay=1, bac
                 params=query,
                 data=json.dumps(body) if body is not None else None,
                 headers=headers,
-                timeout=timeout,
+                timeout=used_timeout,
             )
             data = resp.json()
+        except Exception:
+            # 실패/타임아웃도 최소 그 타임아웃만큼 걸린 것으로 기록 (거래소가 느려지면 p99와 타임아웃이 따라 늘어나게)
+            elapsed = time.perf_counter() - started
+            metrics.observe('api_latency_seconds', elapsed, endpoint)
+            latency.add(max(elapsed, used_timeout))
+            raise
+        elapsed = time.perf_counter() - started
+        metrics.observe('api_latency_seconds', elapsed, endpoint)
+        latency.add(elapsed)
+        return resp.status_code, data
 
-            if _is_expired_jwt(data) and attempt < retries:
-                # 서버 시간 보정 후 재시도
-                _sync_server_time(force=True)
-                time.sleep(cur_delay)
-                cur_delay *= backoff
-                continue
+    for attempt in range(1, retries + 1):
+        if not breaker.allow():
+            metrics.inc('api_circuit_rejected_total', endpoint)
+            return {"status": "9998", "message": f"API 회로 열림: {endpoint} ({breaker.retry_in():.0f}초 후 재시도)"}
 
-            return data
-        except RequestException as e:
-            if attempt == retries:
+        retry_budget.on_request()
+        req_timeout = timeout or timeout_for(endpoint, call_class)
+        try:
+            hedge_after = hedge_delay(endpoint) if hedge and HEDGE_READS else None
+            if hedge_after is not None and hedge_after < req_timeout:
+                status_code, data = hedged(send, hedge_after, lambda: metrics.inc('api_hedged_total', endpoint))
+            else:
+                status_code, data = send()
+        except requests.exceptions.RequestException as e:
+            if breaker.record_failure():
+                metrics.inc('api_circuit_open_total', endpoint)
+                _alert(f"🚧 API 회로 열림: {endpoint} - 연속 실패로 {breaker.open_for:.0f}초 동안 요청을 멈춥니다 ({e})")
+            if attempt == retries or breaker.state != CLOSED or not _retry_allowed(endpoint):
+                metrics.inc('api_errors_total', endpoint)
                 if alert_label:
                     _alert(f"🚨 {alert_label} 실패({attempt}/{retries}): {e}")
                 return {"status": "9999", "message": str(e)}
-            time.sleep(cur_delay)
+            time.sleep(backoff_delay(cur_delay))
             cur_delay *= backoff
+            continue
 
-# 공통: JWT 토큰 생성 함수
-def _make_token(query: dict = None):
-    payload = {
-        'access_key': accessKey,
-        'nonce': str(uuid.uuid4()),
-        'timestamp': _now_ms(),
-    }
+        # 5xx/429는 거래소 쪽 문제로 보고 회로 실패로 센다 (응답 본문은 그대로 돌려줌)
+        if status_code >= 500 or status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if _is_expired_jwt(data) and attempt < retries and _retry_allowed(endpoint):
+            # 서버 시간 보정 후 재시도
+            _sync_server_time(force=True)
+            time.sleep(backoff_delay(cur_delay))
+            cur_delay *= backoff
+            continue
 
-    if query:
-        query_string = urlencode(query).encode()
-        m = hashlib.sha512()
-        m.update(query_string)
-        query_hash = m.hexdigest()
-        payload['query_hash'] = query_hash
-        payload['query_hash_alg'] = 'SHA512'
+        return data
 
-    jwt_token = jwt.encode(payload, secretKey, algorithm='HS256')
+def _get_credentials():
+    global _credentials
+    if _credentials is None:
+        _credentials = (getenv("BITHUMB_API_KEY"), getenv("BITHUMB_API_SECRET"))
+    return _credentials
+
+
+def _get_signer():
+    global _signer
+    if _signer is None:
+        signer = JwtSigner(*_get_credentials())
+        signer.verify()
+        _signer = signer
+    return _signer
+
+
+# 공통: JWT 토큰 생성 함수
+def _make_token(query: dict = None, qhash=None):
+    """
+    Authorization 헤더. qhash(query_hash()로 미리 계산한 값)를 주면 query는 무시한다
+    """
+    jwt_token = _get_signer().sign(_now_ms(), qhash or query_hash(query))
     return {
         'Authorization': f'Bearer {jwt_token}'
     }
@@ -147,7 +249,12 @@ def get_order_chance(market='KRW-BTC'):
     return _signed_request("GET", "/v1/orders/chance", query=query, alert_label="주문 가능 조회")
 
 # 주문 실행 함수 (지정가 또는 시장가)
-def place_order(market, side, volume, price, ord_type='limit', retries=3, delay=1, backoff=2):
+def place_order(market, side, volume, price, ord_type='limit', retries=None, delay=None, backoff=None, identifier=None):
+    """
+    :param identifier: 클라이언트 주문 ID (계정 안에서 유일). 같은 값의 재전송은 거래소가 거절하므로
+                       응답을 못 받고 재시도해도 주문이 두 번 나가지 않는다.
+    응답을 끝내 못 받았거나 재전송이 거절되면 identifier로 먼저 나간 주문을 조회해 그 주문을 돌려준다.
+    """
     body = {
         "market": market,
         "side": side,
@@ -155,7 +262,9 @@ def place_order(market, side, volume, price, ord_type='limit', retries=3, delay=
         "price": str(price),
         "ord_type": ord_type
     }
-    return _signed_request(
+    if identifier:
+        body["identifier"] = identifier
+    result = _signed_request(
         "POST",
         "/v1/orders",
         body=body,
@@ -164,10 +273,21 @@ def place_order(market, side, volume, price, ord_type='limit', retries=3, delay=
         backoff=backoff,
         alert_label=f"주문 요청 {market} {side} {price}"
     )
+    if identifier and not order_data(result).get('uuid'):
+        existing = get_order_by_identifier(identifier, market)
+        if order_data(existing).get('state') in LIVE_ORDER_STATES:
+            print(f"🔁 주문 응답 누락/중복 거절 → 기존 주문 연결: {identifier}")
+            return existing
+        if not order_data(existing).get('uuid') and not is_order_not_found(existing):
+            # 거절(중복 ID일 수 있음)인데 먼저 나간 주문이 있는지 확인하지 못함 → 확정된 실패로 돌려주지 않는다
+            # (호출 측이 pending ID를 유지하고 나중에 다시 조회)
+            return {"status": "9999", "message": f"주문 결과 확인 실패: {identifier} / {result}"}
+    return result
 
 # 주문 취소 함수 (UUID 기반)
-def cancel_order(order_uuid, retries=3, delay=1, backoff=2):
+def cancel_order(order_uuid, retries=None, delay=None, backoff=None):
     param = {'uuid': order_uuid}
+    _order_cache.invalidate(order_uuid)
     return _signed_request(
         "DELETE",
         "/v1/order",
@@ -179,7 +299,17 @@ def cancel_order(order_uuid, retries=3, delay=1, backoff=2):
     )
 
 # 개별 주문 조회
-def get_order_detail(order_uuid, retries=3, delay=1, backoff=2):
+def get_order_detail(order_uuid, retries=None, delay=None, backoff=None, market=None, use_cache=True):
+    """
+    체결 완료/취소된 주문은 캐시(메모리 → 디스크)에서 네트워크 없이 돌려준다.
+    :param market: 지정하면 디스크 캐시(logs/order_cache/)까지 확인 (재시작 후에도 적중)
+    :param use_cache: False면 항상 거래소에 조회
+    """
+    if use_cache:
+        cached, source = _order_cache.get(order_uuid, market)
+        metrics.inc('order_cache_total', source or 'miss')
+        if cached is not None:
+            return cached
     query = {"uuid": order_uuid}
     result = _signed_request(
         "GET",
@@ -188,8 +318,18 @@ def get_order_detail(order_uuid, retries=3, delay=1, backoff=2):
         retries=retries,
         delay=delay,
         backoff=backoff,
-        alert_label=f"주문 조회 {order_uuid}"
+        alert_label=f"주문 조회 {order_uuid}",
+        hedge=True,
     )
+    _order_cache.put(order_uuid, result, market)
+    return result
+
+# 클라이언트 주문 ID로 개별 주문 조회 (없으면 오류 응답, 알림 없음)
+def get_order_by_identifier(identifier, market=None, retries=2):
+    result = _signed_request("GET", "/v1/order", query={"identifier": identifier}, retries=retries, hedge=True)
+    order_uuid = order_data(result).get('uuid')
+    if order_uuid:
+        _order_cache.put(order_uuid, result, market)
     return result
 
 # 주문 리스트 조회
@@ -205,7 +345,7 @@ def get_order_list(market='KRW-BTC', limit=100, page=1, order_by='desc', uuids=N
         for i, u in enumerate(uuids):
             query[f"uuids[{i}]"] = u
 
-    return _signed_request("GET", "/v1/orders", query=query, alert_label="주문 리스트 조회")
+    return _signed_request("GET", "/v1/orders", query=query, alert_label="주문 리스트 조회", hedge=True)
 
 # 전체 주문 취소
 def cancel_all_orders(market):
@@ -234,31 +374,83 @@ def cancel_all_orders(market):
                 time.sleep(0.2)
 
 # 현재가 조회
-def get_current_price(market='KRW-BTC', retries=3, delay=1, backoff=2):
+def get_current_price(market='KRW-BTC', retries=None, delay=None, backoff=None):
     query = {"currency": market.split('-')[1]}
-    cur_delay = delay
+    policy = call_policy('public')
+    retries = retries or policy['retries']
+    cur_delay = policy['delay'] if delay is None else delay
+    backoff = policy['backoff'] if backoff is None else backoff
+
+    endpoint = "GET /public/ticker"
+    latency = get_latency(endpoint)
 
     for attempt in range(1, retries + 1):
+        retry_budget.on_request()
+        req_timeout = timeout_for(endpoint, 'public')
+        started = time.perf_counter()
         try:
-            resp = requests.get(f"{apiUrl}/public/ticker/{market}", params=query, timeout=5)
+            resp = requests.get(f"{apiUrl}/public/ticker/{market}", params=query, timeout=req_timeout)
             data = resp.json()
+            elapsed = time.perf_counter() - started
+            metrics.observe('api_latency_seconds', elapsed, endpoint)
+            latency.add(elapsed)
             if data.get('status') == '0000':
                 return float(data['data']['closing_price'])
             else:
                 msg = data.get('message', 'unknown error')
                 print(f"❌ 현재가 조회 실패: {msg}")
-                if attempt == retries:
+                if attempt == retries or not _retry_allowed(endpoint):
+                    metrics.inc('api_errors_total', endpoint)
                     _alert(f"🚨 현재가 조회 실패({attempt}/{retries}) {market}: {msg}")
-                else:
-                    time.sleep(cur_delay)
-                    cur_delay *= backoff
-        except RequestException as e:
-            if attempt == retries:
+                    return None
+                time.sleep(backoff_delay(cur_delay))
+                cur_delay *= backoff
+        except requests.exceptions.RequestException as e:
+            elapsed = time.perf_counter() - started
+            metrics.observe('api_latency_seconds', elapsed, endpoint)
+            latency.add(max(elapsed, req_timeout))
+            if attempt == retries or not _retry_allowed(endpoint):
+                metrics.inc('api_errors_total', endpoint)
                 _alert(f"🚨 현재가 조회 실패({attempt}/{retries}) {market}: {e}")
                 return None
-            time.sleep(cur_delay)
+            time.sleep(backoff_delay(cur_delay))
             cur_delay *= backoff
     
+# 전체 원화 마켓 현재가 (한 번의 요청으로 모든 코인)
+def get_all_prices(ttl=TICKER_TTL):
+    """
+    {코인: 현재가} - /public/ticker/ALL_KRW 한 번으로 전체 원화 마켓을 받아 ttl초 동안 캐시한다.
+    동시에 여러 곳에서 불러도 요청은 한 번만 나가고, 실패하면 마지막으로 받은 값을 돌려준다.
+    """
+    with _ticker_lock:
+        if time.time() - _ticker_cache["at"] < ttl:
+            return _ticker_cache["prices"]
+
+        endpoint = "GET /public/ticker/ALL_KRW"
+        req_timeout = timeout_for(endpoint, 'public')
+        started = time.perf_counter()
+        try:
+            resp = _get_public_session().get(f"{apiUrl}/public/ticker/ALL_KRW", timeout=req_timeout)
+            data = resp.json()
+            elapsed = time.perf_counter() - started
+            metrics.observe('api_latency_seconds', elapsed, endpoint)
+            get_latency(endpoint).add(elapsed)
+            if data.get('status') != '0000':
+                raise ValueError(data.get('message', 'unknown error'))
+            prices = {}
+            for coin, info in data.get('data', {}).items():
+                if isinstance(info, dict) and info.get('closing_price'):
+                    prices[coin] = float(info['closing_price'])
+            _ticker_cache["prices"] = prices
+        except (requests.exceptions.RequestException, ValueError) as e:
+            if isinstance(e, requests.exceptions.RequestException):
+                get_latency(endpoint).add(max(time.perf_counter() - started, req_timeout))
+            metrics.inc('api_errors_total', endpoint)
+            print(f"❌ 전체 시세 조회 실패: {e}")
+        # 실패해도 ttl 동안은 다시 요청하지 않는다 (화면 갱신마다 재시도 폭주 방지)
+        _ticker_cache["at"] = time.time()
+        return _ticker_cache["prices"]
+
 # 주문 취소 함수
 # - 매수 체결 시: (n-1)차 매도 주문 취소 추가
 # - 매도 체결 시: (n+1)차 매수 주문 취소 + (n-1)차 매도 주문 재등록
@@ -0,0 +1,152 @@
+# bithumbSplit/api/order_cache.py
+# 개별 주문 조회(/v1/order) 결과 캐시
+# 체결 완료(done)·취소(cancel)된 주문은 다시 바뀌지 않으므로 한 번 받은 응답을 계속 쓴다.
+# - 메모리: LRU (최근 조회 순, 최대 ORDER_CACHE_SIZE건). 미체결 주문은 OPEN_ORDER_TTL초만 유지
+# - 디스크: 마켓별 추가 전용 파일 logs/order_cache/KRW_BTC.idx  (한 줄 = "uuid<TAB>응답 JSON")
+#   처음 조회할 때 uuid → 파일 위치 색인만 만들고(JSON 파싱 없음), 적중하면 그 줄만 읽는다.
+#   재시작 동기화에서 이미 끝난 주문은 네트워크 없이 확인된다.
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+TERMINAL_STATES = ('done', 'cancel')
+ORDER_CACHE_SIZE = 2048  # 메모리 LRU 최대 건수
+OPEN_ORDER_TTL = 2.0  # 미체결 주문 응답 재사용 시간 (초) - 같은 루프의 헬스체크/체결 확인이 나눠 씀
+INDEX_MAX_BYTES = 8 * 1024 * 1024  # 디스크 파일이 이보다 커지면 최근 INDEX_KEEP건만 남기고 정리
+INDEX_KEEP = 5000
+
+
+def order_data(detail):
+    """응답에서 주문 본문 (래핑된 {"data": {...}} 형식도 처리)"""
+    if not isinstance(detail, dict):
+        return {}
+    data = detail.get('data')
+    return data if isinstance(data, dict) else detail
+
+
+def is_terminal(detail, order_uuid):
+    """해당 uuid의 정상 응답이고 더 이상 바뀌지 않는 상태인지"""
+    data = order_data(detail)
+    return data.get('uuid') == order_uuid and data.get('state') in TERMINAL_STATES
+
+
+class OrderDetailCache:
+    def __init__(self, directory, capacity=ORDER_CACHE_SIZE, open_ttl=OPEN_ORDER_TTL):
+        self.directory = directory
+        self.capacity = capacity
+        self.open_ttl = open_ttl
+        self._memory = OrderedDict()  # uuid -> (만료 시각 또는 None(영구), 응답)
+        self._indexes = {}  # market -> {uuid: 파일 위치}
+        self._lock = threading.Lock()
+
+    def _path(self, market):
+        return os.path.join(self.directory, f"{market.replace('-', '_')}.idx")
+
+    def get(self, order_uuid, market=None):
+        """(응답, 출처) - 출처는 'memory' / 'disk', 없으면 (None, None)"""
+        with self._lock:
+            entry = self._memory.get(order_uuid)
+            if entry is not None:
+                expires, detail = entry
+                if expires is None or expires > time.monotonic():
+                    self._memory.move_to_end(order_uuid)
+                    return detail, 'memory'
+                del self._memory[order_uuid]
+            if market:
+                detail = self._read_disk(market, order_uuid)
+                if detail is not None:
+                    self._remember(order_uuid, None, detail)
+                    return detail, 'disk'
+        return None, None
+
+    def put(self, order_uuid, detail, market=None):
+        """정상 응답만 저장. 끝난 주문은 영구(+디스크), 미체결은 open_ttl초"""
+        data = order_data(detail)
+        if data.get('uuid') != order_uuid:
+            return  # 오류 응답은 저장하지 않음
+        with self._lock:
+            if data.get('state') in TERMINAL_STATES:
+                self._remember(order_uuid, None, detail)
+                market = data.get('market') or market
+                if market:
+                    self._write_disk(market, order_uuid, detail)
+            elif self.open_ttl > 0:
+                self._remember(order_uuid, time.monotonic() + self.open_ttl, detail)
+
+    def invalidate(self, order_uuid):
+        """주문을 취소하는 등 상태가 바뀔 때 미체결 응답을 버린다 (끝난 주문은 그대로)"""
+        with self._lock:
+            entry = self._memory.get(order_uuid)
+            if entry is not None and entry[0] is not None:
+                del self._memory[order_uuid]
+
+    def _remember(self, order_uuid, expires, detail):
+        self._memory[order_uuid] = (expires, detail)
+        self._memory.move_to_end(order_uuid)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def _index(self, market):
+        index = self._indexes.get(market)
+        if index is not None:
+            return index
+        index = self._indexes[market] = {}
+        path = self._path(market)
+        try:
+            if os.path.getsize(path) > INDEX_MAX_BYTES:
+                self._compact(market)
+            with open(path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    key, sep, _ = line.partition(b'\t')
+                    if sep and line.endswith(b'\n'):  # 쓰다 끊긴 마지막 줄은 무시
+                        index[key.decode('ascii', 'replace')] = offset
+                    offset += len(line)
+        except OSError:
+            pass
+        return index
+
+    def _read_disk(self, market, order_uuid):
+        offset = self._index(market).get(order_uuid)
+        if offset is None:
+            return None
+        try:
+            with open(self._path(market), 'rb') as f:
+                f.seek(offset)
+                _, _, payload = f.readline().partition(b'\t')
+            return json.loads(payload)
+        except (OSError, ValueError):
+            self._indexes[market].pop(order_uuid, None)
+            return None
+
+    def _write_disk(self, market, order_uuid, detail):
+        index = self._index(market)
+        if order_uuid in index:
+            return
+        line = order_uuid.encode('ascii', 'replace') + b'\t' + \
+            json.dumps(detail, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+        path = self._path(market)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+            index[order_uuid] = offset
+            if offset + len(line) > INDEX_MAX_BYTES:
+                self._compact(market)
+                self._indexes.pop(market, None)  # 위치가 바뀌었으므로 다음 조회 때 다시 색인
+        except OSError as e:
+            print(f"⚠️ 주문 캐시 기록 실패: {path} / {e}")
+
+    def _compact(self, market):
+        """최근 INDEX_KEEP건만 남긴다 (오래된 주문은 재시작 동기화에서 다시 볼 일이 거의 없음)"""
+        path = self._path(market)
+        with open(path, 'rb') as f:
+            lines = [line for line in f if line.endswith(b'\n')]
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.writelines(lines[-INDEX_KEEP:])
+        os.replace(tmp, path)
@@ -0,0 +1,405 @@
+# bithumbSplit/api/paper.py
+# 모의투자(페이퍼 트레이딩)용 프로세스 내 가상 거래소
+# 실제 run_auto_trade 코드를 그대로 돌리되, 주문/조회/잔고 API를 가상 호가장으로 바꿔 끼운다.
+#  - 가격 공급: 실시간 시세(LiveFeed) 또는 기록된 CSV/저장소 데이터(RecordedFeed)
+#  - 시계 주입: SimClock.sleep()이 가상 시간을 진행시키므로 몇 시간 분량을 몇 초에 재생할 수 있다.
+#  - 실계좌 상태 파일과 섞이지 않도록 상태 파일은 logs/paper/에 저장한다.
+
+import os
+import sys
+import json
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+# 프로젝트 루트를 sys.path에 추가
+if getattr(sys, 'frozen', False):
+    base_path = Path(sys.executable).parent
+else:
+    base_path = Path(__file__).parent.parent
+
+if str(base_path) not in sys.path:
+    sys.path.insert(0, str(base_path))
+
+from api.api import get_current_price as _live_get_current_price
+from strategy.grid import FEE_RATE
+
+PAPER_SUBDIR = os.path.join('logs', 'paper')
+
+# run_auto_trade / worker가 api.api에서 가져다 쓰는 함수 이름 (install 시 교체 대상)
+_API_FUNCTIONS = (
+    'place_order', 'cancel_order', 'get_order_detail', 'get_order_list',
+    'cancel_all_orders', 'cancel_order_by_uuid', 'get_balance', 'get_current_price', 'get_order_by_identifier',
+)
+
+
+class SimClock:
+    """
+    주입 가능한 시계. sleep()은 가상 시간을 진행시키고 가격 공급/체결을 한 번에 처리한다.
+    speed=0이면 실제로 쉬지 않고(최대 속도), speed=N이면 N배속, live=True면 실제 시간을 그대로 쓴다.
+    """
+
+    def __init__(self, start=None, speed=0.0, live=False):
+        self.live = live
+        self.speed = speed
+        self._now = time.time() if start is None else float(start)
+        self._listeners = []
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def time(self):
+        return time.time() if self.live else self._now
+
+    def monotonic(self):
+        return self.time()
+
+    def sleep(self, sec):
+        if self.live:
+            time.sleep(sec)
+        else:
+            if self.speed:
+                time.sleep(sec / self.speed)
+            self._now += sec
+        now = self.time()
+        for callback in self._listeners:
+            callback(now)
+
+
+class RecordedFeed:
+    """기록된 (timestamps, prices) 배열을 시계에 맞춰 흘려보낸다."""
+
+    def __init__(self, timestamps, prices):
+        self.timestamps = timestamps
+        self.prices = prices
+        self.pos = 0
+        self.last_price = prices[0] if len(prices) else None
+
+    @property
+    def start_time(self):
+        return self.timestamps[0] if len(self.timestamps) else time.time()
+
+    @property
+    def exhausted(self):
+        return self.pos >= len(self.prices)
+
+    def advance(self, now):
+        """now 이전 가격들의 (최저가, 최고가, 마지막가)를 돌려준다. 새 가격이 없으면 None."""
+        end = self.pos
+        n = len(self.prices)
+        while end < n and self.timestamps[end] <= now:
+            end += 1
+        if end == self.pos:
+            return None
+        window = self.prices[self.pos:end]
+        self.pos = end
+        self.last_price = window[-1]
+        return min(window), max(window), self.last_price
+
+
+class LiveFeed:
+    """실시간 공개 시세로 가격을 공급한다. (계좌 API는 호출하지 않음)"""
+
+    exhausted = False
+
+    def __init__(self, market):
+        self.market = market
+        self.last_price = None
+
+    def advance(self, now):
+        price = _live_get_current_price(self.market)
+        if price is None:
+            return None
+        self.last_price = price
+        return price, price, price
+
+
+class SimulatedExchange:
+    """
+    단일 마켓 가상 지정가 호가장.
+    응답 형식은 빗썸 v1 API(uuid, state, executed_volume, remaining_volume ...)를 따른다.
+    """
+
+    def __init__(self, market, feed, clock, krw_balance=10_000_000, coin_balance=0.0,
+                 fee_rate=FEE_RATE, state_file=None):
+        self.market = market
+        self.currency = market.split('-')[1]
+        self.feed = feed
+        self.clock = clock
+        self.fee_rate = fee_rate
+        self.state_file = state_file
+        self.krw = float(krw_balance)
+        self.coin = float(coin_balance)
+        self.orders = {}
+        self.open_uuids = set()
+        self.identifiers = {}  # 클라이언트 주문 ID -> uuid
+        self.fill_count = 0
+        self._dirty = False
+        self._load()
+        clock.add_listener(self.on_tick)
+
+    # ── 영속화 (모의 계좌도 재시작/resume 검증이 가능하도록 파일에 보관) ──
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            self.krw = saved.get('krw', self.krw)
+            self.coin = saved.get('coin', self.coin)
+            self.fill_count = saved.get('fill_count', 0)
+            self.orders = saved.get('orders', {})
+            self.open_uuids = {u for u, o in self.orders.items() if o['state'] == 'wait'}
+            self.identifiers = {o['identifier']: u for u, o in self.orders.items() if o.get('identifier')}
+            print(f"🧪 모의 거래소 상태 복원: 미체결 {len(self.open_uuids)}개 / KRW {self.krw:,.0f} / {self.currency} {self.coin:.8f}")
+        except Exception as e:
+            print(f"⚠️ 모의 거래소 상태 로드 실패: {e}")
+
+    def save(self):
+        if not self.state_file or not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            # 종료된 주문은 최근 500개만 보관
+            done = [u for u, o in self.orders.items() if o['state'] != 'wait']
+            for u in done[:-500]:
+                del self.orders[u]
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump({'krw': self.krw, 'coin': self.coin, 'fill_count': self.fill_count, 'orders': self.orders},
+                          f, ensure_ascii=False)
+            self._dirty = False
+        except Exception as e:
+            print(f"⚠️ 모의 거래소 상태 저장 실패: {e}")
+
+    # ── 체결 엔진 ──
+    def _iso_now(self):
+        return datetime.fromtimestamp(self.clock.time()).isoformat(timespec='seconds') + '+09:00'
+
+    def on_tick(self, now):
+        tick = self.feed.advance(now)
+        if tick:
+            low, high, _ = tick
+            self.match(low, high)
+        self.save()
+
+    def match(self, low, high):
+        """구간 최저/최고가 기준으로 지정가 주문을 체결한다. (체결가는 주문가)"""
+        for order_uuid in sorted(self.open_uuids, key=lambda u: self.orders[u]['created_ts']):
+            order = self.orders[order_uuid]
+            price = float(order['price'])
+            if order['side'] == 'bid' and low <= price:
+                self._fill(order)
+            elif order['side'] == 'ask' and high >= price:
+                self._fill(order)
+
+    def _fill(self, order):
+        volume = float(order['volume'])
+        price = float(order['price'])
+        if order['side'] == 'bid':
+            self.coin += volume
+        else:
+            self.krw += price * volume * (1 - self.fee_rate)
+        order['state'] = 'done'
+        order['executed_volume'] = order['volume']
+        order['remaining_volume'] = '0'
+        order['trades_count'] = 1
+        order['done_at'] = self._iso_now()
+        self.open_uuids.discard(order['uuid'])
+        self.fill_count += 1
+        self._dirty = True
+
+    def _locked(self):
+        krw_locked = 0.0
+        coin_locked = 0.0
+        for u in self.open_uuids:
+            o = self.orders[u]
+            if o['side'] == 'bid':
+                krw_locked += float(o['price']) * float(o['volume']) * (1 + self.fee_rate)
+            else:
+                coin_locked += float(o['volume'])
+        return krw_locked, coin_locked
+
+    # ── api.api 호환 함수 ──
+    def place_order(self, market, side, volume, price, ord_type='limit', identifier=None, **_):
+        if identifier and identifier in self.identifiers:
+            # 실거래소와 같이 같은 identifier 재사용은 거절 (계정 안에서 유일)
+            return {'error': {'name': 'duplicate_identifier', 'message': '이미 사용된 identifier입니다.'}}
+        volume = float(volume)
+        price = float(price)
+        # krw/coin은 주문에 묶인 금액을 뺀 주문 가능 잔고
+        if side == 'bid' and price * volume * (1 + self.fee_rate) > self.krw + 1e-6:
+            return {'error': {'name': 'insufficient_funds_bid', 'message': '주문가능한 금액(KRW)이 부족합니다.'}}
+        if side == 'ask' and volume > self.coin + 1e-9:
+            return {'error': {'name': 'insufficient_funds_ask', 'message': f'주문가능한 수량({self.currency})이 부족합니다.'}}
+
+        if side == 'bid':
+            self.krw -= price * volume * (1 + self.fee_rate)
+        else:
+            self.coin -= volume
+        order_uuid = f"paper-{uuid.uuid4()}"
+        order = {
+            'uuid': order_uuid,
+            'side': side,
+            'ord_type': ord_type,
+            'price': str(price),
+            'state': 'wait',
+            'market': market,
+            'created_at': self._iso_now(),
+            'created_ts': self.clock.time(),
+            'volume': str(volume),
+            'remaining_volume': str(volume),
+            'executed_volume': '0',
+            'trades_count': 0,
+        }
+        if identifier:
+            order['identifier'] = identifier
+            self.identifiers[identifier] = order_uuid
+        self.orders[order_uuid] = order
+        self.open_uuids.add(order_uuid)
+        self._dirty = True
+        # 주문가가 이미 시장가를 넘은 경우 즉시 체결 (실거래소와 동일하게 taker 체결)
+        last = self.feed.last_price
+        if last is not None:
+            self.match(last, last)
+        return {k: v for k, v in order.items() if k != 'created_ts'}
+
+    def _refund(self, order):
+        if order['side'] == 'bid':
+            self.krw += float(order['price']) * float(order['volume']) * (1 + self.fee_rate)
+        else:
+            self.coin += float(order['volume'])
+
+    def cancel_order(self, order_uuid, **_):
+        order = self.orders.get(order_uuid)
+        if not order or order['state'] != 'wait':
+            return {'error': {'name': 'order_not_found', 'message': '주문을 찾지 못했습니다.'}}
+        self._refund(order)
+        order['state'] = 'cancel'
+        self.open_uuids.discard(order_uuid)
+        self._dirty = True
+        return {'uuid': order_uuid, 'state': 'cancel'}
+
+    def cancel_order_by_uuid(self, order_uuid):
+        if not order_uuid:
+            return False
+        res = self.cancel_order(order_uuid)
+        if res.get('uuid'):
+            print(f"🚫 주문 취소 성공: {order_uuid}")
+            return True
+        print(f"⚠️ 주문 취소 실패: {order_uuid} / {res['error']['message']}")
+        return False
+
+    def get_order_detail(self, order_uuid, **_):
+        order = self.orders.get(order_uuid)
+        if not order:
+            return {'status': '5600', 'message': 'order not found'}
+        return {k: v for k, v in order.items() if k != 'created_ts'}
+
+    def get_order_by_identifier(self, identifier, market=None, **_):
+        order_uuid = self.identifiers.get(identifier)
+        if not order_uuid or order_uuid not in self.orders:
+            return {'error': {'name': 'order_not_found', 'message': '주문을 찾지 못했습니다.'}}
+        return self.get_order_detail(order_uuid)
+
+    def get_order_list(self, market=None, limit=100, page=1, order_by='desc', uuids=None, **_):
+        open_orders = sorted(
+            (self.orders[u] for u in self.open_uuids),
+            key=lambda o: o['created_ts'],
+            reverse=(order_by == 'desc'),
+        )
+        if uuids:
+            open_orders = [o for o in open_orders if o['uuid'] in uuids]
+        start = (int(page) - 1) * int(limit)
+        return [{k: v for k, v in o.items() if k != 'created_ts'} for o in open_orders[start:start + int(limit)]]
+
+    def cancel_all_orders(self, market=None):
+        print(f"📋 {self.market} 미체결 주문 조회 중...")
+        targets = list(self.open_uuids)
+        if not targets:
+            print("✅ 취소할 주문 없음")
+            return
+        for order_uuid in targets:
+            res = self.cancel_order(order_uuid)
+            print(f"🗑️ 주문 취소 요청: {order_uuid} → {res}")
+
+    def get_balance(self):
+        krw_locked, coin_locked = self._locked()
+        return [
+            {'currency': 'KRW', 'balance': str(self.krw), 'locked': str(krw_locked), 'unit_currency': 'KRW'},
+            {'currency': self.currency, 'balance': str(self.coin), 'locked': str(coin_locked), 'unit_currency': 'KRW'},
+        ]
+
+    def get_current_price(self, market=None, **_):
+        return self.feed.last_price
+
+    def summary(self):
+        krw_locked, coin_locked = self._locked()
+        price = self.feed.last_price or 0
+        equity = self.krw + krw_locked + (self.coin + coin_locked) * price
+        return {
+            'fills': self.fill_count,
+            'open_orders': len(self.open_uuids),
+            'krw': self.krw + krw_locked,
+            'coin': self.coin + coin_locked,
+            'last_price': price,
+            'equity': equity,
+        }
+
+
+def paper_notify(message, *args, **kwargs):
+    """모의투자 중 텔레그램 대신 콘솔에만 출력"""
+    print(f"🧪 [모의 알림] {message}")
+
+
+def install(exchange, clock, isolate_heartbeat=False):
+    """
+    api.api와 run_auto_trade가 참조하는 주문/조회 함수, 시계, 알림을 가상 거래소로 바꾼다.
+    같은 프로세스에서 실계좌 주문이 나갈 수 없도록 워커 시작 시 한 번만 호출한다.
+    """
+    import api.api as live_api
+    import strategy.auto_trade as auto_trade
+
+    for name in _API_FUNCTIONS:
+        fn = getattr(exchange, name)
+        setattr(live_api, name, fn)
+        if hasattr(auto_trade, name):
+            setattr(auto_trade, name, fn)
+
+    auto_trade.time = clock
+    auto_trade.send_telegram_message = paper_notify
+    live_api._alert = paper_notify
+    auto_trade.STATE_SUBDIR = PAPER_SUBDIR
+    if isolate_heartbeat:
+        # 기록 재생은 같은 마켓의 실계좌 워커와 동시에 돌 수 있으므로 하트비트도 분리
+        auto_trade.HEARTBEAT_SUBDIR = PAPER_SUBDIR
+        auto_trade.HEARTBEAT_SOCKET = False
+
+
+def start_paper_session(market, data_path=None, speed=0.0, krw_balance=10_000_000):
+    """
+    모의투자 세션 준비 후 (exchange, stop_condition)을 반환한다.
+    data_path가 있으면 기록 재생(가상 시계), 없으면 실시간 시세(실제 시계)를 쓴다.
+    """
+    state_file = os.path.join(base_path, PAPER_SUBDIR, f'exchange_{market.replace("-", "_")}.json')
+    if data_path:
+        from strategy.backtest import load_prices
+        timestamps, prices = load_prices(data_path, market)
+        if not len(prices):
+            raise ValueError(f"가격 데이터가 비어 있습니다: {data_path}")
+        feed = RecordedFeed(timestamps, prices)
+        clock = SimClock(start=feed.start_time, speed=speed)
+        # 재생은 매번 새 계좌/새 그리드로 시작 (이전 재생의 주문이 남지 않도록)
+        grid_state = os.path.join(base_path, PAPER_SUBDIR, f'autotrade_state_{market.replace("-", "_")}.json')
+        for path in (state_file, grid_state):
+            if os.path.exists(path):
+                os.remove(path)
+    else:
+        feed = LiveFeed(market)
+        clock = SimClock(live=True)
+
+    exchange = SimulatedExchange(market, feed, clock, krw_balance=krw_balance, state_file=state_file)
+    # 첫 가격을 받아 둔다 (즉시 체결 판정 기준)
+    exchange.on_tick(clock.time())
+    install(exchange, clock, isolate_heartbeat=bool(data_path))
+    return exchange, (lambda: feed.exhausted)
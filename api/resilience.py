@@ -0,0 +1,255 @@
+# bithumbSplit/api/resilience.py
+# 거래소 장애 때 지연이 쌓이지 않게 하는 도구 (api.api가 사용)
+# - CircuitBreaker: 엔드포인트별로 연속 실패가 FAILURE_THRESHOLD번이면 열림(open) → 요청을 보내지 않고 즉시 실패.
+#   OPEN_SECONDS 뒤 반열림(half-open)에서 시험 요청 1건만 보내 성공하면 닫고, 실패하면 더 오래 연다.
+# - LatencyTracker: 엔드포인트별 최근 응답 시간 (백분위수 계산용)
+# - hedged(): 조회처럼 여러 번 보내도 되는 요청은 p95 시간 안에 응답이 없으면 한 번 더 보내 먼저 온 응답을 쓴다.
+# - 호출 종류(write: 주문/취소, read: 계정 조회, public: 시세)별 정책:
+#   타임아웃 = 최근 p99 × TIMEOUT_MULTIPLIER (종류별 최소~최대로 제한, 표본이 적으면 기본값)
+#   실패/타임아웃된 요청도 최소 그때 쓴 타임아웃만큼의 응답 시간으로 기록해 거래소가 느려지면 타임아웃이 늘어난다
+#   재시도 간격 = 지수 증가 + 무작위 흔들기(jitter), 재시도는 프로세스 전체 예산(RetryBudget) 안에서만
+
+import os
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait, TimeoutError as FutureTimeout
+
+FAILURE_THRESHOLD = 5  # 연속 실패 횟수
+OPEN_SECONDS = 15.0  # 처음 열린 뒤 반열림까지 (초)
+OPEN_MAX_SECONDS = 120.0  # 반열림 시험이 계속 실패하면 2배씩, 최대 (초)
+
+LATENCY_WINDOW = 200  # 엔드포인트별 보관하는 최근 응답 시간 수
+HEDGE_MIN_SAMPLES = 20  # 이만큼 모이기 전에는 헤지하지 않음
+HEDGE_MIN_DELAY = 0.05  # 초
+HEDGE_READS = os.getenv('BITHUMBSPLIT_API_HEDGE', '1') != '0'
+HEDGE_WORKERS = 4
+
+# 호출 종류별 기본 정책. 서명 요청(write/read)의 최소 타임아웃은 예전 고정값 5초 - 더 짧게는 환경변수로만.
+# 환경변수로 바꿀 수 있음: BITHUMBSPLIT_API_<종류>_<항목> (예: BITHUMBSPLIT_API_READ_TIMEOUT_MAX=6)
+CALL_CLASSES = {
+    'write': {'timeout': 5.0, 'timeout_min': 5.0, 'timeout_max': 10.0, 'retries': 3, 'delay': 1.0, 'backoff': 2.0},
+    'read': {'timeout': 5.0, 'timeout_min': 5.0, 'timeout_max': 8.0, 'retries': 3, 'delay': 0.5, 'backoff': 2.0},
+    'public': {'timeout': 5.0, 'timeout_min': 1.0, 'timeout_max': 5.0, 'retries': 3, 'delay': 0.5, 'backoff': 2.0},
+}
+for _name, _policy in CALL_CLASSES.items():
+    for _key, _default in _policy.items():
+        _value = os.getenv(f'BITHUMBSPLIT_API_{_name.upper()}_{_key.upper()}')
+        if _value:
+            _policy[_key] = type(_default)(_value)
+
+TIMEOUT_MULTIPLIER = 3.0  # 타임아웃 = p99 × 이 값
+TIMEOUT_MIN_SAMPLES = 20
+BACKOFF_CAP = 10.0  # 재시도 대기 최대 (초)
+
+# 재시도 예산: 요청 1건마다 RETRY_RATIO 토큰 적립 + 초당 RETRY_REFILL 토큰, 재시도 1회에 1토큰 (최대 RETRY_MAX_TOKENS)
+RETRY_RATIO = 0.2
+RETRY_REFILL = 0.1
+RETRY_MAX_TOKENS = 10.0
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    def __init__(self, name, threshold=FAILURE_THRESHOLD, open_seconds=OPEN_SECONDS, max_open_seconds=OPEN_MAX_SECONDS):
+        self.name = name
+        self.threshold = threshold
+        self.base_open = open_seconds
+        self.max_open = max_open_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.open_for = open_seconds
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """요청을 보내도 되면 True. 반열림이면 시험 요청 1건만 통과"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_for:
+                    return False
+                self.state = HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def retry_in(self):
+        """열린 회로가 반열림이 되기까지 남은 초"""
+        return max(0.0, self.open_for - (time.monotonic() - self.opened_at)) if self.state == OPEN else 0.0
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"✅ API 회로 닫힘: {self.name}")
+            self.state = CLOSED
+            self.failures = 0
+            self.open_for = self.base_open
+            self._probing = False
+
+    def record_failure(self):
+        """실패 기록. 닫혀 있던 회로가 이번 실패로 열렸으면 True (반열림 시험 실패로 다시 열린 경우는 False)"""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.open_for = min(self.open_for * 2, self.max_open)
+                self._open()
+                return False
+            if self.state == OPEN or self.failures < self.threshold:
+                return False
+            self._open()
+            return True
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._probing = False
+        print(f"🚧 API 회로 열림: {self.name} ({self.failures}회 연속 실패, {self.open_for:.0f}초 동안 요청 중단)")
+
+
+class LatencyTracker:
+    """최근 응답 시간 (초) 보관 + 백분위수"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def percentile(self, q):
+        with self._lock:
+            if not self.samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RetryBudget:
+    """
+    프로세스 전체 재시도 예산 (토큰 버킷). 장애로 실패가 몰려도 재시도가
+    평소 요청량의 일정 비율을 넘지 않아 거래소 부하를 몇 배로 키우지 않는다.
+    """
+
+    def __init__(self, ratio=RETRY_RATIO, refill_per_sec=RETRY_REFILL, max_tokens=RETRY_MAX_TOKENS):
+        self.ratio = ratio
+        self.refill_per_sec = refill_per_sec
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._last) * self.refill_per_sec)
+        self._last = now
+
+    def on_request(self):
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self):
+        """재시도 1회 허용 여부 (허용하면 토큰 차감)"""
+        with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+retry_budget = RetryBudget()
+
+_breakers = {}
+_latencies = {}
+_registry_lock = threading.Lock()
+_executor = None
+
+
+def get_breaker(endpoint):
+    with _registry_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+def get_latency(endpoint):
+    with _registry_lock:
+        tracker = _latencies.get(endpoint)
+        if tracker is None:
+            tracker = _latencies[endpoint] = LatencyTracker()
+        return tracker
+
+
+def hedge_delay(endpoint):
+    """헤지 요청을 보낼 대기 시간 (p95). 표본이 부족하면 None (헤지 안 함)"""
+    tracker = get_latency(endpoint)
+    if len(tracker) < HEDGE_MIN_SAMPLES:
+        return None
+    return max(HEDGE_MIN_DELAY, tracker.percentile(0.95))
+
+
+def call_policy(call_class):
+    return CALL_CLASSES[call_class]
+
+
+def timeout_for(endpoint, call_class):
+    """최근 응답 시간 p99 기반 타임아웃 (초). 표본이 부족하면 종류별 기본값"""
+    policy = CALL_CLASSES[call_class]
+    tracker = get_latency(endpoint)
+    if len(tracker) < TIMEOUT_MIN_SAMPLES:
+        return policy['timeout']
+    adaptive = tracker.percentile(0.99) * TIMEOUT_MULTIPLIER
+    return min(policy['timeout_max'], max(policy['timeout_min'], adaptive))
+
+
+def backoff_delay(delay):
+    """재시도 대기: 절반은 고정, 절반은 무작위 (여러 워커가 같은 순간에 다시 몰리지 않게)"""
+    delay = min(delay, BACKOFF_CAP)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _get_executor():
+    global _executor
+    with _registry_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix='api-hedge')
+        return _executor
+
+
+def hedged(send, delay, on_hedge=None):
+    """
+    send()를 실행하고 delay초 안에 끝나지 않으면 한 번 더 실행해 먼저 성공한 결과를 돌려준다.
+    둘 다 실패하면 마지막 예외를 그대로 올린다. (늦게 끝난 요청의 결과는 버림)
+    """
+    executor = _get_executor()
+    first = executor.submit(send)
+    try:
+        return first.result(timeout=delay)
+    except FutureTimeout:
+        pass
+    if on_hedge:
+        on_hedge()
+    pending = {first, executor.submit(send)}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                return future.result()
+            except Exception as e:
+                error = e
+    raise error
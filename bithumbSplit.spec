@@ -10,16 +10,35 @@ a = Analysis(
         ('.env', '.'),
         ('config/tick_table.py', 'config'),
         ('api/api.py', 'api'),
+        ('api/order_cache.py', 'api'),
+        ('api/resilience.py', 'api'),
         ('utils/telegram.py', 'utils'),
+        ('utils/logger.py', 'utils'),
+        ('utils/startup.py', 'utils'),
         ('strategy/auto_trade.py', 'strategy'),
-        ('shared/state.py', 'shared'),
+        ('shared/status_board.py', 'shared'),
+        ('gui/grid_view.py', 'gui'),
+        ('gui/chart_view.py', 'gui'),
+        ('shared/market_store.py', 'shared'),
     ],
     hiddenimports=[
         'strategy.auto_trade',
         'api.api',
+        'api.order_cache',
+        'api.jwt_signer',
+        'api.resilience',
         'config.tick_table',
         'utils.telegram',
-        'shared.state',
+        'utils.logger',
+        'utils.startup',
+        # 지연 import(utils.startup.lazy_import)라 정적 분석에 안 잡히는 외부 패키지
+        'requests',
+        'jwt',
+        'dotenv',
+        'shared.status_board',
+        'gui.grid_view',
+        'gui.chart_view',
+        'shared.market_store',
     ],
     hookspath=[],
     runtime_hooks=[],
@@ -0,0 +1,268 @@
+# bithumbSplit/gui/chart_view.py
+# 실시간 가격 + 누적 실현 수익 차트
+# 긴 기록은 LTTB(Largest-Triangle-Three-Buckets)로 줄여 모양(고점/저점)을 유지한 채 점 수를 제한한다.
+# - SeriesBuffer: 새 점은 그대로 쌓고, 용량을 넘으면 오래된 절반만 LTTB로 압축 → 메모리 상한 고정
+# - 과거 시세는 기록 저장소(data/market, recorder.py)에서 일자별로 mmap 읽기 + LTTB (일자별 결과는 캐시)
+# - 다시 그릴 때는 캔버스 선 항목의 좌표만 바꾼다 (항목을 새로 만들지 않음)
+
+import time
+from array import array
+from datetime import datetime
+import tkinter as tk
+import customtkinter as ctk
+
+from shared.market_store import available_days, DayColumns, STORE_DIR
+
+HISTORY_DAYS = 90  # 차트에 불러올 과거 일수
+DAY_POINTS = 600  # 과거 하루치를 줄일 점 수
+SERIES_CAPACITY = 6000  # 시리즈당 최대 점 수
+MAX_LEVEL_LINES = 80  # 그리드 가격선 최대 개수 (화면 범위 안의 것만)
+
+_day_cache = {}  # (market, day) -> (xs, ys)  오늘 이전 일자는 바뀌지 않으므로 세션 동안 재사용
+
+
+def lttb(xs, ys, threshold):
+    """Largest-Triangle-Three-Buckets 다운샘플링. (xs, ys) 배열을 threshold개 점으로"""
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return array('d', xs), array('d', ys)
+
+    out_x = array('d', [xs[0]])
+    out_y = array('d', [ys[0]])
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # 다음 버킷 평균점
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        count = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / count
+        avg_y = sum(ys[avg_start:avg_end]) / count
+
+        # 현재 버킷에서 (직전 선택점, 다음 버킷 평균)과 만드는 삼각형 넓이가 가장 큰 점
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax = xs[a]
+        ay = ys[a]
+        dx = ax - avg_x
+        dy = avg_y - ay
+        best = start
+        best_area = -1.0
+        for j in range(start, end):
+            area = abs(dx * (ys[j] - ay) - (ax - xs[j]) * dy)
+            if area > best_area:
+                best_area = area
+                best = j
+        out_x.append(xs[best])
+        out_y.append(ys[best])
+        a = best
+
+    out_x.append(xs[n - 1])
+    out_y.append(ys[n - 1])
+    return out_x, out_y
+
+
+class SeriesBuffer:
+    """
+    메모리 상한이 있는 시계열. 용량을 넘으면 최근 절반은 원본 그대로 두고
+    오래된 쪽만 LTTB로 1/4 용량까지 줄인다. (오래될수록 점점 거칠어짐)
+    """
+
+    def __init__(self, capacity=SERIES_CAPACITY):
+        self.capacity = capacity
+        self.xs = array('d')
+        self.ys = array('d')
+
+    def __len__(self):
+        return len(self.xs)
+
+    def clear(self):
+        self.xs = array('d')
+        self.ys = array('d')
+
+    def append(self, x, y):
+        if self.xs and x <= self.xs[-1]:
+            return  # 같은 시각 중복 샘플 무시
+        self.xs.append(x)
+        self.ys.append(y)
+        if len(self.xs) > self.capacity:
+            self._compact()
+
+    def extend(self, xs, ys):
+        for x, y in zip(xs, ys):
+            self.append(x, y)
+
+    def _compact(self):
+        keep = self.capacity // 2
+        old_x, old_y = lttb(self.xs[:-keep], self.ys[:-keep], self.capacity // 4)
+        old_x.extend(self.xs[-keep:])
+        old_y.extend(self.ys[-keep:])
+        self.xs, self.ys = old_x, old_y
+
+
+def load_price_history(market, days=HISTORY_DAYS, root=STORE_DIR):
+    """기록 저장소의 현재가 샘플(최근 days일)을 일자별로 줄여 (xs(초), ys) 반환"""
+    xs = array('d')
+    ys = array('d')
+    today = datetime.now().strftime('%Y%m%d')
+    for day in available_days(market, 'ticker', root)[-days:]:
+        cached = _day_cache.get((market, day))
+        if cached is None:
+            with DayColumns(root, market, 'ticker', day) as cols:
+                day_x = array('d', (t / 1000 for t in cols.ts))
+                day_y = array('d', cols.price)
+            cached = lttb(day_x, day_y, DAY_POINTS)
+            if day != today:
+                _day_cache[(market, day)] = cached
+        xs.extend(cached[0])
+        ys.extend(cached[1])
+    return xs, ys
+
+
+def profit_series(trade_history):
+    """체결 이력 → 누적 실현 수익 (xs(초), ys)"""
+    xs = array('d')
+    ys = array('d')
+    total = 0.0
+    for trade in sorted(trade_history or [], key=lambda t: t.get('timestamp', 0)):
+        ts = trade.get('timestamp')
+        if not ts:
+            continue
+        total += trade.get('profit', 0)
+        xs.append(ts)
+        ys.append(total)
+    return xs, ys
+
+
+class PriceChart(ctk.CTkFrame):
+    """
+    위: 가격선 + 그리드 가격선(미체결은 색 강조), 아래: 누적 실현 수익
+    set_history()/add_price()/set_grid()/set_profit()로 데이터를 바꾸고 redraw()로 다시 그린다.
+    """
+
+    def __init__(self, master, width=600, height=320, **kwargs):
+        super().__init__(master, **kwargs)
+        self.width = width
+        self.height = height
+        self.price_h = int(height * 0.68)
+        self.pad = 8
+        self.prices = SeriesBuffer()
+        self.profit_x = array('d')
+        self.profit_y = array('d')
+        self.levels = []  # [(가격, 미체결 여부)]
+
+        self.canvas = tk.Canvas(self, width=width, height=height, bg="#1f1f1f", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        self.canvas.create_line(0, self.price_h, width, self.price_h, fill="#333333")
+        self._level_items = []
+        self._price_line = self.canvas.create_line(0, 0, 0, 0, fill="#4fc3f7", width=1.5)
+        self._profit_line = self.canvas.create_line(0, 0, 0, 0, fill="#81c784", width=1.5)
+        self._labels = {
+            name: self.canvas.create_text(0, 0, text="", fill="gray70", font=("", 10), anchor=anchor)
+            for name, anchor in (('high', 'nw'), ('low', 'sw'), ('last', 'ne'), ('profit', 'nw'),
+                                 ('start', 'sw'), ('end', 'se'))
+        }
+        self.canvas.bind("<Configure>", self._on_resize)
+
+    def set_history(self, xs, ys):
+        self.prices.clear()
+        self.prices.extend(xs, ys)
+
+    def add_price(self, ts, price):
+        self.prices.append(ts, price)
+
+    def set_grid(self, levels):
+        self.levels = levels
+
+    def set_profit(self, xs, ys):
+        self.profit_x, self.profit_y = lttb(xs, ys, self.width)
+
+    def _on_resize(self, event):
+        if (event.width, event.height) != (self.width, self.height):
+            self.width, self.height = event.width, event.height
+            self.price_h = int(self.height * 0.68)
+            self.redraw()
+
+    def _level_item(self, index):
+        while len(self._level_items) <= index:
+            self._level_items.append(self.canvas.create_line(0, 0, 0, 0, dash=(2, 4), state="hidden"))
+            self.canvas.tag_lower(self._level_items[-1])
+        return self._level_items[index]
+
+    def redraw(self):
+        c = self.canvas
+        pad = self.pad
+        w = self.width
+        xs, ys = lttb(self.prices.xs, self.prices.ys, max(3, w * 2))
+        if len(xs) < 2:
+            c.coords(self._price_line, 0, 0, 0, 0)
+            c.coords(self._profit_line, 0, 0, 0, 0)
+            return
+
+        x0, x1 = xs[0], max(xs[-1], time.time())
+        if self.profit_x:
+            x0 = min(x0, self.profit_x[0])
+        span_x = max(x1 - x0, 1.0)
+        lo, hi = min(ys), max(ys)
+        margin = (hi - lo) * 0.05 or hi * 0.001 or 1.0
+        lo, hi = lo - margin, hi + margin
+        top, bottom = pad, self.price_h - pad
+
+        def px(x):
+            return pad + (x - x0) / span_x * (w - 2 * pad)
+
+        def py(y):
+            return bottom - (y - lo) / (hi - lo) * (bottom - top)
+
+        points = []
+        for x, y in zip(xs, ys):
+            points.append(px(x))
+            points.append(py(y))
+        c.coords(self._price_line, *points)
+
+        # 그리드 가격선 (화면 범위 안의 것만, 항목은 재사용)
+        shown = 0
+        for price, active in self.levels:
+            if shown >= MAX_LEVEL_LINES:
+                break
+            if not lo <= price <= hi:
+                continue
+            item = self._level_item(shown)
+            y = py(price)
+            c.coords(item, pad, y, w - pad, y)
+            c.itemconfigure(item, state="normal", fill="#ffd54f" if active else "#444444")
+            shown += 1
+        for item in self._level_items[shown:]:
+            c.itemconfigure(item, state="hidden")
+
+        # 누적 수익 (계단형)
+        p_top, p_bottom = self.price_h + pad, self.height - pad - 12
+        if self.profit_x:
+            p_hi = max(max(self.profit_y), 0.0)
+            p_lo = min(min(self.profit_y), 0.0)
+            p_span = (p_hi - p_lo) or 1.0
+            profit_points = [pad, p_bottom - (0 - p_lo) / p_span * (p_bottom - p_top)]
+            prev_y = profit_points[1]
+            for x, y in zip(self.profit_x, self.profit_y):
+                sx = px(x)
+                profit_points += [sx, prev_y]
+                prev_y = p_bottom - (y - p_lo) / p_span * (p_bottom - p_top)
+                profit_points += [sx, prev_y]
+            profit_points += [w - pad, prev_y]
+            c.coords(self._profit_line, *profit_points)
+            c.itemconfigure(self._labels['profit'], text=f"누적 수익 {self.profit_y[-1]:,.0f}원")
+        else:
+            c.coords(self._profit_line, 0, 0, 0, 0)
+            c.itemconfigure(self._labels['profit'], text="누적 수익 -")
+
+        c.coords(self._labels['high'], pad + 2, top)
+        c.itemconfigure(self._labels['high'], text=f"{hi - margin:,.0f}")
+        c.coords(self._labels['low'], pad + 2, bottom)
+        c.itemconfigure(self._labels['low'], text=f"{lo + margin:,.0f}")
+        c.coords(self._labels['last'], w - pad - 2, top)
+        c.itemconfigure(self._labels['last'], text=f"현재 {ys[-1]:,.0f}")
+        c.coords(self._labels['profit'], pad + 2, p_top)
+        c.coords(self._labels['start'], pad + 2, self.height - 2)
+        c.itemconfigure(self._labels['start'], text=datetime.fromtimestamp(x0).strftime('%m-%d %H:%M'))
+        c.coords(self._labels['end'], w - pad - 2, self.height - 2)
+        c.itemconfigure(self._labels['end'], text=datetime.fromtimestamp(x1).strftime('%m-%d %H:%M'))
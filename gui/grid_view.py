@@ -0,0 +1,177 @@
+# bithumbSplit/gui/grid_view.py
+# 차수별 그리드 표 (가상화)
+# 차수가 수백 개여도 보이는 줄 수만큼의 캔버스 항목만 만들어 두고, 스크롤하면 내용만 바꿔 그린다.
+# 상태 파일이 바뀌면 달라진 줄만 다시 그린다. (위젯을 차수마다 만들면 customtkinter가 느려짐)
+
+import os
+import json
+import tkinter as tk
+import customtkinter as ctk
+
+# (제목, 폭)
+COLUMNS = (("차수", 50), ("상태", 120), ("매수가", 110), ("매도가", 110), ("수량", 100), ("UUID", 110))
+
+STATUS_COLORS = {
+    "매도 대기": "#4caf50",
+    "매수 대기": "#ffd54f",
+    "보유": "#ff9800",
+    "-": "gray60",
+}
+
+
+def level_status(lv):
+    """상태 파일의 차수 한 개 → 표시 상태"""
+    if lv.get("buy_filled") and not lv.get("sell_filled"):
+        return "매도 대기" if lv.get("sell_uuid") else "보유"
+    if lv.get("buy_uuid") and not lv.get("buy_filled"):
+        return "매수 대기"
+    return "-"
+
+
+def build_grid_rows(state):
+    """상태 파일 dict → 표 줄 목록 [(차수, 상태, 매수가, 매도가, 수량, uuid)]"""
+    rows = []
+    for lv in (state or {}).get("levels", []):
+        status = level_status(lv)
+        uuid = lv.get("sell_uuid") if status == "매도 대기" else lv.get("buy_uuid") if status == "매수 대기" else None
+        rows.append((
+            f"{lv.get('level', 0)}차",
+            status,
+            f"{lv.get('buy_price', 0):,.0f}",
+            f"{lv.get('sell_price', 0):,.0f}",
+            f"{lv.get('volume', 0):.8f}".rstrip('0').rstrip('.'),
+            (uuid or "")[:12],
+        ))
+    return rows
+
+
+class GridStateSource:
+    """마켓 상태 파일을 수정 시각이 바뀐 때만 다시 읽는다"""
+
+    def __init__(self, path):
+        self.path = path
+        self.state = None  # 마지막으로 읽은 상태 (차트의 그리드선/수익에도 사용)
+        self._mtime = None
+
+    def load_if_changed(self):
+        """바뀌었으면 표 줄 목록, 아니면 None"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            if self._mtime is None:
+                return None
+            self._mtime = None
+            self.state = None
+            return []
+        if mtime == self._mtime:
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None  # 워커가 쓰는 중이면 다음에 다시
+        self._mtime = mtime
+        self.state = state
+        return build_grid_rows(state)
+
+
+class GridTable(ctk.CTkFrame):
+    """
+    가상화된 차수 표
+    :param visible_rows: 화면에 보이는 줄 수 (캔버스 항목은 이만큼만 만든다)
+    set_rows()로 전체 줄을 넘기면 보이는 범위 안에서 달라진 줄만 다시 그린다.
+    """
+
+    def __init__(self, master, visible_rows=12, row_height=22, **kwargs):
+        super().__init__(master, **kwargs)
+        self.visible_rows = visible_rows
+        self.row_height = row_height
+        self.rows = []
+        self.top = 0  # 첫 번째로 보이는 줄 번호
+        self._drawn = [None] * visible_rows  # 화면 줄별로 마지막에 그린 내용
+
+        width = sum(w for _, w in COLUMNS)
+        self.columnconfigure(0, weight=1)
+
+        header = tk.Canvas(self, width=width, height=row_height, bg="#2b2b2b", highlightthickness=0)
+        header.grid(row=0, column=0, sticky="ew")
+        x = 0
+        for title, w in COLUMNS:
+            header.create_text(x + 6, row_height // 2, text=title, anchor="w", fill="white",
+                               font=("", 11, "bold"))
+            x += w
+
+        self.canvas = tk.Canvas(self, width=width, height=row_height * visible_rows,
+                                bg="#1f1f1f", highlightthickness=0)
+        self.canvas.grid(row=1, column=0, sticky="ew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, rowspan=2, sticky="ns")
+
+        # 화면 줄마다 배경 사각형 1개 + 열마다 글자 1개 (전체 차수와 무관하게 고정)
+        self._items = []
+        for i in range(visible_rows):
+            y = i * row_height
+            bg = self.canvas.create_rectangle(0, y, width, y + row_height, width=0,
+                                              fill="#1f1f1f" if i % 2 == 0 else "#242424")
+            texts = []
+            x = 0
+            for _, w in COLUMNS:
+                texts.append(self.canvas.create_text(x + 6, y + row_height // 2, text="", anchor="w",
+                                                     fill="white", font=("", 11)))
+                x += w
+            self._items.append((bg, texts))
+
+        for widget in (self.canvas, header):
+            widget.bind("<MouseWheel>", self._on_wheel)
+            widget.bind("<Button-4>", lambda e: self.scroll_by(-3))
+            widget.bind("<Button-5>", lambda e: self.scroll_by(3))
+
+    def set_rows(self, rows, focus_active=False):
+        """전체 줄 교체. 보이는 범위에서 내용이 달라진 줄만 다시 그린다"""
+        self.rows = rows
+        if focus_active:
+            active = next((i for i, row in enumerate(rows) if row[1] != "-"), 0)
+            self.top = max(0, active - 1)
+        self.top = max(0, min(self.top, len(rows) - self.visible_rows))
+        self._render()
+
+    def scroll_by(self, count):
+        self.scroll_to(self.top + count)
+
+    def scroll_to(self, top):
+        top = max(0, min(int(top), len(self.rows) - self.visible_rows))
+        if top != self.top:
+            self.top = top
+            self._render()
+
+    def _render(self):
+        for i, (bg, texts) in enumerate(self._items):
+            index = self.top + i
+            row = self.rows[index] if index < len(self.rows) else None
+            if row == self._drawn[i]:
+                continue
+            self._drawn[i] = row
+            if row is None:
+                for item in texts:
+                    self.canvas.itemconfigure(item, text="")
+                continue
+            color = STATUS_COLORS.get(row[1], "white")
+            for item, value in zip(texts, row):
+                self.canvas.itemconfigure(item, text=value, fill=color if row[1] != "-" else "gray70")
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = max(len(self.rows), 1)
+        first = self.top / total
+        last = min(1.0, (self.top + self.visible_rows) / total)
+        self.scrollbar.set(first, last)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(value) * len(self.rows))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_by(int(value) * step)
+
+    def _on_wheel(self, event):
+        self.scroll_by(-3 if event.delta > 0 else 3)
@@ -3,7 +3,6 @@
 
 import os
 import sys
-import customtkinter as ctk
 import threading
 import time
 import json
@@ -21,10 +20,16 @@ else:
 if str(base_path) not in sys.path:
     sys.path.insert(0, str(base_path))
 
-from strategy.auto_trade import run_auto_trade
-from utils.telegram import send_telegram_message
-from api.api import cancel_all_orders, get_current_price
-from shared.state import strategy_info
+from utils import startup
+startup.load_env()  # gui_app.py를 직접 실행하는 경우 (.env 설정을 import 시점에 읽는 모듈보다 먼저)
+if '--startup-report' in sys.argv or startup.report_requested():
+    startup.enable()
+
+import customtkinter as ctk
+from api.api import get_all_prices
+from shared.status_board import get_board, BoardWatcher
+from gui.grid_view import GridTable, GridStateSource
+from gui.chart_view import PriceChart, load_price_history, profit_series
 
 # CustomTkinter 설정
 ctk.set_appearance_mode("dark")
@@ -66,27 +71,15 @@ def stop_condition():
 realized_profit = 0.0
 
 # 실시간 시세 표시용 변수
+PRICE_COINS = ["BTC", "USDT", "XRP"]  # 시세 패널 코인 (늘려도 요청 수는 그대로: 전체 시세 1회)
 price_labels = {}
+latest_prices = {}  # 코인 -> 마지막 조회 가격 (빗썸 전체 원화 마켓)
+worker_slots = []  # 실행 중인 워커들의 상태판 슬롯 (BoardWatcher가 바뀔 때만 갱신)
 
-# 전략 정보 저장용 변수
-def get_current_price_temp(coin):
-    """임시 현재가 조회 함수 - 업비트 API 사용"""
-    try:
-        import requests
-        market = f"KRW-{coin}"
-        url = "https://api.upbit.com/v1/ticker"
-        params = {"markets": market}
-        
-        response = requests.get(url, params=params, timeout=5)
-        data = response.json()
-        
-        if data and len(data) > 0:
-            return float(data[0]['trade_price'])
-        return None
-        
-    except Exception as e:
-        print(f"❌ {coin} 가격 조회 실패: {e}")
-        return None
+# 차수별 그리드 표 (선택한 마켓의 상태 파일)
+grid_source = None
+grid_source_lock = threading.Lock()
+grid_coin = None  # 표/차트에 보이는 코인
 
 # 실시간 시세 업데이트 함수
 def update_price_info():
@@ -104,38 +97,30 @@ def update_price_info():
                 
                 app.after(0, update_time)
                 
-                # 코인 가격 업데이트
-                coins = ["BTC", "USDT", "XRP"]
-                strategy_coin = strategy_info.get("market")
-                if strategy_coin:
-                    coins.append(strategy_coin)
-                    
-                for coin in coins:
-                    try:
-                        price = get_current_price_temp(coin)  # 임시 함수 사용
-                        
-                        def update_coin_price(c=coin, p=price):
-                            if c in price_labels:
-                                if p:
-                                    price_labels[c].configure(text=f"{c}: {p:,.0f} KRW")
-                                else:
-                                    price_labels[c].configure(text=f"{c}: 조회 실패")
-                        
-                        app.after(0, update_coin_price)
-                        
-                        if coin == strategy_info.get("market"):
-                            strategy_info["current_price"] = price
-                            app.after(0, update_strategy_summary)
+                # 코인 가격 업데이트 (빗썸 전체 원화 시세 한 번 조회)
+                prices = get_all_prices()
+                latest_prices.update(prices)
+
+                def update_coin_prices(snapshot=dict(prices)):
+                    for c in PRICE_COINS:
+                        if c not in price_labels:
+                            continue
+                        p = snapshot.get(c)
+                        if p:
+                            price_labels[c].configure(text=f"{c}: {p:,.0f} KRW")
+                        else:
+                            price_labels[c].configure(text=f"{c}: 조회 실패")
+
+                app.after(0, update_coin_prices)
+                coin = grid_coin
+                if coin in prices:
+                    app.after(0, lambda c=coin, p=prices[coin], t=time.time(): add_chart_price(c, t, p))
+                # 요약의 현재가도 새 시세로
+                if worker_slots:
+                    app.after(0, update_strategy_summary)
+                # 헬스체크 재등록처럼 상태판 값은 그대로인 변경도 표에 반영
+                refresh_grid_table()
 
-                    except Exception as e:
-                        print(f"[ERROR] {coin} 가격 조회 중 오류: {e}")
-                        
-                        def update_error(c=coin):
-                            if c in price_labels:
-                                price_labels[c].configure(text=f"{c}: 오류")
-                        
-                        app.after(0, update_error)
-                
             except Exception as e:
                 print(f"[ERROR] 전체 가격 업데이트 오류: {e}")
 
@@ -149,14 +134,26 @@ def update_price_info():
 
 # 전략 요약 정보 업데이트 함수
 def update_strategy_summary():
+    """워커 프로세스들이 공유 상태판에 기록한 마켓별 상태를 요약 표시"""
     try:
-        current = strategy_info.get("current_price", 0)
-        start = strategy_info.get("start_price", 0)
-        profit = strategy_info.get("realized_profit", 0)
+        slots = worker_slots
+        if not slots:
+            summary_labels["market"].configure(text="코인: -")
+            summary_labels["start_price"].configure(text="시작가: -")
+            summary_labels["current_price"].configure(text="현재가: -")
+            summary_labels["profit"].configure(text="총 수익: -", text_color="white")
+            return
+
+        coins = [slot['market'].split('-')[-1] for slot in slots]
+        starts = " · ".join(f"{coin} {slot['start_price']:,.0f}" for coin, slot in zip(coins, slots))
+        currents = " · ".join(
+            f"{coin} {latest_prices.get(coin) or slot['last_price']:,.0f}" for coin, slot in zip(coins, slots)
+        )
+        profit = sum(slot['realized_profit'] for slot in slots)
 
-        summary_labels["market"].configure(text=f"코인: {strategy_info['market']}")
-        summary_labels["start_price"].configure(text=f"시작가: {start:,.0f} KRW")
-        summary_labels["current_price"].configure(text=f"현재가: {current:,.0f} KRW")  # 추가
+        summary_labels["market"].configure(text=f"코인: {', '.join(coins)}")
+        summary_labels["start_price"].configure(text=f"시작가: {starts} KRW")
+        summary_labels["current_price"].configure(text=f"현재가: {currents} KRW")
         summary_labels["profit"].configure(
             text=f"총 수익: {profit:,.0f} KRW", 
             text_color="green" if profit >= 0 else "red"
@@ -165,6 +162,110 @@ def update_strategy_summary():
         print(f"[ERROR] update_strategy_summary: {e}")
 
 
+def on_worker_state_change(slots):
+    """상태판 감시 스레드 콜백: 워커 상태가 실제로 바뀌었을 때만 메인 스레드에서 다시 그린다"""
+    def redraw():
+        global worker_slots
+        worker_slots = slots
+        update_strategy_summary()
+        update_worker_status()
+        update_grid_market_choices()
+    app.after(0, redraw)
+    refresh_grid_table()
+
+
+def select_grid_market(coin):
+    """표/차트에 보일 마켓 변경 (상태 파일/과거 시세 읽기는 백그라운드에서)"""
+    global grid_source, grid_coin
+    grid_coin = coin
+    grid_table.set_rows([])
+    price_chart.set_history([], [])
+    price_chart.set_grid([])
+    price_chart.set_profit([], [])
+    price_chart.redraw()
+    with grid_source_lock:
+        grid_source = GridStateSource(os.path.join(base_path, 'logs', f'autotrade_state_KRW_{coin}.json'))
+    threading.Thread(target=refresh_grid_table, args=(True,), daemon=True).start()
+    threading.Thread(target=load_chart_history, args=(coin,), daemon=True).start()
+
+
+def refresh_grid_table(focus_active=False):
+    """선택 마켓 상태 파일이 바뀌었으면 읽어서 표/차트에 반영 (백그라운드 스레드에서 호출)"""
+    with grid_source_lock:
+        source = grid_source
+        rows = source.load_if_changed() if source else None
+        state = source.state if source else None
+    if rows is None:
+        return
+    levels = []
+    for lv in (state or {}).get("levels", []):
+        active = bool(lv.get("buy_uuid") and not lv.get("buy_filled"))
+        levels.append((lv.get("buy_price", 0), active))
+        if lv.get("sell_uuid") and not lv.get("sell_filled"):
+            levels.append((lv.get("sell_price", 0), True))
+    profit_x, profit_y = profit_series((state or {}).get("trade_history"))
+
+    def apply():
+        if source is not grid_source:
+            return  # 그새 다른 마켓을 골랐으면 버림
+        grid_table.set_rows(rows, focus_active=focus_active)
+        price_chart.set_grid(levels)
+        price_chart.set_profit(profit_x, profit_y)
+        price_chart.redraw()
+    app.after(0, apply)
+
+
+def load_chart_history(coin):
+    """기록 저장소의 과거 시세를 줄여서 차트에 (백그라운드 스레드)"""
+    try:
+        xs, ys = load_price_history(f'KRW-{coin}')
+    except Exception as e:
+        print(f"[ERROR] 과거 시세 로드 실패 ({coin}): {e}")
+        return
+
+    def apply():
+        if coin != grid_coin:
+            return
+        live_x, live_y = price_chart.prices.xs, price_chart.prices.ys
+        price_chart.set_history(xs, ys)
+        price_chart.prices.extend(live_x, live_y)  # 로드하는 동안 들어온 실시간 시세 유지
+        price_chart.redraw()
+    app.after(0, apply)
+
+
+def add_chart_price(coin, ts, price):
+    if coin == grid_coin:
+        price_chart.add_price(ts, price)
+        price_chart.redraw()
+
+
+def update_grid_market_choices():
+    """실행 중인 마켓을 표 마켓 선택지에 추가"""
+    coins = [slot['market'].split('-')[-1] for slot in worker_slots]
+    values = list(dict.fromkeys(coins + PRICE_COINS))
+    if list(grid_market_menu.cget("values")) != values:
+        grid_market_menu.configure(values=values)
+
+
+def update_worker_status():
+    """현재 주문 상태 카드: 실행 중인 마켓별 차수 / 미체결 수"""
+    try:
+        if not worker_slots:
+            label_status.configure(text="⏸️ 대기 중", text_color="gray")
+            return
+        label_status.configure(text=f"▶️ 실행 중 ({len(worker_slots)}개 마켓)", text_color="green")
+        lines = []
+        for slot in worker_slots:
+            coin = slot['market'].split('-')[-1]
+            level = slot['level']
+            buy_info = f"🛒 {level + 1}차 매수" if level < slot['max_levels'] else "🛒 최대차수"
+            sell_info = f"📤 {level}차 매도" if level > 0 else "📤 매도 대기"
+            lines.append(f"{coin}  {buy_info}  |  {sell_info}  (미체결 {slot['open_orders']}개)")
+        current_level_label.configure(text="\n".join(lines))
+    except Exception as e:
+        print(f"[ERROR] update_worker_status: {e}")
+
+
 def update_order_status(level, text):
     """주문 상태 업데이트 - 매수/매도 동시 표시"""
     try:
@@ -271,7 +372,8 @@ def save_markets_config():
                     'buy_gap': buy_gap,
                     'buy_mode': buy_mode_val,
                     'sell_gap': sell_gap,
-                    'sell_mode': sell_mode_val
+                    'sell_mode': sell_mode_val,
+                    'paper': paper_mode.get(),
                 }
             except ValueError:
                 messagebox.showerror("입력 오류", f"{market_name}: 숫자 필드에 올바른 값을 입력해주세요.")
@@ -340,16 +442,6 @@ def stop_strategy():
     
     messagebox.showinfo("안내", "✅ 설정이 저장되었습니다.\n\n자동매매를 중단하려면 \"start_watchdog.bat\" 창을 닫으세요.")
 
-# 정기적으로 상태 업데이트 처리
-def periodic_update():
-    """정기적인 업데이트 처리"""
-    try:
-        process_status_updates()
-    except Exception as e:
-        print(f"[ERROR] periodic_update: {e}")
-    finally:
-        app.after(100, periodic_update)  # 100ms마다 실행
-
 # UI 구성 - 스크롤 가능한 메인 프레임
 main_scrollable = ctk.CTkScrollableFrame(app)
 main_scrollable.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
@@ -367,7 +459,7 @@ price_frame.columnconfigure(0, weight=1)  # 수평 확장 설정
 price_labels["time"] = ctk.CTkLabel(price_frame, text="⏱️ --:--:--", font=ctk.CTkFont(size=13))
 price_labels["time"].pack(anchor="w", padx=10, pady=(5, 0))
 
-for coin in ["BTC", "USDT", "XRP"]:
+for coin in PRICE_COINS:
     price_labels[coin] = ctk.CTkLabel(price_frame, text=f"{coin}: -", font=ctk.CTkFont(size=13))
     price_labels[coin].pack(anchor="w", padx=10)
 
@@ -475,6 +567,11 @@ btn_stop = ctk.CTkButton(button_frame, text="🛑 자동매매 중단", command=
 btn_start.grid(row=0, column=0, pady=10, sticky="ew", padx=(10, 5))
 btn_stop.grid(row=0, column=1, pady=10, sticky="ew", padx=(5, 10))
 
+# 모의투자 토글: 체크 시 Watchdog이 워커를 --paper로 실행 (가상 거래소, 실계좌 주문 없음)
+paper_mode = ctk.BooleanVar(value=False)
+ctk.CTkCheckBox(button_frame, text="🧪 모의투자 모드 (실계좌 주문 없음)", variable=paper_mode)\
+    .grid(row=1, column=0, columnspan=2, sticky="w", padx=10, pady=(0, 10))
+
 ### 2. 전략 현황 카드
 summary_frame = ctk.CTkFrame(main_scrollable)
 summary_frame.grid(row=2, column=0, padx=10, pady=(0, 10), sticky="ew")
@@ -546,11 +643,40 @@ status_text_label = ctk.CTkLabel(
 )
 status_text_label.grid(row=3, column=0, pady=(0, 10))
 
-# 정기 업데이트 시작
-periodic_update()
+### 4. 차수별 그리드 표
+grid_frame = ctk.CTkFrame(main_scrollable)
+grid_frame.grid(row=4, column=0, padx=10, pady=(5, 10), sticky="ew")
+grid_frame.columnconfigure(0, weight=1)
+
+grid_header = ctk.CTkFrame(grid_frame, fg_color="transparent")
+grid_header.grid(row=0, column=0, sticky="ew", pady=(10, 5))
+ctk.CTkLabel(grid_header, text="🧮 차수별 주문", font=ctk.CTkFont(size=16, weight="bold"))\
+    .pack(side="left", padx=10)
+grid_market_menu = ctk.CTkOptionMenu(grid_header, values=PRICE_COINS, command=select_grid_market, width=90)
+grid_market_menu.pack(side="right", padx=10)
+
+grid_table = GridTable(grid_frame, visible_rows=12)
+grid_table.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="ew")
+
+### 5. 가격 / 누적 수익 차트 (선택한 마켓)
+chart_frame = ctk.CTkFrame(main_scrollable)
+chart_frame.grid(row=5, column=0, padx=10, pady=(5, 10), sticky="ew")
+chart_frame.columnconfigure(0, weight=1)
+ctk.CTkLabel(chart_frame, text="📉 가격 · 누적 수익", font=ctk.CTkFont(size=16, weight="bold"))\
+    .grid(row=0, column=0, pady=(10, 5))
+price_chart = PriceChart(chart_frame)
+price_chart.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="ew")
+
+select_grid_market(PRICE_COINS[0])
+
+# 워커 상태 구독 (공유 상태판이 바뀔 때만 다시 그림)
+BoardWatcher(get_board(os.path.join(base_path, 'logs')), on_worker_state_change).start()
 
 # 실시간 시세 정보 업데이트 시작
 update_price_info()
 
+# 첫 화면이 그려진 뒤 기동 시간 보고 (--startup-report / BITHUMBSPLIT_STARTUP_REPORT=1)
+app.after_idle(lambda: startup.ready('GUI 창 표시'))
+
 if __name__ == "__main__":
     app.mainloop()
\ No newline at end of file
@@ -11,5 +11,9 @@ if str(base_path) not in sys.path:
 
 # GUI 앱 실행
 if __name__ == '__main__':
+    from utils import startup
+    startup.load_env()  # .env 설정을 import 시점에 읽는 모듈보다 먼저
+    if '--startup-report' in sys.argv or startup.report_requested():
+        startup.enable()
     from gui import gui_app
     gui_app.app.mainloop()
\ No newline at end of file
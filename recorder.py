@@ -0,0 +1,168 @@
+# recorder.py
+# 시세/체결 기록 서비스 (백테스트, 모의투자, 차트용 이력 수집)
+# 설정된 마켓의 현재가 샘플과 체결 내역을 data/market/ 컬럼 저장소에 계속 이어 쓴다.
+#
+# 실행:
+#   python recorder.py                 # markets_config.json의 활성 마켓
+#   python recorder.py --markets BTC,XRP --ticker-interval 1 --trade-interval 2
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# 프로젝트 루트
+if getattr(sys, 'frozen', False):
+    base_path = Path(sys.executable).parent
+else:
+    base_path = Path(__file__).parent
+
+if str(base_path) not in sys.path:
+    sys.path.insert(0, str(base_path))
+
+import requests
+
+from shared.market_store import MarketStoreWriter, STORE_DIR
+
+apiUrl = 'https://api.bithumb.com'
+MARKETS_CONFIG_FILE = os.path.join(base_path, 'config', 'markets_config.json')
+DEFAULT_MARKETS = ['BTC', 'USDT', 'XRP']
+FLUSH_INTERVAL = 5  # 초
+
+
+def load_markets():
+    """markets_config.json의 활성 마켓 (없으면 기본 마켓)"""
+    try:
+        with open(MARKETS_CONFIG_FILE, 'r', encoding='utf-8') as f:
+            configs = json.load(f)
+        markets = [m for m, cfg in configs.items() if cfg.get('enabled', True)]
+        if markets:
+            return markets
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠️ 설정 파일 로드 실패: {e}")
+    return list(DEFAULT_MARKETS)
+
+
+def fetch_tickers(session):
+    """ALL_KRW 한 번의 요청으로 전체 마켓 현재가를 받는다. {코인: (ts_ms, 현재가, 24h 거래량)}"""
+    resp = session.get(f"{apiUrl}/public/ticker/ALL_KRW", timeout=3)
+    data = resp.json()
+    if data.get('status') != '0000':
+        raise RuntimeError(data.get('message', 'unknown error'))
+    body = data['data']
+    ts_ms = int(body.get('date') or time.time() * 1000)
+    tickers = {}
+    for coin, info in body.items():
+        if isinstance(info, dict) and 'closing_price' in info:
+            tickers[coin] = (ts_ms, float(info['closing_price']), float(info.get('units_traded_24H') or 0))
+    return tickers
+
+
+def fetch_trades(session, coin, count=100):
+    """최근 체결 내역 (오래된 순). [(ts_ms, 가격, 수량)]"""
+    resp = session.get(f"{apiUrl}/public/transaction_history/{coin}_KRW", params={'count': count}, timeout=3)
+    data = resp.json()
+    if data.get('status') != '0000':
+        raise RuntimeError(data.get('message', 'unknown error'))
+    trades = []
+    for tr in data.get('data', []):
+        ts = datetime.strptime(tr['transaction_date'], '%Y-%m-%d %H:%M:%S').timestamp()
+        trades.append((int(ts * 1000), float(tr['price']), float(tr['units_traded'])))
+    trades.sort(key=lambda t: t[0])
+    return trades
+
+
+class TradeDeduper:
+    """체결 API에 체결 ID가 없으므로 (시각, 가격, 수량) 기준으로 이전 응답과 겹치는 체결을 걸러낸다."""
+
+    def __init__(self):
+        self.last_ts = {}
+        self.seen = {}
+
+    def new_trades(self, coin, trades):
+        last_ts = self.last_ts.get(coin, 0)
+        seen = self.seen.get(coin, set())
+        fresh = [t for t in trades if t[0] > last_ts or (t[0] == last_ts and t not in seen)]
+        if trades:
+            newest = trades[-1][0]
+            self.last_ts[coin] = max(last_ts, newest)
+            # 같은 초에 여러 건이 있을 수 있으므로 마지막 초의 체결은 기억해 둔다
+            self.seen[coin] = {t for t in trades if t[0] == self.last_ts[coin]}
+        return fresh
+
+
+def run_recorder(markets, ticker_interval=1.0, trade_interval=2.0, root=STORE_DIR):
+    writer = MarketStoreWriter(root)
+    deduper = TradeDeduper()
+    session = requests.Session()
+
+    last_ticker = 0.0
+    last_trade = 0.0
+    last_flush = time.time()
+    last_status = time.time()
+    errors = 0
+
+    print(f"🎥 기록 시작: {', '.join(markets)} → {root}")
+    print(f"   현재가 {ticker_interval}초 / 체결 {trade_interval}초 / 저장 {FLUSH_INTERVAL}초 간격")
+    try:
+        while True:
+            now = time.time()
+
+            if now - last_ticker >= ticker_interval:
+                last_ticker = now
+                try:
+                    tickers = fetch_tickers(session)
+                    for coin in markets:
+                        if coin in tickers:
+                            ts_ms, price, volume = tickers[coin]
+                            writer.append(f"KRW-{coin}", 'ticker', ts_ms, price, volume)
+                except Exception as e:
+                    errors += 1
+                    print(f"⚠️ 현재가 수집 실패: {e}")
+
+            if now - last_trade >= trade_interval:
+                last_trade = now
+                for coin in markets:
+                    try:
+                        for ts_ms, price, volume in deduper.new_trades(coin, fetch_trades(session, coin)):
+                            writer.append(f"KRW-{coin}", 'trade', ts_ms, price, volume)
+                    except Exception as e:
+                        errors += 1
+                        print(f"⚠️ [{coin}] 체결 수집 실패: {e}")
+
+            if now - last_flush >= FLUSH_INTERVAL:
+                writer.flush()
+                last_flush = now
+
+            if now - last_status >= 600:
+                print(f"📼 {datetime.now().strftime('%H:%M:%S')} 누적 기록 {writer.rows_written:,}행 / 오류 {errors}회")
+                last_status = now
+
+            time.sleep(0.2)
+    finally:
+        writer.flush()
+        print(f"💾 기록 종료: 누적 {writer.rows_written:,}행")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='bithumbSplit 시세/체결 기록기')
+    parser.add_argument('--markets', help='기록할 코인 목록 (예: BTC,XRP). 생략 시 markets_config.json')
+    parser.add_argument('--ticker-interval', type=float, default=1.0, help='현재가 샘플 간격(초)')
+    parser.add_argument('--trade-interval', type=float, default=2.0, help='체결 조회 간격(초)')
+    parser.add_argument('--root', default=STORE_DIR, help='저장 경로')
+    args = parser.parse_args()
+
+    markets = [m.strip().upper() for m in args.markets.split(',')] if args.markets else load_markets()
+    try:
+        run_recorder(markets, args.ticker_interval, args.trade_interval, args.root)
+    except KeyboardInterrupt:
+        print("\n🛑 기록기 종료됨")
+
+
+if __name__ == '__main__':
+    main()
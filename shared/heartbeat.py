@@ -0,0 +1,149 @@
+# bithumbSplit/shared/heartbeat.py
+# 워커 → Watchdog 하트비트 채널 (로컬 UDP 데이터그램)
+# 워커는 매 루프마다 상태를 담은 데이터그램 하나를 보내고(파일 I/O 없음),
+# Watchdog은 소켓에서 바로 받아 마지막 수신 시각으로 멈춤/종료를 판단한다.
+# 거래소 장애로 한 루프가 길어져도(주문 재시도 등) 살아있음은 알 수 있도록, start_liveness()가
+# 백그라운드 스레드에서 LIVENESS_INTERVAL초마다 마지막 상태를 다시 보낸다.
+# 루프 진행은 별도 필드(progress_seq: 루프 하트비트 횟수, progress_ts: 마지막 루프 하트비트 시각)로 구분한다.
+# Windows에서도 동작하도록 유닉스 소켓 대신 127.0.0.1 UDP를 쓴다.
+# 소켓을 쓸 수 없으면(포트 사용 중 등) 기존 heartbeat_*.json 파일 감시로 대체한다.
+
+import os
+import json
+import time
+import select
+import socket
+import threading
+
+HEARTBEAT_HOST = '127.0.0.1'
+HEARTBEAT_PORT = int(os.getenv('BITHUMBSPLIT_HEARTBEAT_PORT', '47651'))
+MAX_DATAGRAM = 65507  # 지표 스냅샷 포함 (UDP 최대 크기)
+LIVENESS_INTERVAL = 5.0  # 백그라운드 살아있음 신호 주기 (초)
+
+
+class HeartbeatSender:
+    """워커 측 하트비트 송신기. 보내기 실패는 무시한다. (Watchdog 없이 단독 실행하는 경우)"""
+
+    def __init__(self, market, host=HEARTBEAT_HOST, port=HEARTBEAT_PORT):
+        self.market = market
+        self.addr = (host, port)
+        self.seq = 0
+        self.progress_seq = 0
+        self._progress_ts = None
+        self._status = None
+        self._stats = {}
+        self._sock = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def send(self, status='running', **stats):
+        """루프 하트비트 (루프 진행으로 센다)"""
+        with self._lock:
+            self.progress_seq += 1
+            self._progress_ts = time.time()
+            self._status = status
+            self._stats = stats
+            self._emit()
+
+    def start_liveness(self, interval=LIVENESS_INTERVAL):
+        """interval초마다 마지막 상태를 다시 보내는 스레드 시작 (루프 진행 필드는 그대로)"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._liveness_loop, args=(interval,),
+                                        name=f'heartbeat-{self.market}', daemon=True)
+        self._thread.start()
+
+    def _liveness_loop(self, interval):
+        while not self._stop.wait(interval):
+            with self._lock:
+                if self._status is None or self._status == 'stopped':
+                    continue
+                self._emit()
+
+    def _emit(self):
+        self.seq += 1
+        payload = {
+            "market": self.market,
+            "pid": os.getpid(),
+            "seq": self.seq,
+            "ts": time.time(),
+            "status": self._status,
+            "progress_seq": self.progress_seq,
+            "progress_ts": self._progress_ts,
+        }
+        payload.update(self._stats)
+        try:
+            if self._sock is None:
+                self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self._sock.setblocking(False)
+            self._sock.sendto(json.dumps(payload, ensure_ascii=False).encode('utf-8'), self.addr)
+        except OSError:
+            pass
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+
+class HeartbeatListener:
+    """Watchdog 측 수신기. poll()로 받은 최신 하트비트를 마켓별로 보관한다."""
+
+    def __init__(self, host=HEARTBEAT_HOST, port=HEARTBEAT_PORT):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.latest = {}  # market -> (수신 시각(monotonic), payload)
+
+    def poll(self, timeout, wake=None):
+        """
+        최대 timeout초 기다렸다가 쌓인 데이터그램을 모두 읽는다. 갱신된 마켓 목록 반환
+        :param wake: 함께 기다릴 소켓 (신호 등으로 대기를 일찍 끝낼 때). 읽힌 내용은 버린다
+        """
+        updated = []
+        watch = [self.sock] + ([wake] if wake is not None else [])
+        try:
+            ready, _, _ = select.select(watch, [], [], max(0.0, timeout))
+        except (OSError, ValueError):
+            return updated
+        if wake is not None and wake in ready:
+            try:
+                wake.recv(512)
+            except OSError:
+                pass
+        if self.sock not in ready:
+            return updated
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(MAX_DATAGRAM)
+            except BlockingIOError:
+                break
+            except OSError:
+                # Windows: 이전 sendto 대상이 없을 때 ConnectionResetError가 올 수 있다
+                break
+            try:
+                payload = json.loads(data.decode('utf-8'))
+                market = payload['market']
+            except (ValueError, KeyError, TypeError):
+                continue
+            self.latest[market] = (time.monotonic(), payload)
+            if market not in updated:
+                updated.append(market)
+        return updated
+
+    def get(self, market):
+        """(마지막 수신 후 경과 초, payload) 또는 None"""
+        entry = self.latest.get(market)
+        if entry is None:
+            return None
+        received, payload = entry
+        return time.monotonic() - received, payload
+
+    def forget(self, market):
+        self.latest.pop(market, None)
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,225 @@
+# bithumbSplit/shared/market_store.py
+# 시세/체결 기록용 컬럼 저장소 (append-only, 읽기는 mmap)
+#
+# 구조: data/market/KRW_BTC/20261019_trade.ts   (int64, epoch ms)
+#                         20261019_trade.price (float64)
+#                         20261019_trade.volume(float64)
+#       kind: 'ticker'(현재가 샘플) / 'trade'(체결)
+# 고정폭 컬럼 파일이므로 읽는 쪽은 파일을 mmap해서 memoryview로 바로 쓴다. (파싱/복사 없음)
+# 쓰는 쪽은 버퍼에 모았다가 flush()에서 세 컬럼을 같은 행 수만큼 이어 붙인다.
+# 이어 붙이기 전에 지난 기록이 중간에 끊겨 남은 컬럼 간 행 수 차이를 먼저 잘라 맞춘다.
+
+import os
+import sys
+import mmap
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 프로젝트 루트를 sys.path에 추가
+if getattr(sys, 'frozen', False):
+    base_path = Path(sys.executable).parent
+else:
+    base_path = Path(__file__).parent.parent
+
+if str(base_path) not in sys.path:
+    sys.path.insert(0, str(base_path))
+
+STORE_DIR = os.path.join(base_path, 'data', 'market')
+KINDS = ('ticker', 'trade')
+
+# 컬럼 이름 → array typecode
+COLUMNS = (('ts', 'q'), ('price', 'd'), ('volume', 'd'))
+
+
+def _market_dir(root, market):
+    return os.path.join(root, market.replace('-', '_'))
+
+
+def _day_of(ts_ms):
+    return datetime.fromtimestamp(ts_ms / 1000).strftime('%Y%m%d')
+
+
+def column_path(root, market, kind, day, column):
+    return os.path.join(_market_dir(root, market), f'{day}_{kind}.{column}')
+
+
+class MarketStoreWriter:
+    """마켓/종류/일자별 컬럼 버퍼. flush() 호출 시 파일 끝에 이어 쓴다."""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self._buffers = {}  # (market, kind, day) -> {column: array}
+        self.rows_written = 0
+
+    def append(self, market, kind, ts_ms, price, volume=0.0):
+        if kind not in KINDS:
+            raise ValueError(f"kind는 {KINDS} 중 하나여야 합니다: {kind}")
+        key = (market, kind, _day_of(ts_ms))
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = {name: array(code) for name, code in COLUMNS}
+            self._buffers[key] = buf
+        buf['ts'].append(int(ts_ms))
+        buf['price'].append(float(price))
+        buf['volume'].append(float(volume))
+
+    def pending(self):
+        return sum(len(buf['ts']) for buf in self._buffers.values())
+
+    def flush(self):
+        for key in list(self._buffers):
+            market, kind, day = key
+            buf = self._buffers[key]
+            rows = len(buf['ts'])
+            if rows:
+                os.makedirs(_market_dir(self.root, market), exist_ok=True)
+                self._align_columns(market, kind, day)
+                for name, _ in COLUMNS:
+                    with open(column_path(self.root, market, kind, day, name), 'ab') as f:
+                        buf[name].tofile(f)
+                self.rows_written += rows
+            # 기록한 버퍼만 지운다 (중간에 실패하면 남은 버퍼는 다음 flush에서 다시 기록)
+            del self._buffers[key]
+
+    def _align_columns(self, market, kind, day):
+        """
+        이전 기록이 중간에 끊겨(프로세스 종료/OSError) 컬럼 행 수가 다르면 가장 짧은 컬럼에 맞춰 자른다.
+        자르지 않고 이어 쓰면 그날 파일의 나머지 행이 모두 어긋난다 (ts의 i행과 price의 i-k행이 짝지어짐).
+        """
+        sizes = []
+        for name, code in COLUMNS:
+            path = column_path(self.root, market, kind, day, name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            sizes.append((path, size, array(code).itemsize))
+        rows = min(size // itemsize for _, size, itemsize in sizes)
+        for path, size, itemsize in sizes:
+            if size != rows * itemsize:
+                print(f"⚠️ 컬럼 행 수 불일치 → {rows}행으로 맞춤: {path} ({size // itemsize}행)")
+                with open(path, 'r+b') as f:
+                    f.truncate(rows * itemsize)
+
+
+class DayColumns:
+    """하루치 컬럼 파일을 mmap으로 연 읽기 전용 뷰 (ts/price/volume은 memoryview)"""
+
+    def __init__(self, root, market, kind, day):
+        self.market = market
+        self.kind = kind
+        self.day = day
+        self._files = []
+        self._maps = []
+        self._views = []
+        views = {}
+        for name, code in COLUMNS:
+            path = column_path(root, market, kind, day, name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            itemsize = array(code).itemsize
+            usable = size - size % itemsize
+            if usable == 0:
+                views[name] = memoryview(array(code))
+                continue
+            f = open(path, 'rb')
+            mm = mmap.mmap(f.fileno(), usable, access=mmap.ACCESS_READ)
+            self._files.append(f)
+            self._maps.append(mm)
+            views[name] = memoryview(mm).cast(code)
+            self._views.append(views[name])
+        self.rows = min(len(v) for v in views.values())
+        self.ts = views['ts'][:self.rows]
+        self.price = views['price'][:self.rows]
+        self.volume = views['volume'][:self.rows]
+
+    def __len__(self):
+        return self.rows
+
+    def close(self):
+        for view in (self.ts, self.price, self.volume, *self._views):
+            view.release()
+        self._views.clear()
+        for mm in self._maps:
+            try:
+                mm.close()
+            except BufferError:
+                pass  # 호출 측이 아직 슬라이스를 잡고 있으면 GC에 맡긴다
+        for f in self._files:
+            f.close()
+        self._maps.clear()
+        self._files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _day_range(start_day, end_day):
+    cur = datetime.strptime(start_day, '%Y%m%d')
+    end = datetime.strptime(end_day, '%Y%m%d')
+    while cur <= end:
+        yield cur.strftime('%Y%m%d')
+        cur += timedelta(days=1)
+
+
+def available_days(market, kind='trade', root=STORE_DIR):
+    """기록된 일자 목록 (오름차순)"""
+    mdir = _market_dir(root, market)
+    if not os.path.isdir(mdir):
+        return []
+    suffix = f'_{kind}.ts'
+    return sorted(name[:-len(suffix)] for name in os.listdir(mdir) if name.endswith(suffix))
+
+
+def scan(market, kind='trade', start_day=None, end_day=None, root=STORE_DIR):
+    """일자별 DayColumns를 순서대로 돌려준다. 다음 일자로 넘어가면 이전 mmap은 닫는다."""
+    days = available_days(market, kind, root)
+    if not days:
+        return
+    start_day = start_day or days[0]
+    end_day = end_day or days[-1]
+    recorded = set(days)
+    for day in _day_range(start_day, end_day):
+        if day not in recorded:
+            continue
+        cols = DayColumns(root, market, kind, day)
+        try:
+            yield cols
+        finally:
+            cols.close()
+
+
+def load_series(market, kind='trade', start_day=None, end_day=None, root=STORE_DIR):
+    """
+    구간 전체를 (timestamps(초), prices) 배열로 이어 붙인다.
+    백테스트/모의투자 입력 형식(strategy.backtest.load_price_csv)과 같다.
+    """
+    timestamps = array('d')
+    prices = array('d')
+    for cols in scan(market, kind, start_day, end_day, root):
+        timestamps.extend(t / 1000 for t in cols.ts)
+        prices.frombytes(cols.price.tobytes())
+    return timestamps, prices
+
+
+def to_candles(ts_ms, prices, volumes, interval_sec=60):
+    """체결/샘플을 (시작 ts(ms), 시가, 고가, 저가, 종가, 거래량) 봉 목록으로 집계"""
+    candles = []
+    bucket_ms = interval_sec * 1000
+    cur = None
+    for t, p, v in zip(ts_ms, prices, volumes):
+        start = t - t % bucket_ms
+        if cur is None or start != cur[0]:
+            if cur is not None:
+                candles.append(tuple(cur))
+            cur = [start, p, p, p, p, v]
+        else:
+            if p > cur[2]:
+                cur[2] = p
+            if p < cur[3]:
+                cur[3] = p
+            cur[4] = p
+            cur[5] += v
+    if cur is not None:
+        candles.append(tuple(cur))
+    return candles
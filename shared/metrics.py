@@ -0,0 +1,98 @@
+# bithumbSplit/shared/metrics.py
+# 프로세스 내 지표 수집 (히스토그램/카운터) + Prometheus 텍스트 형식 출력
+# 워커는 observe()/inc()로 모은 값을 snapshot()으로 하트비트에 실어 보내고,
+# Watchdog은 마켓별 스냅샷을 모아 /metrics 로 내보낸다. (외부 의존성 없음)
+
+import threading
+from bisect import bisect_left
+
+# 버킷 상한 (초)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOOP_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+FILL_BUCKETS = (1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        return {"b": list(self.buckets), "c": list(self.counts), "s": round(self.sum, 6), "n": self.count}
+
+
+_lock = threading.Lock()
+_histograms = {}  # name -> {label: Histogram}
+_counters = {}  # name -> {label: 값}
+
+
+def observe(name, value, label='', buckets=LATENCY_BUCKETS):
+    with _lock:
+        series = _histograms.setdefault(name, {})
+        hist = series.get(label)
+        if hist is None:
+            hist = series[label] = Histogram(buckets)
+        hist.observe(value)
+
+
+def inc(name, label='', amount=1):
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[label] = series.get(label, 0) + amount
+
+
+def snapshot():
+    """하트비트로 보낼 누적 지표 {"h": {이름: {라벨: 히스토그램}}, "c": {이름: {라벨: 값}}}"""
+    with _lock:
+        return {
+            "h": {name: {label: h.snapshot() for label, h in series.items()} for name, series in _histograms.items()},
+            "c": {name: dict(series) for name, series in _counters.items()},
+        }
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items()) + '}'
+
+
+class PrometheusWriter:
+    """Prometheus 텍스트 생성기. 같은 지표의 줄은 (마켓 순서와 관계없이) 한 묶음으로 모아 쓴다."""
+
+    def __init__(self):
+        self._families = {}  # name -> [HELP, TYPE, 샘플...] (삽입 순서 유지)
+
+    def _family(self, name, kind, help_text):
+        lines = self._families.get(name)
+        if lines is None:
+            lines = self._families[name] = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        return lines
+
+    def sample(self, name, kind, help_text, labels, value):
+        self._family(name, kind, help_text).append(f'{name}{format_labels(labels)} {float(value)!r}')
+
+    def histogram(self, name, help_text, labels, snap):
+        lines = self._family(name, 'histogram', help_text)
+        cumulative = 0
+        for bound, count in zip(snap["b"], snap["c"]):
+            cumulative += count
+            lines.append(f'{name}_bucket{format_labels({**labels, "le": f"{bound:g}"})} {cumulative}')
+        lines.append(f'{name}_bucket{format_labels({**labels, "le": "+Inf"})} {snap["n"]}')
+        lines.append(f'{name}_sum{format_labels(labels)} {float(snap["s"])!r}')
+        lines.append(f'{name}_count{format_labels(labels)} {snap["n"]}')
+
+    def text(self):
+        return '\n'.join(line for lines in self._families.values() for line in lines) + '\n'
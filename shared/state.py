@@ -1,7 +0,0 @@
-# shared/state.py
-strategy_info = {
-    "market": "-",
-    "start_price": 0.0,
-    "current_price": 0.0,
-    "realized_profit": 0.0
-}
\ No newline at end of file
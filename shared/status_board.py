@@ -0,0 +1,266 @@
+# bithumbSplit/shared/status_board.py
+# 프로세스 간 공유 상태판 (mmap 고정 레이아웃, 마켓당 슬롯 1개)
+# 워커가 매 루프 자기 슬롯에 가격/차수/수익/미체결 수를 쓰고,
+# GUI와 Watchdog은 파일 파싱이나 거래소 조회 없이 메모리에서 바로 읽는다.
+#
+# 쓰기는 잠금 없이 seqlock 방식: 슬롯 seq를 홀수로 올리고 → 값 기록 → 짝수로 올린다.
+# 읽는 쪽은 seq가 홀수이거나 읽기 전후 seq가 다르면 다시 읽는다. (슬롯마다 쓰는 프로세스는 하나)
+#
+# 파일: logs/status_board.bin (모의투자 기록 재생은 logs/paper/)
+#   헤더 64바이트: magic(8) version(4) slot_count(4) slot_size(4)
+#   슬롯 128바이트 × MAX_SLOTS
+
+import os
+import sys
+import mmap
+import time
+import struct
+import threading
+from datetime import datetime
+from pathlib import Path
+
+# 프로젝트 루트를 sys.path에 추가
+if getattr(sys, 'frozen', False):
+    base_path = Path(sys.executable).parent
+else:
+    base_path = Path(__file__).parent.parent
+
+BOARD_DIR = os.path.join(base_path, 'logs')
+BOARD_FILENAME = 'status_board.bin'
+MAGIC = b'BSPLITSB'
+VERSION = 1
+MAX_SLOTS = 32
+HEADER = struct.Struct('<8sIII')
+HEADER_SIZE = 64
+SLOT_SIZE = 128
+
+# seq, market, pid, status, updated, last_price, start_price, realized_profit,
+# level, max_levels, open_orders, interval
+SLOT = struct.Struct('<Q16siiddddiiii')
+SEQ = struct.Struct('<Q')
+FIELDS = ('market', 'pid', 'status', 'updated', 'last_price', 'start_price', 'realized_profit',
+          'level', 'max_levels', 'open_orders', 'interval')
+
+STATUS_EMPTY = 0
+STATUS_RUNNING = 1
+STATUS_STOPPED = 2
+STATUS_NAMES = {STATUS_EMPTY: 'empty', STATUS_RUNNING: 'running', STATUS_STOPPED: 'stopped'}
+
+LOCK_TIMEOUT = 2.0  # 슬롯 할당 잠금 대기 (초)
+LOCK_STALE = 5.0  # 이보다 오래된 잠금 파일은 죽은 프로세스의 것으로 보고 제거
+
+_boards = {}
+_boards_lock = threading.Lock()
+
+
+class StatusBoard:
+    def __init__(self, path):
+        self.path = path
+        self.size = HEADER_SIZE + MAX_SLOTS * SLOT_SIZE
+        self._alloc_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            if os.fstat(fd).st_size < self.size:
+                os.ftruncate(fd, self.size)
+            self.mm = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+        magic, version, slots, slot_size = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            HEADER.pack_into(self.mm, 0, MAGIC, VERSION, MAX_SLOTS, SLOT_SIZE)
+        elif (version, slots, slot_size) != (VERSION, MAX_SLOTS, SLOT_SIZE):
+            raise ValueError(f"상태판 형식이 다릅니다: {path} (version={version}, slots={slots})")
+
+    def _offset(self, index):
+        return HEADER_SIZE + index * SLOT_SIZE
+
+    def read_slot(self, index, retries=100):
+        """seqlock 읽기. 쓰는 중이면 다시 읽고, 끝내 일관된 값을 못 얻으면 None"""
+        off = self._offset(index)
+        for _ in range(retries):
+            raw = self.mm[off:off + SLOT.size]
+            seq = SEQ.unpack_from(raw, 0)[0]
+            if seq & 1:
+                continue
+            if SEQ.unpack_from(self.mm, off)[0] != seq:
+                continue
+            values = SLOT.unpack(raw)
+            slot = dict(zip(FIELDS, values[1:]))
+            slot['market'] = slot['market'].rstrip(b'\0').decode('ascii', 'replace')
+            slot['seq'] = seq
+            slot['index'] = index
+            return slot
+        return None
+
+    def read_all(self):
+        """사용 중인 슬롯 목록"""
+        slots = []
+        for index in range(MAX_SLOTS):
+            slot = self.read_slot(index)
+            if slot and slot['market']:
+                slots.append(slot)
+        return slots
+
+    def read(self, market):
+        for slot in self.read_all():
+            if slot['market'] == market:
+                return slot
+        return None
+
+    def _find_index(self, market):
+        name = market.encode('ascii')
+        for index in range(MAX_SLOTS):
+            off = self._offset(index) + SEQ.size
+            if self.mm[off:off + 16].rstrip(b'\0') == name:
+                return index
+        return None
+
+    def writer(self, market):
+        """마켓 슬롯 쓰기 핸들 (없으면 빈 슬롯 할당)"""
+        if len(market.encode('ascii')) > 16:
+            raise ValueError(f"마켓 이름이 너무 깁니다: {market}")
+        with self._alloc_lock, _FileLock(self.path + '.lock'):
+            index = self._find_index(market)
+            if index is None:
+                index = self._find_index('')
+                if index is None:
+                    raise RuntimeError(f"상태판 슬롯이 가득 찼습니다 ({MAX_SLOTS}개)")
+                off = self._offset(index)
+                self.mm[off + SEQ.size:off + SEQ.size + 16] = market.encode('ascii').ljust(16, b'\0')
+        return SlotWriter(self, index, market)
+
+
+class SlotWriter:
+    """한 마켓 슬롯의 단일 작성자. update()는 바뀐 필드만 받아 슬롯 전체를 다시 쓴다."""
+
+    def __init__(self, board, index, market):
+        self.board = board
+        self.index = index
+        self.off = board._offset(index)
+        self.seq = SEQ.unpack_from(board.mm, self.off)[0]
+        self.seq += self.seq & 1  # 이전 작성자가 쓰다 죽었으면 짝수로 맞춘다
+        self.values = {
+            'market': market.encode('ascii'), 'pid': os.getpid(), 'status': STATUS_RUNNING,
+            'updated': 0.0, 'last_price': 0.0, 'start_price': 0.0, 'realized_profit': 0.0,
+            'level': 0, 'max_levels': 0, 'open_orders': 0, 'interval': 0,
+        }
+
+    def update(self, **fields):
+        values = self.values
+        values.update(fields)
+        values['updated'] = time.time()
+        mm = self.board.mm
+        SEQ.pack_into(mm, self.off, self.seq + 1)
+        SLOT.pack_into(mm, self.off, self.seq + 1, *(values[name] for name in FIELDS))
+        self.seq += 2
+        SEQ.pack_into(mm, self.off, self.seq)
+
+    def close(self):
+        self.update(status=STATUS_STOPPED)
+
+
+class _FileLock:
+    """슬롯 할당용 프로세스 간 잠금 (배타적 생성 잠금 파일)"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        deadline = time.time() + LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > LOCK_STALE:
+                        os.remove(self.path)
+                        continue
+                except OSError:
+                    pass
+                if time.time() > deadline:
+                    raise TimeoutError(f"상태판 잠금 대기 시간 초과: {self.path}")
+                time.sleep(0.01)
+
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class BoardWatcher:
+    """
+    상태판 변경 구독 (GUI용). 백그라운드 스레드가 슬롯을 메모리에서 읽어
+    표시 필드나 실행 여부가 바뀐 때만 on_change(live_slots)를 부른다. (매 루프 갱신 시각만 바뀐 경우는 무시)
+    """
+
+    WATCH_FIELDS = ('market', 'pid', 'status', 'last_price', 'start_price', 'realized_profit',
+                    'level', 'max_levels', 'open_orders')
+
+    def __init__(self, board, on_change, interval=0.25, max_age=120):
+        self.board = board
+        self.on_change = on_change
+        self.interval = interval
+        self.max_age = max_age
+        self._signature = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="status-board-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def poll(self):
+        """한 번 확인. 바뀌었으면 on_change 호출 후 True"""
+        live = [slot for slot in self.board.read_all() if is_live(slot, self.max_age)]
+        signature = tuple(tuple(slot[name] for name in self.WATCH_FIELDS) for slot in live)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        self.on_change(live)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️ 상태판 감시 오류: {e}")
+
+
+def get_board(directory=BOARD_DIR):
+    """디렉터리별 상태판 (프로세스 안에서 하나만 연다)"""
+    path = os.path.join(directory, BOARD_FILENAME)
+    with _boards_lock:
+        board = _boards.get(path)
+        if board is None:
+            board = _boards[path] = StatusBoard(path)
+        return board
+
+
+def is_live(slot, max_age=120):
+    """실행 중이고 max_age초 안에 갱신된 슬롯인지"""
+    return bool(slot) and slot['status'] == STATUS_RUNNING and time.time() - slot['updated'] <= max_age
+
+
+def as_heartbeat(slot):
+    """슬롯을 기존 하트비트 dict 형식으로 (Watchdog 상태 출력/리포트용)"""
+    return {
+        "market": slot['market'],
+        "pid": slot['pid'],
+        "timestamp": datetime.fromtimestamp(slot['updated']).isoformat(),
+        "status": STATUS_NAMES.get(slot['status'], 'unknown'),
+        "realized_profit": slot['realized_profit'],
+        "last_buy_level": slot['level'],
+        "pending_orders": slot['open_orders'],
+        "last_price": slot['last_price'],
+        "start_price": slot['start_price'],
+        "interval": slot['interval'],
+    }
@@ -3,11 +3,12 @@
 # 1차수 매수 체결 → 매도 체결 → 다시 1차수 매수 무한 반복 전략
 
 import time
-import math
+from time import perf_counter
 from datetime import datetime
 import json
 import os
 import sys
+import hashlib
 from pathlib import Path
 
 # 프로젝트 루트를 sys.path에 추가
@@ -19,10 +20,28 @@ else:
 if str(base_path) not in sys.path:
     sys.path.insert(0, str(base_path))
 
-from api.api import place_order, get_order_detail, cancel_order_by_uuid
+from api.api import place_order, get_order_detail, cancel_order_by_uuid, get_order_by_identifier, is_order_not_found
+from api.order_cache import order_data
 from config.tick_table import TICK_SIZE
+from strategy.grid import build_grid_prices, level_profit
 from utils.telegram import send_telegram_message, MSG_AUTO_TRADE_START, MSG_BUY_ORDER, MSG_SELL_ORDER, MSG_BUY_FILLED, MSG_SELL_FILLED
-from shared.state import strategy_info
+from utils.logger import TradeLogger
+from utils import startup
+from shared.status_board import get_board
+from shared.heartbeat import HeartbeatSender
+from shared import metrics
+
+# 상태 파일/상태판 폴더 (모의투자 모드에서는 api.paper.install()이 실계좌 파일과 분리한다)
+STATE_SUBDIR = 'logs'
+HEARTBEAT_SUBDIR = 'logs'
+# 매 루프 Watchdog에 하트비트 데이터그램 전송 (기록 재생 모의투자에서는 끈다)
+HEARTBEAT_SOCKET = True
+
+_loggers = {}
+_submit_hooks = {}  # market -> 주문 전송 직전에 부르는 상태 저장 함수 (run_auto_trade가 등록)
+
+OPEN_ORDER_STATES = ('wait', 'watch')
+
 
 # 상태 저장 파일 경로 헬퍼 (PyInstaller exe 포함)
 def _base_dir():
@@ -35,11 +54,20 @@ def _state_path(market='KRW-BTC'):
     try:
         # 파일명에 코인 정보 포함 (예: autotrade_state_KRW_BTC.json)
         filename = f'autotrade_state_{market.replace("-", "_")}.json'
-        return os.path.join(_base_dir(), 'logs', filename)
+        return os.path.join(_base_dir(), STATE_SUBDIR, filename)
     except Exception as e:
         print(f"⚠️ 상태 경로 계산 실패, 현재 작업 경로로 대체: {e}")
         filename = f'autotrade_state_{market.replace("-", "_")}.json'
-        return os.path.join(os.getcwd(), 'logs', filename)
+        return os.path.join(os.getcwd(), STATE_SUBDIR, filename)
+
+
+def _log(market='KRW-BTC'):
+    """마켓별 구조화 로그 (상태 파일과 같은 폴더의 trade_KRW_BTC.jsonl)"""
+    path = os.path.join(_base_dir(), STATE_SUBDIR, f'trade_{market.replace("-", "_")}.jsonl')
+    log = _loggers.get(path)
+    if log is None:
+        log = _loggers[path] = TradeLogger(path, market=market)
+    return log
 
 
 def _ensure_state_dir(market='KRW-BTC'):
@@ -53,7 +81,7 @@ def _load_state(market='KRW-BTC'):
     except FileNotFoundError:
         return None
     except Exception as e:
-        print(f"⚠️ 상태 파일 로드 실패: {e}")
+        _log(market).warning("⚠️ 상태 파일 로드 실패: {error}", event='state_load_failed', error=str(e))
         return None
 
 
@@ -62,9 +90,9 @@ def _save_state(state: dict, market='KRW-BTC'):
         _ensure_state_dir(market)
         with open(_state_path(market), 'w', encoding='utf-8') as f:
             json.dump(state, f, ensure_ascii=False, indent=2)
-        print(f"💾 상태 저장: {_state_path(market)}")
+        _log(market).debug("💾 상태 저장", event='state_saved')
     except Exception as e:
-        print(f"⚠️ 상태 파일 저장 실패: {e}")
+        _log(market).error("⚠️ 상태 파일 저장 실패: {error}", event='state_save_failed', error=str(e))
 
 
 def _serialize_levels(levels):
@@ -79,6 +107,10 @@ def _serialize_levels(levels):
             "sell_uuid": level.sell_uuid,
             "buy_filled": level.buy_filled,
             "sell_filled": level.sell_filled,
+            "buy_gen": level.buy_gen,
+            "sell_gen": level.sell_gen,
+            "buy_pending": level.buy_pending,
+            "sell_pending": level.sell_pending,
         })
     return serialized
 
@@ -91,18 +123,40 @@ def _build_levels(state_levels):
         g.sell_uuid = lv.get("sell_uuid")
         g.buy_filled = lv.get("buy_filled", False)
         g.sell_filled = lv.get("sell_filled", False)
+        g.buy_gen = lv.get("buy_gen", 0)
+        g.sell_gen = lv.get("sell_gen", 0)
+        g.buy_pending = lv.get("buy_pending")
+        g.sell_pending = lv.get("sell_pending")
         levels.append(g)
     return levels
 
 
-def _safe_get_order_detail(order_uuid):
+def _safe_get_order_detail(order_uuid, market='KRW-BTC'):
     try:
-        return get_order_detail(order_uuid)
+        return get_order_detail(order_uuid, market=market)
     except Exception as e:
-        print(f"⚠️ 주문 조회 실패: {order_uuid} / {e}")
+        _log(market).warning("⚠️ 주문 조회 실패: {uuid} / {error}", event='order_detail_failed', uuid=order_uuid, error=str(e))
         return {"status": "9999", "message": str(e)}
 
 
+def _fill_detection_latency(data):
+    """체결 감지 지연(초): 거래소 체결 시각(trades의 가장 늦은 created_at)부터 지금까지. 알 수 없으면 None"""
+    trades = data.get('trades') if isinstance(data, dict) else None
+    if not trades:
+        return None
+    latest = None
+    for trade in trades:
+        try:
+            ts = datetime.fromisoformat(str(trade.get('created_at'))).timestamp()
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if latest is None or ts > latest:
+            latest = ts
+    if latest is None:
+        return None
+    return max(0.0, time.time() - latest)
+
+
 def _safe_float(value, default=0.0):
     try:
         return float(value)
@@ -153,25 +207,61 @@ def _params_match(state, market, start_price, krw_amount, max_levels, buy_gap, b
         state.get("sell_mode") == sell_mode
     )
 
-# 가격 계산 함수: 퍼센트 또는 고정 금액으로 가격 조정
-# mode: 'percent' 또는 'price'
-def calculate_price(base_price, gap_value, mode, direction):
-    if mode == 'percent':
-        rate = (1 + gap_value / 100) if direction == 'up' else (1 - gap_value / 100)
-        return round(base_price * rate, 2)
-    elif mode == 'price':
-        return round(base_price + gap_value, 2) if direction == 'up' else round(base_price - gap_value, 2)
+def make_grid_id(market, start_price, krw_amount, max_levels, buy_gap, buy_mode, sell_gap, sell_mode, started):
+    """그리드 식별자 (설정 + 새 시작 시각의 해시 8자리). 상태 파일에 저장해 재시작 후에도 같은 값을 쓴다"""
+    key = f"{market}|{start_price}|{krw_amount}|{max_levels}|{buy_gap}|{buy_mode}|{sell_gap}|{sell_mode}|{started}"
+    return hashlib.sha1(key.encode()).hexdigest()[:8]
+
+
+def client_order_id(grid_id, market, level, side, gen):
+    """클라이언트 주문 ID: (마켓, 그리드, 차수, 방향, 세대). 예: bs-BTC-3f9a1c2e-12b-4"""
+    return f"bs-{market.split('-')[-1]}-{grid_id}-{level}{'b' if side == 'bid' else 's'}-{gen}"
+
+
+def _submit_id(level, side, market):
+    """
+    새 주문의 클라이언트 주문 ID를 만들고 (세대 +1) 전송 전 상태 파일에 남긴다.
+    응답을 받기 전에 죽어도 재시작 시 *_pending ID로 그 주문을 정확히 찾을 수 있다.
+    아직 확정하지 못한 pending ID가 있으면 세대를 올리지 않고 그 ID를 다시 쓴다.
+    (먼저 나간 주문이 거래소에 있으면 중복 ID로 거절되고 place_order가 그 주문을 연결하므로 두 번 주문되지 않는다)
+    """
+    if side == 'bid':
+        if not level.buy_pending:
+            level.buy_gen += 1
+            level.buy_pending = client_order_id(level.grid_id, market, level.level, side, level.buy_gen)
+        identifier = level.buy_pending
     else:
-        raise ValueError("mode는 'percent' 또는 'price' 여야 합니다.")
+        if not level.sell_pending:
+            level.sell_gen += 1
+            level.sell_pending = client_order_id(level.grid_id, market, level.level, side, level.sell_gen)
+        identifier = level.sell_pending
+    hook = _submit_hooks.get(market)
+    if hook:
+        hook()
+    return identifier
+
+
+def _settle_pending(level, side, res):
+    """전송 결과가 확정되면(주문 uuid 받음 또는 거래소 거절) pending 해제. 네트워크 실패는 남겨 두고 나중에 조회"""
+    if order_data(res).get('uuid') or (isinstance(res, dict) and res.get('error')):
+        if side == 'bid':
+            level.buy_pending = None
+        else:
+            level.sell_pending = None
+
 
 # 주문 등록 함수: 매수 또는 매도 주문을 API를 통해 실행
 def place_buy(level, market):
     """매수 주문 등록 후 성공 여부 반환"""
-    res = place_order(market, 'bid', level.volume, level.buy_price, 'limit')
+    identifier = _submit_id(level, 'bid', market) if level.grid_id else None
+    res = place_order(market, 'bid', level.volume, level.buy_price, 'limit', identifier=identifier)
+    _settle_pending(level, 'bid', res)
     uuid = res.get('uuid') or res.get('data', {}).get('uuid')
     if uuid:
         level.buy_uuid = uuid
-        print(f"🛒 [{level.level}차] 매수 주문 등록: {level.buy_price}원 / {level.volume}개")
+        _log(market).info("🛒 [{level}차] 매수 주문 등록: {price}원 / {volume}개", event='buy_order',
+                          level=level.level, price=level.buy_price, volume=level.volume, uuid=uuid,
+                          identifier=identifier)
         order_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         send_telegram_message(
             MSG_BUY_ORDER.format(
@@ -180,22 +270,27 @@ def place_buy(level, market):
                 buy_price=level.buy_price,
                 volume=level.volume,
                 order_time=order_time,
-            )
+            ),
+            market=market,
         )
         return True
 
-    error_msg = json.dumps(res, indent=4, ensure_ascii=False)
-    print(f"❌ 매수 주문 실패 [{level.level}차]:\n{error_msg}")
-    send_telegram_message(f"❌ [{level.level}차] 매수 주문 실패\n📍코인: {market}\n사유: {res}")
+    _log(market).error("❌ 매수 주문 실패 [{level}차]: {response}", event='buy_order_failed',
+                       level=level.level, price=level.buy_price, volume=level.volume, response=res)
+    send_telegram_message(f"❌ [{level.level}차] 매수 주문 실패\n📍코인: {market}\n사유: {res}", critical=True)
     return False
 
 def place_sell(level, market):
     """매도 주문 등록 후 성공 여부 반환"""
-    res = place_order(market, 'ask', level.volume, level.sell_price, 'limit')
+    identifier = _submit_id(level, 'ask', market) if level.grid_id else None
+    res = place_order(market, 'ask', level.volume, level.sell_price, 'limit', identifier=identifier)
+    _settle_pending(level, 'ask', res)
     uuid = res.get('uuid') or res.get('data', {}).get('uuid')
     if uuid:
         level.sell_uuid = uuid
-        print(f"📤 [{level.level}차] 매도 주문 등록: {level.sell_price}원 / {level.volume}개")
+        _log(market).info("📤 [{level}차] 매도 주문 등록: {price}원 / {volume}개", event='sell_order',
+                          level=level.level, price=level.sell_price, volume=level.volume, uuid=uuid,
+                          identifier=identifier)
         order_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         send_telegram_message(
             MSG_SELL_ORDER.format(
@@ -204,13 +299,14 @@ def place_sell(level, market):
                 sell_price=level.sell_price,
                 volume=level.volume,
                 order_time=order_time,
-            )
+            ),
+            market=market,
         )
         return True
 
-    error_msg = json.dumps(res, indent=4, ensure_ascii=False)
-    print(f"❌ 매도 주문 실패 [{level.level}차]:\n{error_msg}")
-    send_telegram_message(f"❌ [{level.level}차] 매도 주문 실패\n📍코인: {market}\n사유: {res}")
+    _log(market).error("❌ 매도 주문 실패 [{level}차]: {response}", event='sell_order_failed',
+                       level=level.level, price=level.sell_price, volume=level.volume, response=res)
+    send_telegram_message(f"❌ [{level.level}차] 매도 주문 실패\n📍코인: {market}\n사유: {res}", critical=True)
     return False
 
 # 그리드 레벨 클래스: 각 차수의 매수/매도 가격과 수량을 관리
@@ -225,6 +321,11 @@ class GridLevel:
         self.sell_uuid = None
         self.buy_filled = False
         self.sell_filled = False
+        self.grid_id = None  # 클라이언트 주문 ID용 (run_auto_trade가 지정)
+        self.buy_gen = 0  # 이 차수·방향으로 낸 주문 수 (클라이언트 주문 ID의 세대)
+        self.sell_gen = 0
+        self.buy_pending = None  # 응답을 아직 확정하지 못한 주문의 클라이언트 주문 ID
+        self.sell_pending = None
 
 # 자동 매매 실행 함수: 시작 가격, 원화 금액, 최대 차수, 매수/매도 간격 등을 설정
 def run_auto_trade(start_price, krw_amount, max_levels,
@@ -235,9 +336,10 @@ def run_auto_trade(start_price, krw_amount, max_levels,
 
     market_code = market_code.upper()
     market = f"KRW-{market_code}"
+    log = _log(market)
     tick = TICK_SIZE.get(market)
     if tick is None:
-        print(f"❌ 호가단위가 정의되지 않은 종목입니다: {market}")
+        log.error("❌ 호가단위가 정의되지 않은 종목입니다: {market}", event='unknown_tick')
         return
     
     # resume_level 처리: 0이면 새 시작 또는 상태 파일 복원, 1 이상이면 수동 재시작
@@ -257,46 +359,46 @@ def run_auto_trade(start_price, krw_amount, max_levels,
         saved_trade_history = resume_state.get("trade_history", [])
         if saved_trade_history:
             recalculated_profit = sum(trade.get("profit", 0) for trade in saved_trade_history)
-            print(f"📊 체결 이력: {len(saved_trade_history)}건 / 재계산 수익: {recalculated_profit:,.0f}원")
+            log.info("📊 체결 이력: {trades}건 / 재계산 수익: {profit:,.0f}원", event='history_loaded',
+                     trades=len(saved_trade_history), profit=recalculated_profit)
             
             # realized_profit 불일치 시 체결 이력 기반으로 복구
             if abs(realized_profit - recalculated_profit) > 1:
-                print(f"⚠️ 누적 수익 불일치 - 체결 이력으로 복구: {realized_profit:,.0f}원 → {recalculated_profit:,.0f}원")
+                log.warning("⚠️ 누적 수익 불일치 - 체결 이력으로 복구: {saved:,.0f}원 → {profit:,.0f}원",
+                            event='profit_recovered', saved=realized_profit, profit=recalculated_profit)
                 realized_profit = recalculated_profit
         
-        print(f"⏯️ 기존 상태 발견. {market} / {len(levels)}차 재개 / 누적 수익: {realized_profit:,.0f}원")
+        log.info("⏯️ 기존 상태 발견. {market} / {levels}차 재개 / 누적 수익: {profit:,.0f}원", event='state_resumed',
+                 levels=len(levels), profit=realized_profit)
+        grid_id = resume_state.get("grid_id")
     else:
         realized_profit = 0.0
         # 차수별 그리드 레벨 생성
-        levels = []
-        for i in range(max_levels):
-            raw_buy_price = calculate_price(start_price, buy_gap * i, buy_mode, 'down')
-            raw_sell_price = calculate_price(raw_buy_price, sell_gap, sell_mode, 'up')
-            buy_price = math.floor(raw_buy_price / tick) * tick
-            sell_price = math.floor(raw_sell_price / tick) * tick
-            volume = round(krw_amount / buy_price, 8)
-            levels.append(GridLevel(i + 1, buy_price, sell_price, volume))
-
-        # 신규 시작 시 초기 주문 즉시 등록 (헬스체크 대기 없이)
-        try:
-            if manual_resume and 1 <= resume_level <= max_levels:
-                # 재가동 차수 기준: 해당 차수 매도 + 다음 차수 매수 등록
-                sell_target = levels[resume_level - 1] if resume_level - 1 >= 0 else None
-                buy_target = levels[resume_level] if resume_level < len(levels) else None
-                place_pair_orders(sell_target=sell_target, buy_target=buy_target)
-            else:
-                # 기본: 1차 매수부터 시작
-                place_buy(levels[0], market)
-            persist_state()
-        except Exception as e:
-            print(f"⚠️ 초기 주문 등록 실패: {e}")
+        levels = [
+            GridLevel(lv, buy_price, sell_price, volume)
+            for lv, buy_price, sell_price, volume in build_grid_prices(
+                start_price, krw_amount, max_levels, buy_gap, buy_mode, sell_gap, sell_mode, tick)
+        ]
+
+        grid_id = None
+        # 초기 주문(1차 매수 또는 수동 재시작 차수)은 아래에서 상태 저장 함수가 준비된 뒤 한 번만 등록한다
+
+    if not grid_id:
+        # 새 그리드 (또는 클라이언트 주문 ID 도입 전 상태 파일): 이후 주문부터 ID를 붙인다
+        grid_id = make_grid_id(market, start_price, krw_amount, max_levels,
+                               buy_gap, buy_mode, sell_gap, sell_mode, time.time())
+    for level in levels:
+        level.grid_id = grid_id
 
-    strategy_info.update({
-        "market": market,
-        "start_price": start_price,
-        "current_price": start_price,
-        "realized_profit": realized_profit,
-    })
+    # 프로세스 간 상태판 슬롯 (GUI/Watchdog이 읽음)
+    last_price = start_price
+    status_slot = None
+    try:
+        status_slot = get_board(os.path.join(_base_dir(), HEARTBEAT_SUBDIR)).writer(market)
+        status_slot.update(pid=os.getpid(), start_price=start_price, max_levels=max_levels,
+                           last_price=last_price, realized_profit=realized_profit, interval=sleep_sec)
+    except Exception as e:
+        log.warning("⚠️ 상태판 열기 실패: {error}", event='status_board_failed', error=str(e))
 
     # 콜백 중복 방지용 플래그
     callback_flags = {'buy': set(), 'sell': set()}
@@ -310,7 +412,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
             from api.api import get_order_list
             order_list = get_order_list(market=market, limit=100)
         except Exception as e:  # 네트워크 오류 등은 빈 결과로 처리
-            print(f"⚠️ 활성 주문 조회 실패: {e}")
+            log.warning("⚠️ 활성 주문 조회 실패: {error}", event='order_list_failed', error=str(e))
             return {}, None
 
         active_orders = {}
@@ -323,6 +425,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                     'side': order.get('side'),
                     'price': float(order.get('price', 0) or 0),
                     'volume': float(order.get('volume', 0) or 0),
+                    'identifier': order.get('identifier'),
                 }
         return active_orders, order_list if isinstance(order_list, list) else None
 
@@ -340,27 +443,93 @@ def run_auto_trade(start_price, krw_amount, max_levels,
             return uuid
         return None
 
+    def lookup_identifier(identifier):
+        """
+        클라이언트 주문 ID로 거래소 주문 조회 → (uuid, state)
+        거래소가 주문이 없다고 확정하면(order_not_found) (None, 'missing'),
+        그 밖의 실패(네트워크/expired_jwt/인증/요청 제한 등)는 (None, None) - pending ID를 유지한다
+        """
+        try:
+            res = get_order_by_identifier(identifier, market)
+        except Exception as e:
+            res = {"status": "9999", "message": str(e)}
+        data = order_data(res)
+        if data.get('uuid'):
+            return data['uuid'], data.get('state')
+        if is_order_not_found(res):
+            return None, 'missing'
+        log.warning("⚠️ 클라이언트 주문 ID 조회 실패: {identifier} / {response}", event='identifier_lookup_failed',
+                    identifier=identifier, response=res)
+        return None, None
+
+    def match_active_order(active_orders, lvl, side):
+        """
+        차수의 현재 주문을 미체결 목록에서 찾는다: 저장된 uuid → 클라이언트 주문 ID(목록 또는 거래소 조회).
+        ID 없이 올라간 예전 주문(세대 0)만 가격·수량 근사 매칭을 쓴다.
+        """
+        tracked = lvl.buy_uuid if side == 'bid' else lvl.sell_uuid
+        if tracked and tracked in active_orders:
+            return tracked
+        gen = lvl.buy_gen if side == 'bid' else lvl.sell_gen
+        if not gen:
+            price = lvl.buy_price if side == 'bid' else lvl.sell_price
+            return find_matching_order(active_orders, side, price, lvl.volume)
+        identifier = client_order_id(grid_id, market, lvl.level, side, gen)
+        for uuid, info in active_orders.items():
+            if info.get('identifier') == identifier:
+                return uuid
+        if tracked:
+            return None  # uuid를 알고 있는데 목록에 없음 → 체결/취소된 주문
+        uuid, state = lookup_identifier(identifier)  # 목록에 identifier가 없는 응답 형식 대비
+        return uuid if uuid in active_orders and state in OPEN_ORDER_STATES else None
+
+    def resolve_pending(lvl, side):
+        """응답을 확정하지 못한 주문을 클라이언트 주문 ID로 정확히 조회해 uuid를 연결한다. 연결하면 True"""
+        identifier = lvl.buy_pending if side == 'bid' else lvl.sell_pending
+        if not identifier:
+            return False
+        uuid, state = lookup_identifier(identifier)
+        if state is None:
+            return False  # 조회 실패 → 다음 확인 때 다시
+        attached = bool(uuid) and state in OPEN_ORDER_STATES + ('done',)
+        if side == 'bid':
+            lvl.buy_pending = None
+            if attached:
+                lvl.buy_uuid = uuid
+        else:
+            lvl.sell_pending = None
+            if attached:
+                lvl.sell_uuid = uuid
+        return attached
+
     def reattach_missing_orders():
         """상태에 uuid가 없지만 실제 주문이 남아있다면 다시 연결한다."""
-        active_orders, order_list = build_active_orders()
-        if not active_orders:
-            return set(), order_list
-
         attached_levels = set()
+        # 전송 도중 끊긴 주문: 클라이언트 주문 ID로 정확히 조회 (목록 조회/근사 매칭 불필요)
         for level in levels:
-            if not level.buy_filled and not level.buy_uuid:
+            if level.buy_pending and resolve_pending(level, 'bid'):
+                attached_levels.add(f"{level.level}차 매수")
+            if level.sell_pending and resolve_pending(level, 'ask'):
+                attached_levels.add(f"{level.level}차 매도")
+
+        active_orders, order_list = build_active_orders()
+        for level in levels:
+            if not active_orders:
+                break
+            # ID 없이 올라간 예전 주문만 가격·수량으로 재연결
+            if not level.buy_filled and not level.buy_uuid and not level.buy_gen:
                 matched = find_matching_order(active_orders, 'bid', level.buy_price, level.volume)
                 if matched:
                     level.buy_uuid = matched
                     attached_levels.add(f"{level.level}차 매수")
-            if not level.sell_filled and not level.sell_uuid:
+            if not level.sell_filled and not level.sell_uuid and not level.sell_gen:
                 matched = find_matching_order(active_orders, 'ask', level.sell_price, level.volume)
                 if matched:
                     level.sell_uuid = matched
                     attached_levels.add(f"{level.level}차 매도")
 
         if attached_levels:
-            print(f"🔗 누락 uuid 복구: {', '.join(sorted(attached_levels))}")
+            log.info("🔗 누락 uuid 복구: {levels}", event='uuid_reattached', levels=', '.join(sorted(attached_levels)))
             persist_state()
         return attached_levels, order_list
     
@@ -376,30 +545,55 @@ def run_auto_trade(start_price, krw_amount, max_levels,
             "sell_mode": sell_mode,
             "sleep_sec": sleep_sec,
             "realized_profit": realized_profit,
+            "grid_id": grid_id,
             "levels": _serialize_levels(levels),
             "trade_history": trade_history,  # 체결 이력 추가
             "last_updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         }
         _save_state(snapshot, market)
 
-    def _write_heartbeat():
-        """주기적으로 헬스 상태를 파일에 기록 (외부 Watchdog 감시용)"""
+    _submit_hooks[market] = persist_state
+
+    heartbeat_sender = HeartbeatSender(market) if HEARTBEAT_SOCKET else None
+
+    def _open_orders_snapshot(limit=20):
+        """미체결 주문 요약 [side, 가격, 수량, 차수] (Watchdog 정기 리포트가 API 조회 없이 사용). limit=None이면 전부"""
+        orders = []
+        for lv in levels:
+            if lv.sell_uuid and not lv.sell_filled:
+                orders.append(['ask', lv.sell_price, lv.volume, lv.level])
+            if lv.buy_uuid and not lv.buy_filled:
+                orders.append(['bid', lv.buy_price, lv.volume, lv.level])
+        return orders[:limit] if limit else orders
+
+    def _heartbeat_stats():
+        return {
+            "realized_profit": realized_profit,
+            "last_buy_level": next((lv.level for lv in reversed(levels) if lv.buy_filled), 0),
+            "pending_orders": sum(1 for lv in levels if lv.buy_uuid or lv.sell_uuid),
+            "open_orders": _open_orders_snapshot(),
+            "interval": sleep_sec,
+            "metrics": metrics.snapshot(),
+        }
+
+    def _send_heartbeat(status='running'):
+        """Watchdog에 루프 진행 신호 전송 (데이터그램 한 개, 매 루프). 살아있음 신호는 백그라운드 스레드가 이어서 보낸다"""
+        if heartbeat_sender:
+            heartbeat_sender.send(status, **_heartbeat_stats())
+
+    def _publish_status():
+        """상태판 슬롯 갱신 (매 루프, 메모리 쓰기만 - 소켓을 못 쓰는 Watchdog / GUI / --status 조회용)"""
+        if not status_slot:
+            return
         try:
-            heartbeat_file = os.path.join(_base_dir(), 'logs', f'heartbeat_{market.replace("-", "_")}.json')
-            _ensure_state_dir(market)
-            
-            heartbeat = {
-                "market": market,
-                "timestamp": datetime.now().isoformat(),
-                "status": "running",
-                "realized_profit": realized_profit,
-                "last_buy_level": next((lv.level for lv in reversed(levels) if lv.buy_filled), 0),
-                "pending_orders": sum(1 for lv in levels if lv.buy_uuid or lv.sell_uuid),
-            }
-            with open(heartbeat_file, 'w', encoding='utf-8') as f:
-                json.dump(heartbeat, f, ensure_ascii=False, indent=2)
+            status_slot.update(
+                last_price=last_price,
+                realized_profit=realized_profit,
+                level=next((lv.level for lv in reversed(levels) if lv.buy_filled), 0),
+                open_orders=len(_open_orders_snapshot(limit=None)),
+            )
         except Exception as e:
-            print(f"⚠️ 헬스 하트비트 저장 실패: {e}")
+            log.warning("⚠️ 상태판 갱신 실패: {error}", event='status_board_failed', error=str(e))
 
     def place_pair_orders(sell_target=None, buy_target=None):
         """고변동성에서도 주문쌍이 반드시 만들어지도록 보호 로직."""
@@ -429,7 +623,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
 
         missing = []
         for side, price, volume, label in desired:
-            matched = find_matching_order(active_orders, side, price, volume)
+            matched = match_active_order(active_orders, sell_target if side == 'ask' else buy_target, side)
             if not matched:
                 missing.append(label)
             else:
@@ -439,26 +633,26 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                     buy_target.buy_uuid = matched
 
         if missing:
-            print(f"⚠️ 주문쌍 일부 미등록 감지 → 재시도: {', '.join(missing)}")
+            log.warning("⚠️ 주문쌍 일부 미등록 감지 → 재시도: {missing}", event='pair_retry', missing=', '.join(missing))
             try:
                 from api.api import cancel_all_orders
                 cancel_all_orders(market)
             except Exception as e:
-                print(f"⚠️ 주문쌍 재시도 전 전체 취소 실패: {e}")
+                log.error("⚠️ 주문쌍 재시도 전 전체 취소 실패: {error}", event='cancel_all_failed', error=str(e))
             _register_pair()
             persist_state()
 
     # 수동 재시작 처리 (resume_level > 0)
     if manual_resume:
-        print(f"🔄 수동 재시작: {resume_level}차부터 시작합니다.")
+        log.info("🔄 수동 재시작: {level}차부터 시작합니다.", event='manual_resume', level=resume_level)
         
         # 모든 기존 주문 취소
         try:
             from api.api import cancel_all_orders
-            print("🚫 모든 기존 주문 취소 중...")
+            log.info("🚫 모든 기존 주문 취소 중...", event='cancel_all')
             cancel_all_orders(market)
         except Exception as e:
-            print(f"⚠️ 기존 주문 취소 중 오류: {e}")
+            log.error("⚠️ 기존 주문 취소 중 오류: {error}", event='cancel_all_failed', error=str(e))
         
         # resume_level-1 차수까지는 매수/매도 모두 완료로 설정
         for i in range(resume_level - 1):
@@ -488,7 +682,8 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                 f"❌ [수동 재시작 실패]\n"
                 f"📍코인: {market}\n"
                 f"🔢 재시작 차수: {resume_level}차\n"
-                f"사유: 매수 주문이 등록되지 않았습니다."
+                f"사유: 매수 주문이 등록되지 않았습니다.",
+                critical=True,
             )
             return
 
@@ -510,22 +705,24 @@ def run_auto_trade(start_price, krw_amount, max_levels,
             f"📊 전체 차수: {max_levels}차\n"
             f"💵 시작가: {start_price:,.1f}원\n"
             f"💰 누적 수익: {realized_profit:,.0f}원\n"
-            f"{order_info}"
+            f"{order_info}",
+            market=market,
         )
     
     elif not resume_state:
-        print(f"📊 자동 매매 시작: {max_levels}차까지 설정됨.")
-        send_telegram_message(MSG_AUTO_TRADE_START.format(market=market, max_levels=max_levels, start_price=start_price, krw_amount=krw_amount))
+        log.info("📊 자동 매매 시작: {max_levels}차까지 설정됨.", event='start', max_levels=max_levels,
+                 start_price=start_price, krw_amount=krw_amount)
+        send_telegram_message(MSG_AUTO_TRADE_START.format(market=market, max_levels=max_levels, start_price=start_price, krw_amount=krw_amount), market=market)
         place_buy(levels[0], market)
         persist_state()
     else:
-        print("📂 저장된 상태로 재시작합니다. 보류 주문/체결 여부를 동기화합니다.")
+        log.info("📂 저장된 상태로 재시작합니다. 보류 주문/체결 여부를 동기화합니다.", event='sync')
         
         # 1단계: 저장된 uuid 상태 확인
         for level in levels:
             # 기존 주문 상태 확인
             if level.buy_uuid and not level.buy_filled:
-                detail = _safe_get_order_detail(level.buy_uuid)
+                detail = _safe_get_order_detail(level.buy_uuid, market)
                 data = detail.get('data') or detail
                 executed = float(data.get('executed_volume', 0) or 0)
                 remaining = float(data.get('remaining_volume', 0) or 0)
@@ -536,7 +733,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                     level.buy_uuid = None  # 조회 실패 → 재주문 대상으로 전환
 
             if level.sell_uuid and not level.sell_filled:
-                detail = _safe_get_order_detail(level.sell_uuid)
+                detail = _safe_get_order_detail(level.sell_uuid, market)
                 data = detail.get('data') or detail
                 executed = float(data.get('executed_volume', 0) or 0)
                 remaining = float(data.get('remaining_volume', 0) or 0)
@@ -548,7 +745,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
         # 1-1단계: 잔고 기반 복구 (UUID로 확인 불가능한 경우)
         try:
             from api.api import get_balance
-            print("💰 잔고 기반 복구 시스템 작동 중...")
+            log.info("💰 잔고 기반 복구 시스템 작동 중...", event='balance_check')
             
             balance_data = get_balance()
             coin_balance = 0.0
@@ -560,7 +757,8 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                         coin_balance = float(item.get('balance', 0))
                         locked_balance = float(item.get('locked', 0))
                         total_coin = coin_balance + locked_balance
-                        print(f"   현재 {market_code} 보유: {coin_balance:.8f} (락업: {locked_balance:.8f}, 총: {total_coin:.8f})")
+                        log.info("   현재 {coin} 보유: {balance:.8f} (락업: {locked:.8f}, 총: {total:.8f})", event='balance',
+                                 coin=market_code, balance=coin_balance, locked=locked_balance, total=total_coin)
                         break
             
             # 잔고로 추정되는 매수 체결 차수 계산
@@ -576,7 +774,8 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                 diff_ratio = abs(coin_balance - total_expected) / max(total_expected, 0.00000001)
                 
                 if diff_ratio > 0.1:  # 10% 이상 차이 나면
-                    print(f"⚠️ 잔고 불일치 감지: 예상 {total_expected:.8f} vs 실제 {coin_balance:.8f}")
+                    log.warning("⚠️ 잔고 불일치 감지: 예상 {expected:.8f} vs 실제 {balance:.8f}", event='balance_mismatch',
+                                expected=total_expected, balance=coin_balance)
                     
                     # 잔고로 역추적하여 체결 상태 재구성
                     reconstructed_levels = []
@@ -590,7 +789,8 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                             level.sell_uuid = None
                             remaining_balance -= level.volume
                             reconstructed_levels.append(level.level)
-                            print(f"   ✅ {level.level}차 매수 체결로 재구성 (수량: {level.volume:.8f})")
+                            log.info("   ✅ {level}차 매수 체결로 재구성 (수량: {volume:.8f})", event='level_rebuilt',
+                                     level=level.level, volume=level.volume)
                     
                     if reconstructed_levels:
                         send_telegram_message(
@@ -598,15 +798,17 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                             f"📍코인: {market}\n"
                             f"💰 현재 잔고: {coin_balance:.8f} {market_code}\n"
                             f"📊 복구된 차수: {', '.join(map(str, reversed(reconstructed_levels)))}차\n"
-                            f"⚠️ UUID 정보 없음 - 잔고로 재구성함"
+                            f"⚠️ UUID 정보 없음 - 잔고로 재구성함",
+                            market=market,
                         )
                 else:
-                    print(f"✅ 잔고 일치: 예상 {total_expected:.8f} vs 실제 {coin_balance:.8f}")
+                    log.info("✅ 잔고 일치: 예상 {expected:.8f} vs 실제 {balance:.8f}", event='balance_ok',
+                             expected=total_expected, balance=coin_balance)
             else:
-                print("   보유 코인 없음 - 정상")
+                log.info("   보유 코인 없음 - 정상", event='balance_ok', balance=coin_balance)
         
         except Exception as e:
-            print(f"⚠️ 잔고 기반 복구 중 오류: {e}")
+            log.error("⚠️ 잔고 기반 복구 중 오류: {error}", event='balance_check_failed', error=str(e))
         
         # 1-2단계: 주문 uuid 누락분 재연결 (중복 주문 방지)
         attached_levels, cached_order_list = reattach_missing_orders()
@@ -614,7 +816,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
         # 2단계: 고아 주문 감지 (코드가 인식하지 못하는 주문)
         try:
             from api.api import get_order_list
-            print("🔍 고아 주문 감지 중...")
+            log.info("🔍 고아 주문 감지 중...", event='orphan_check')
             order_list = cached_order_list or get_order_list(market=market, limit=100)
             
             if isinstance(order_list, list):
@@ -632,19 +834,20 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                         orphan_orders.append(order)
                 
                 if orphan_orders:
-                    print(f"⚠️ {len(orphan_orders)}개의 고아 주문 발견 - 취소합니다:")
+                    log.warning("⚠️ {count}개의 고아 주문 발견 - 취소합니다:", event='orphan_found', count=len(orphan_orders))
                     for order in orphan_orders:
                         order_uuid = order.get('uuid') or order.get('order_id')
                         side = order.get('side')
                         price = float(order.get('price', 0))
                         volume = float(order.get('volume', 0))
-                        print(f"   - {side} {price:,.0f}원 x {volume:.8f} (UUID: {order_uuid})")
+                        log.info("   - {side} {price:,.0f}원 x {volume:.8f} (UUID: {uuid})", event='orphan_cancel',
+                                 side=side, price=price, volume=volume, uuid=order_uuid)
                         cancel_order_by_uuid(order_uuid)
-                    send_telegram_message(f"🗑️ [고아 주문 정리]\n📍코인: {market}\n🔢 취소된 주문: {len(orphan_orders)}개")
+                    send_telegram_message(f"🗑️ [고아 주문 정리]\n📍코인: {market}\n🔢 취소된 주문: {len(orphan_orders)}개", market=market)
                 else:
-                    print("✅ 고아 주문 없음")
+                    log.info("✅ 고아 주문 없음", event='orphan_check_ok')
         except Exception as e:
-            print(f"⚠️ 고아 주문 감지 중 오류: {e}")
+            log.error("⚠️ 고아 주문 감지 중 오류: {error}", event='orphan_check_failed', error=str(e))
 
         # 가장 최근 체결된 매수 차수 찾기
         last_filled_buy_level = None
@@ -658,7 +861,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
         else:
             resume_info = "🔄 재가동 차수: 1차 매수"
         
-        send_telegram_message(f"⏯️ [전략 재가동]\n📍코인: {market}\n🔢 전체 차수: {max_levels}차\n{resume_info}\n💵 시작가: {start_price:,.1f}원\n💰 누적 수익: {realized_profit:,.0f}원")
+        send_telegram_message(f"⏯️ [전략 재가동]\n📍코인: {market}\n🔢 전체 차수: {max_levels}차\n{resume_info}\n💵 시작가: {start_price:,.1f}원\n💰 누적 수익: {realized_profit:,.0f}원", market=market)
 
         # 재개 시 필요한 주문만 재등록 (현재 진행 중인 차수만)
         if last_filled_buy_level:
@@ -706,19 +909,24 @@ def run_auto_trade(start_price, krw_amount, max_levels,
     health_check_counter = 0
     health_check_interval = 12  # 12번 루프마다 검증 (sleep_sec=5초 기준 약 1분)
     
-    # 하트비트 카운터 (주기적으로 살아있음 신호 전송)
-    heartbeat_counter = 0
-    heartbeat_interval = 6  # 6번 루프마다 하트비트 (sleep_sec=5초 기준 약 30초)
 
     def perform_health_check():
         """자동매매 상태 검증 및 자동 복구"""
         try:
-            print("🏥 [헬스체크] 자동매매 상태 검증 중...")
+            log.debug("🏥 [헬스체크] 자동매매 상태 검증 중...", event='health_check')
+
+            # 0. 네트워크 오류로 응답을 못 받은 주문은 클라이언트 주문 ID로 먼저 확정
+            pending = [(lvl, side) for lvl in levels for side, ident in (('bid', lvl.buy_pending), ('ask', lvl.sell_pending))
+                       if ident]
+            if pending:
+                for lvl, side in pending:
+                    resolve_pending(lvl, side)
+                persist_state()
 
             # 1. 현재 주문 목록 조회 + uuid 매핑
             active_orders, order_list = build_active_orders()
             if order_list is None:
-                print("⚠️ [헬스체크] 주문 목록 조회 실패")
+                log.warning("⚠️ [헬스체크] 주문 목록 조회 실패", event='health_check_failed')
                 return
 
             # 2. 진행 상태 파악: 열린 주문/최근 체결 기반으로 타깃 결정
@@ -787,7 +995,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                     remaining_active.discard(expected_uuid)
                     continue
 
-                matched_uuid = find_matching_order(active_orders, side, price, volume)
+                matched_uuid = match_active_order(active_orders, lvl, side)
                 if matched_uuid:
                     if side == 'ask':
                         lvl.sell_uuid = matched_uuid
@@ -807,10 +1015,11 @@ def run_auto_trade(start_price, krw_amount, max_levels,
             if issues_found:
                 try:
                     from api.api import cancel_all_orders
-                    print(f"🚫 [헬스체크] 이상 감지 → 전체 주문 취소 후 재등록: {', '.join(issues_found)}")
+                    log.warning("🚫 [헬스체크] 이상 감지 → 전체 주문 취소 후 재등록: {issues}", event='health_check_repair',
+                                issues=', '.join(issues_found))
                     cancel_all_orders(market)
                 except Exception as e:
-                    print(f"⚠️ [헬스체크] 전체 취소 실패: {e}")
+                    log.error("⚠️ [헬스체크] 전체 취소 실패: {error}", event='cancel_all_failed', error=str(e))
 
                 # 상태 초기화 (uuid 제거)
                 for lvl in levels:
@@ -827,46 +1036,67 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                     f"🔄 조치: 전체 주문 취소 후 재등록\n"
                     f"📊 등록 상태: "
                     f"{sell_target.level if sell_target else '-'}차 매도 / "
-                    f"{buy_target.level if buy_target else '-'}차 매수"
+                    f"{buy_target.level if buy_target else '-'}차 매수",
+                    market=market,
                 )
                 return
 
             # 불일치 없으면 정상
-            print("✅ [헬스체크] 정상 작동 중")
+            log.info("✅ [헬스체크] 정상 작동 중", event='health_check_ok')
 
         except Exception as e:
-            print(f"⚠️ [헬스체크] 검증 중 오류: {e}")
+            log.error("⚠️ [헬스체크] 검증 중 오류: {error}", event='health_check_failed', error=str(e))
+
+    # 상태 복구/초기 주문까지 끝난 시점 (--startup-report 이면 기동 시간 보고 출력)
+    startup.ready('매매 루프 진입')
+
+    # 첫 루프 하트비트 + 살아있음 신호 스레드 (긴 루프 중에도 Watchdog이 멈춤으로 오판하지 않게)
+    _send_heartbeat()
+    if heartbeat_sender:
+        heartbeat_sender.start_liveness()
 
     while True:
         if stop_condition and stop_condition():
-            print("🛑 사용자 중단 감지. 종료합니다.")
+            log.info("🛑 사용자 중단 감지. 종료합니다.", event='stop')
             persist_state()
+            _send_heartbeat('stopped')
+            if heartbeat_sender:
+                heartbeat_sender.close()
+            if status_slot:
+                status_slot.close()
             break
 
+        loop_started = perf_counter()
         try:
             for level in levels:
                 # ✅ 매수 체결 확인
                 if level.buy_uuid and not level.buy_filled:
-                    detail = _safe_get_order_detail(level.buy_uuid)
+                    detail = _safe_get_order_detail(level.buy_uuid, market)
                     data = detail.get('data') or detail
                     filled, executed, remaining = _is_order_filled(data)
                     if filled:
                         level.buy_filled = True
                         callback_flags['buy'].add(level.level)
+                        latency = _fill_detection_latency(data)
+                        if latency is not None:
+                            metrics.observe('fill_detection_seconds', latency, 'bid', metrics.FILL_BUCKETS)
 
                         # 체결 시간 가져오기
                         filled_time = data.get('created_at', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
                         if 'T' in str(filled_time):
                             filled_time = filled_time.replace('T', ' ').split('.')[0].split('+')[0]
 
-                        print(f"✅ [{level.level}차] 매수 체결 완료: {level.buy_price}원 / {filled_time}")
+                        log.info("✅ [{level}차] 매수 체결 완료: {price}원 / {filled_time}", event='buy_filled',
+                                 level=level.level, price=level.buy_price, volume=level.volume,
+                                 filled_time=filled_time, latency=latency)
+                        last_price = level.buy_price
                         send_telegram_message(MSG_BUY_FILLED.format(
                             market=market, 
                             level=level.level, 
                             buy_price=level.buy_price, 
                             volume=level.volume,
                             filled_time=filled_time
-                        ))
+                        ), market=market)
 
                         if status_callback:
                             status_callback(level.level, f"[{level.level}차] 매수 체결 ✅ / 매도 대기")
@@ -889,7 +1119,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                                 lv.sell_uuid = None
                         
                         if cancel_count > 0:
-                            print(f"🚫 {cancel_count}개 주문 취소 완료")
+                            log.info("🚫 {count}개 주문 취소 완료", event='orders_cancelled', count=cancel_count)
                         persist_state()
 
                         # 📤/🛒 매도-매수 한 쌍을 안전하게 등록
@@ -900,22 +1130,20 @@ def run_auto_trade(start_price, krw_amount, max_levels,
 
                 # ✅ 매도 체결 확인
                 if level.sell_uuid and not level.sell_filled:
-                    detail = _safe_get_order_detail(level.sell_uuid)
+                    detail = _safe_get_order_detail(level.sell_uuid, market)
                     data = detail.get('data') or detail
                     filled, executed, remaining = _is_order_filled(data)
                     if filled:
                         level.sell_filled = True
                         callback_flags['sell'].add(level.level)
+                        latency = _fill_detection_latency(data)
+                        if latency is not None:
+                            metrics.observe('fill_detection_seconds', latency, 'ask', metrics.FILL_BUCKETS)
 
                         # ✅ 빗썸 수수료 반영 수익 계산
-                        fee_rate = 0.0004
-
-                        buy_cost = level.buy_price * (1 + fee_rate)
-                        sell_income = level.sell_price * (1 - fee_rate)
-                        profit = (sell_income - buy_cost) * level.volume
+                        profit = level_profit(level.buy_price, level.sell_price, level.volume)
 
                         realized_profit += profit
-                        strategy_info["realized_profit"] = realized_profit
 
                         # 체결 시간 가져오기
                         filled_time = data.get('created_at', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
@@ -933,7 +1161,10 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                             "timestamp": time.time()
                         })
 
-                        print(f"💰 [{level.level}차] 매도 체결 완료: {level.sell_price}원 / 수익 {profit:.0f}원 / {filled_time}")
+                        log.info("💰 [{level}차] 매도 체결 완료: {price}원 / 수익 {profit:.0f}원 / {filled_time}", event='sell_filled',
+                                 level=level.level, price=level.sell_price, volume=level.volume, profit=profit,
+                                 realized_profit=realized_profit, filled_time=filled_time, latency=latency)
+                        last_price = level.sell_price
                         send_telegram_message(MSG_SELL_FILLED.format(
                             market=market, 
                             level=level.level, 
@@ -942,7 +1173,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                             profit=profit, 
                             realized_profit=realized_profit,
                             filled_time=filled_time
-                        ))
+                        ), market=market)
 
                         # level 상태 초기화
                         level.buy_uuid = None
@@ -976,7 +1207,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                                 lv.sell_uuid = None
                         
                         if cancel_count > 0:
-                            print(f"🚫 {cancel_count}개 주문 취소 완료")
+                            log.info("🚫 {count}개 주문 취소 완료", event='orders_cancelled', count=cancel_count)
                         persist_state()
 
                         # 🛒/📤 매수-매도 한 쌍을 안전하게 등록 (현재차 매수, 이전차 매도)
@@ -986,7 +1217,7 @@ def run_auto_trade(start_price, krw_amount, max_levels,
                         persist_state()
 
         except Exception as loop_error:
-            print(f"⚠️ 루프 처리 중 오류 발생: {loop_error}")
+            log.error("⚠️ 루프 처리 중 오류 발생: {error}", event='loop_error', error=repr(loop_error))
             persist_state()
 
         # 헬스체크 실행 (주기적으로)
@@ -995,10 +1226,10 @@ def run_auto_trade(start_price, krw_amount, max_levels,
             perform_health_check()
             health_check_counter = 0
         
-        # 하트비트 기록 (주기적으로)
-        heartbeat_counter += 1
-        if heartbeat_counter >= heartbeat_interval:
-            _write_heartbeat()
-            heartbeat_counter = 0
+        metrics.observe('loop_duration_seconds', perf_counter() - loop_started, '', metrics.LOOP_BUCKETS)
+
+        # 상태판 / 하트비트 데이터그램 (매 루프)
+        _publish_status()
+        _send_heartbeat()
 
         time.sleep(sleep_sec)
@@ -0,0 +1,301 @@
+# bithumbSplit/strategy/backtest.py
+# 차수 매매 전략 백테스트 엔진
+# run_auto_trade와 같은 규칙으로 과거 캔들/체결 데이터를 재생한다.
+#  - N차 매수 체결 → N차 매도 + (N+1)차 매수 한 쌍만 유지
+#  - N차 매도 체결 → (N-1)차 매도 + N차 매수 한 쌍만 유지
+#  - 호가단위 내림, 수수료(FEE_RATE) 반영 수익 계산은 strategy.grid와 동일
+#
+# 사용 예:
+#   python strategy/backtest.py --market BTC --data data/BTC_1m.csv \
+#       --start-price 140000000 --krw-amount 50000 --max-levels 60 --buy-gap 0.2 --sell-gap 0.3
+#   기록 저장소 사용 시: --data store:trade:20261001-20261019
+
+import csv
+import sys
+import time
+import argparse
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+# 프로젝트 루트를 sys.path에 추가
+if getattr(sys, 'frozen', False):
+    base_path = Path(sys.executable).parent
+else:
+    base_path = Path(__file__).parent.parent
+
+if str(base_path) not in sys.path:
+    sys.path.insert(0, str(base_path))
+
+from config.tick_table import TICK_SIZE
+from strategy.grid import FEE_RATE, build_grid_prices, level_profit, level_cost
+
+_INF = float('inf')
+
+
+def _parse_ts(value):
+    """epoch(초/ms) 또는 ISO 문자열을 epoch 초로 변환"""
+    try:
+        ts = float(value)
+        return ts / 1000 if ts > 1e11 else ts
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+def _csv_fields(reader):
+    return {name.lower().strip(): name for name in (reader.fieldnames or [])}
+
+
+def is_candle_csv(path):
+    """캔들(open/high/low/close) CSV인지 - load_price_csv는 봉 하나를 같은 시각의 4개 가격으로 펼친다"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        fields = _csv_fields(csv.DictReader(f))
+    return all(k in fields for k in ('open', 'high', 'low', 'close'))
+
+
+def load_price_csv(path):
+    """
+    캔들(timestamp,open,high,low,close) 또는 체결(timestamp,price) CSV를 읽어
+    (timestamps, prices) 배열로 돌려준다.
+    캔들은 봉 내부 경로를 시가→저가→고가→종가(양봉) / 시가→고가→저가→종가(음봉)로 펼친다.
+    """
+    timestamps = array('d')
+    prices = array('d')
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        fields = _csv_fields(reader)
+        ts_key = fields.get('timestamp') or fields.get('time') or fields.get('date')
+        is_candle = all(k in fields for k in ('open', 'high', 'low', 'close'))
+        price_key = fields.get('price') or fields.get('close') or fields.get('trade_price')
+        if not ts_key or not (is_candle or price_key):
+            raise ValueError(f"지원하지 않는 CSV 형식입니다: {reader.fieldnames}")
+
+        for row in reader:
+            ts = _parse_ts(row[ts_key])
+            if is_candle:
+                o = float(row[fields['open']])
+                h = float(row[fields['high']])
+                lo = float(row[fields['low']])
+                c = float(row[fields['close']])
+                path_prices = (o, lo, h, c) if c >= o else (o, h, lo, c)
+                for p in path_prices:
+                    timestamps.append(ts)
+                    prices.append(p)
+            else:
+                timestamps.append(ts)
+                prices.append(float(row[price_key]))
+    return timestamps, prices
+
+
+def is_store_source(source):
+    """'store' 또는 'store:...' 지정인지 (store/btc.csv 같은 CSV 경로는 아님)"""
+    source = str(source)
+    return source == 'store' or source.startswith('store:')
+
+
+def load_prices(source, market):
+    """
+    가격 입력 해석: CSV 경로 또는 기록 저장소 지정 문자열
+      store                       → 기록된 전체 체결
+      store:ticker                → 현재가 샘플
+      store:trade:20261001-20261019 → 구간 지정 (끝 포함)
+    """
+    if not is_store_source(source):
+        return load_price_csv(source)
+
+    from shared.market_store import load_series
+    parts = str(source).split(':')
+    kind = parts[1] if len(parts) > 1 and parts[1] else 'trade'
+    start_day = end_day = None
+    if len(parts) > 2 and parts[2]:
+        start_day, _, end_day = parts[2].partition('-')
+        end_day = end_day or start_day
+    timestamps, prices = load_series(market, kind, start_day, end_day)
+    if not len(prices):
+        raise ValueError(f"기록된 데이터가 없습니다: {market} {source}")
+    return timestamps, prices
+
+
+def prepare_grid(market, start_price, krw_amount, max_levels, buy_gap, buy_mode, sell_gap, sell_mode, tick=None):
+    """run_auto_trade와 동일한 그리드를 열 단위 배열로 만든다."""
+    if tick is None:
+        tick = TICK_SIZE.get(market)
+        if tick is None:
+            raise ValueError(f"호가단위가 정의되지 않은 종목입니다: {market}")
+    grid = build_grid_prices(start_price, krw_amount, max_levels, buy_gap, buy_mode, sell_gap, sell_mode, tick)
+    return {
+        "buy_prices": [g[1] for g in grid],
+        "sell_prices": [g[2] for g in grid],
+        "volumes": [g[3] for g in grid],
+    }
+
+
+def simulate(prices, buy_prices, sell_prices, volumes, fee_rate=FEE_RATE, timestamps=None, record_fills=False):
+    """
+    가격 경로를 따라 그리드 상태(보유 차수 수 n)를 진행시킨다.
+    걸려 있는 주문은 항상 n차 매도(sell_prices[n-1])와 (n+1)차 매수(buy_prices[n]) 둘뿐이므로,
+    두 임계값 사이를 지나는 가격은 건너뛰고 임계값을 넘을 때만 체결을 처리한다.
+    """
+    n_levels = len(buy_prices)
+    profits = [level_profit(buy_prices[i], sell_prices[i], volumes[i], fee_rate) for i in range(n_levels)]
+    costs = [level_cost(buy_prices[i], volumes[i], fee_rate) for i in range(n_levels)]
+    locked_cum = [0.0]
+    for c in costs:
+        locked_cum.append(locked_cum[-1] + c)
+
+    buy_counts = [0] * n_levels
+    sell_counts = [0] * n_levels
+    level_profits = [0.0] * n_levels
+    fills = [] if record_fills else None
+
+    n = 0
+    max_n = 0
+    realized = 0.0
+    lo = buy_prices[0] if n_levels else -_INF
+    hi = _INF
+    hold_start = None  # 원화가 묶이기 시작한 샘플 위치 (n이 0 → 1 이상)
+    longest_hold = 0
+
+    for i, p in enumerate(prices):
+        if lo < p < hi:
+            continue
+
+        # 매수 체결: 가격이 (n+1)차 매수가 이하로 내려옴 (하락 구간에서 연속 체결 가능)
+        while n < n_levels and p <= buy_prices[n]:
+            buy_counts[n] += 1
+            if record_fills:
+                fills.append((timestamps[i] if timestamps else i, 'bid', n + 1, buy_prices[n]))
+            n += 1
+
+        # 매도 체결: 가격이 n차 매도가 이상으로 올라옴
+        while n > 0 and p >= sell_prices[n - 1]:
+            n -= 1
+            sell_counts[n] += 1
+            level_profits[n] += profits[n]
+            realized += profits[n]
+            if record_fills:
+                fills.append((timestamps[i] if timestamps else i, 'ask', n + 1, sell_prices[n]))
+
+        if n > max_n:
+            max_n = n
+        if n and hold_start is None:
+            hold_start = i
+        elif not n and hold_start is not None:
+            longest_hold = max(longest_hold, i - hold_start)
+            hold_start = None
+        lo = buy_prices[n] if n < n_levels else -_INF
+        hi = sell_prices[n - 1] if n > 0 else _INF
+
+    last_price = prices[-1] if len(prices) else 0.0
+    open_hold = len(prices) - hold_start if hold_start is not None else 0
+    unrealized = sum(
+        (last_price * (1 - fee_rate) - buy_prices[i] * (1 + fee_rate)) * volumes[i]
+        for i in range(n)
+    )
+
+    return {
+        "realized_profit": realized,
+        "unrealized_profit": unrealized,
+        "buy_fills": sum(buy_counts),
+        "sell_fills": sum(sell_counts),
+        "buy_fills_per_level": buy_counts,
+        "sell_fills_per_level": sell_counts,
+        "profit_per_level": level_profits,
+        "capital_per_level": costs,
+        "final_level": n,
+        "max_level": max_n,
+        "capital_in_use": locked_cum[n],
+        "peak_capital": locked_cum[max_n],
+        "longest_hold_samples": max(longest_hold, open_hold),
+        "open_hold_samples": open_hold,
+        "last_price": last_price,
+        "fills": fills,
+    }
+
+
+def run_backtest(prices, market, start_price, krw_amount, max_levels,
+                 buy_gap, buy_mode, sell_gap, sell_mode,
+                 timestamps=None, fee_rate=FEE_RATE, record_fills=False):
+    """그리드 설정 하나에 대한 백테스트 결과 dict 반환"""
+    grid = prepare_grid(market, start_price, krw_amount, max_levels, buy_gap, buy_mode, sell_gap, sell_mode)
+    result = simulate(
+        prices, grid["buy_prices"], grid["sell_prices"], grid["volumes"],
+        fee_rate=fee_rate, timestamps=timestamps, record_fills=record_fills,
+    )
+    result.update({
+        "market": market,
+        "start_price": start_price,
+        "krw_amount": krw_amount,
+        "max_levels": max_levels,
+        "buy_gap": buy_gap,
+        "buy_mode": buy_mode,
+        "sell_gap": sell_gap,
+        "sell_mode": sell_mode,
+        "buy_prices": grid["buy_prices"],
+        "sell_prices": grid["sell_prices"],
+    })
+    return result
+
+
+def print_report(result, elapsed=None, samples=None):
+    """백테스트 결과 요약 출력"""
+    print(f"\n{'='*60}")
+    print(f"📊 백테스트 결과 - {result['market']}")
+    print(f"{'='*60}")
+    print(f"💵 시작가: {result['start_price']:,.0f}원 / 💰 매수금액: {result['krw_amount']:,.0f}원 / 🔢 {result['max_levels']}차")
+    print(f"📈 매수간격: {result['buy_gap']} ({result['buy_mode']}) / 📉 매도간격: {result['sell_gap']} ({result['sell_mode']})")
+    if samples is not None:
+        speed = f" / {elapsed:.2f}초" if elapsed is not None else ""
+        print(f"🕒 가격 샘플: {samples:,}개{speed}")
+    print(f"💰 실현 수익: {result['realized_profit']:,.0f}원")
+    print(f"📉 평가 손익(보유분): {result['unrealized_profit']:,.0f}원 (마지막가 {result['last_price']:,.0f}원)")
+    print(f"🛒 매수 체결: {result['buy_fills']}회 / 📤 매도 체결: {result['sell_fills']}회")
+    print(f"🔢 최대 도달 차수: {result['max_level']}차 / 종료 시 보유 차수: {result['final_level']}차")
+    print(f"🔒 최대 묶인 원화: {result['peak_capital']:,.0f}원 / 종료 시: {result['capital_in_use']:,.0f}원")
+
+    print(f"\n{'차수':>4} {'매수가':>14} {'매도가':>14} {'묶인원화':>12} {'매수':>6} {'매도':>6} {'수익':>12}")
+    for i, cost in enumerate(result['capital_per_level']):
+        buys = result['buy_fills_per_level'][i]
+        sells = result['sell_fills_per_level'][i]
+        if not buys and i >= result['max_level']:
+            continue
+        print(f"{i + 1:>4} {result['buy_prices'][i]:>14,.2f} {result['sell_prices'][i]:>14,.2f} "
+              f"{cost:>12,.0f} {buys:>6} {sells:>6} {result['profit_per_level'][i]:>12,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='bithumbSplit 차수 매매 백테스트')
+    parser.add_argument('--market', default='BTC', help='코인 (기본값: BTC)')
+    parser.add_argument('--data', required=True, help='캔들/체결 CSV 경로 또는 기록 저장소 (예: store:trade:20261001-20261019)')
+    parser.add_argument('--start-price', type=float, required=True, help='시작가')
+    parser.add_argument('--krw-amount', type=float, default=1000000, help='매수금액')
+    parser.add_argument('--max-levels', type=int, default=60, help='최대차수')
+    parser.add_argument('--buy-gap', type=float, default=0.2, help='매수 간격')
+    parser.add_argument('--sell-gap', type=float, default=0.3, help='매도 간격')
+    parser.add_argument('--buy-mode', choices=['percent', 'price'], default='percent', help='매수 간격 모드 (% or price)')
+    parser.add_argument('--sell-mode', choices=['percent', 'price'], default='percent', help='매도 간격 모드 (% or price)')
+    parser.add_argument('--fee', type=float, default=FEE_RATE, help=f'수수료율 (기본값: {FEE_RATE})')
+    args = parser.parse_args()
+
+    market = f"KRW-{args.market.upper()}"
+    timestamps, prices = load_prices(args.data, market)
+
+    started = time.perf_counter()
+    result = run_backtest(
+        prices, market,
+        start_price=args.start_price,
+        krw_amount=args.krw_amount,
+        max_levels=args.max_levels,
+        buy_gap=args.buy_gap,
+        buy_mode=args.buy_mode,
+        sell_gap=args.sell_gap,
+        sell_mode=args.sell_mode,
+        timestamps=timestamps,
+        fee_rate=args.fee,
+    )
+    elapsed = time.perf_counter() - started
+    print_report(result, elapsed=elapsed, samples=len(prices))
+
+
+if __name__ == '__main__':
+    main()
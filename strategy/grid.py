@@ -0,0 +1,45 @@
+# bithumbSplit/strategy/grid.py
+# 차수 매매 그리드 계산 모음 (API 의존성 없음)
+# run_auto_trade와 백테스트가 동일한 가격/수량/수익 계산을 쓰도록 한곳에 모은다.
+
+import math
+
+# 빗썸 지정가 수수료율 (매수/매도 각각 적용)
+FEE_RATE = 0.0004
+
+
+# 가격 계산 함수: 퍼센트 또는 고정 금액으로 가격 조정
+# mode: 'percent' 또는 'price'
+def calculate_price(base_price, gap_value, mode, direction):
+    if mode == 'percent':
+        rate = (1 + gap_value / 100) if direction == 'up' else (1 - gap_value / 100)
+        return round(base_price * rate, 2)
+    elif mode == 'price':
+        return round(base_price + gap_value, 2) if direction == 'up' else round(base_price - gap_value, 2)
+    else:
+        raise ValueError("mode는 'percent' 또는 'price' 여야 합니다.")
+
+
+def build_grid_prices(start_price, krw_amount, max_levels, buy_gap, buy_mode, sell_gap, sell_mode, tick):
+    """차수별 (차수, 매수가, 매도가, 수량) 목록을 생성한다. 가격은 호가단위로 내림한다."""
+    grid = []
+    for i in range(max_levels):
+        raw_buy_price = calculate_price(start_price, buy_gap * i, buy_mode, 'down')
+        raw_sell_price = calculate_price(raw_buy_price, sell_gap, sell_mode, 'up')
+        buy_price = math.floor(raw_buy_price / tick) * tick
+        sell_price = math.floor(raw_sell_price / tick) * tick
+        volume = round(krw_amount / buy_price, 8)
+        grid.append((i + 1, buy_price, sell_price, volume))
+    return grid
+
+
+def level_profit(buy_price, sell_price, volume, fee_rate=FEE_RATE):
+    """한 차수의 매수→매도 왕복 실현 수익 (수수료 반영)"""
+    buy_cost = buy_price * (1 + fee_rate)
+    sell_income = sell_price * (1 - fee_rate)
+    return (sell_income - buy_cost) * volume
+
+
+def level_cost(buy_price, volume, fee_rate=FEE_RATE):
+    """한 차수 매수에 묶이는 원화 (수수료 포함)"""
+    return buy_price * volume * (1 + fee_rate)
@@ -0,0 +1,268 @@
+# bithumbSplit/strategy/montecarlo.py
+# 그리드 설정별 원화 노출(묶인 자금) 몬테카를로 시뮬레이터
+# 합성 가격 경로(GBM 또는 과거 수익률 블록 부트스트랩)를 수천 개 만들어
+# 백테스트 엔진과 같은 규칙으로 돌리고, 최대 묶인 원화·최대 차수·회복 시간·수익 분포를 보고한다.
+#
+# 사용 예:
+#   python strategy/montecarlo.py --market BTC --start-price 140000000 --krw-amount 50000 --max-levels 60 \
+#       --buy-gap 0.2 --sell-gap 0.3 --paths 2000 --days 30 --model gbm --vol 0.6
+#   python strategy/montecarlo.py ... --model bootstrap --data store:trade:20260901-20261019
+
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import multiprocessing
+from array import array
+from pathlib import Path
+
+# 프로젝트 루트를 sys.path에 추가
+if getattr(sys, 'frozen', False):
+    base_path = Path(sys.executable).parent
+else:
+    base_path = Path(__file__).parent.parent
+
+if str(base_path) not in sys.path:
+    sys.path.insert(0, str(base_path))
+
+from strategy.grid import FEE_RATE
+from strategy.backtest import load_prices, prepare_grid, simulate, is_store_source, is_candle_csv
+from strategy.optimizer import write_price_file, open_price_file
+
+LOGS_DIR = os.path.join(base_path, 'logs')
+YEAR_SEC = 365 * 24 * 3600
+MAX_GAP_STEPS = 30  # 기록이 이보다 오래 끊긴 구간은 수익률에 넣지 않음 (수집기 중단 등)
+
+# 워커 프로세스 전역 (initializer에서 한 번만 채움)
+_worker = {}
+
+
+def gbm_path(rng, start_price, steps, sigma, mu):
+    """기하 브라운 운동 경로 (sigma/mu는 1스텝 기준)"""
+    prices = array('d', [start_price])
+    drift = mu - 0.5 * sigma * sigma
+    p = start_price
+    gauss = rng.gauss
+    exp = math.exp
+    for _ in range(steps - 1):
+        p *= exp(drift + sigma * gauss(0.0, 1.0))
+        prices.append(p)
+    return prices
+
+
+def bootstrap_path(rng, start_price, steps, log_returns, block):
+    """과거 로그수익률을 block 길이 단위로 이어 붙인 경로 (변동성 군집을 어느 정도 보존)"""
+    prices = array('d', [start_price])
+    p = start_price
+    n = len(log_returns)
+    exp = math.exp
+    while len(prices) < steps:
+        start = rng.randrange(0, max(1, n - block))
+        for r in log_returns[start:start + block]:
+            p *= exp(r)
+            prices.append(p)
+            if len(prices) >= steps:
+                break
+    return prices
+
+
+def step_log_returns(timestamps, prices, step_sec, max_gap_steps=MAX_GAP_STEPS):
+    """
+    체결/샘플을 step_sec 간격 종가로 다시 묶어 스텝당 로그수익률로 만든다.
+    (체결 단위 수익률을 그대로 쓰면 경로의 하루 변동성과 보유 시간이 데이터 간격 비율만큼 어긋난다)
+    비어 있는 칸은 직전 종가를 이어 쓰고(수익률 0), max_gap_steps보다 긴 공백을 건너는 수익률은 버린다.
+    """
+    returns = array('d')
+    prev_bucket = prev_close = None
+    bucket = close = None
+    for t, p in zip(timestamps, prices):
+        if p <= 0:
+            continue
+        b = int(t // step_sec)
+        if b != bucket:
+            if bucket is not None:
+                prev_bucket, prev_close = _close_step(returns, prev_bucket, prev_close, bucket, close, max_gap_steps)
+            bucket = b
+        close = p
+    if bucket is not None:
+        _close_step(returns, prev_bucket, prev_close, bucket, close, max_gap_steps)
+    return returns
+
+
+def _close_step(returns, prev_bucket, prev_close, bucket, close, max_gap_steps):
+    if prev_bucket is not None:
+        gap = bucket - prev_bucket
+        if gap <= max_gap_steps:
+            returns.extend([0.0] * (gap - 1))
+            returns.append(math.log(close / prev_close))
+    return bucket, close
+
+
+def _init_worker(grid, settings, returns_path):
+    _worker.update(grid=grid, settings=settings)
+    if returns_path:
+        f, mm, returns = open_price_file(returns_path)
+        _worker.update(returns_file=f, returns_mmap=mm, returns=returns)
+
+
+def _run_path(seed):
+    grid = _worker["grid"]
+    cfg = _worker["settings"]
+    rng = random.Random(seed)
+    if cfg["model"] == 'bootstrap':
+        prices = bootstrap_path(rng, cfg["start_price"], cfg["steps"], _worker["returns"], cfg["block"])
+    else:
+        prices = gbm_path(rng, cfg["start_price"], cfg["steps"], cfg["sigma"], cfg["mu"])
+
+    result = simulate(prices, grid["buy_prices"], grid["sell_prices"], grid["volumes"], fee_rate=cfg["fee_rate"])
+    return (
+        result["peak_capital"],
+        result["max_level"],
+        result["longest_hold_samples"] * cfg["step_sec"],
+        result["open_hold_samples"] > 0,
+        result["realized_profit"],
+        result["realized_profit"] + result["unrealized_profit"],
+        result["buy_fills"],
+    )
+
+
+def percentile(sorted_values, q):
+    """정렬된 목록의 q 분위수 (선형 보간)"""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def run_montecarlo(grid, settings, paths, seed=0, returns=None, processes=None):
+    """경로를 프로세스 풀에 나눠 돌리고 경로별 요약 튜플 목록을 돌려준다."""
+    processes = processes or os.cpu_count() or 1
+    returns_path = None
+    if returns is not None:
+        returns_path = write_price_file(returns, os.path.join(LOGS_DIR, 'montecarlo', f'returns_{os.getpid()}.bin'))
+    try:
+        with multiprocessing.Pool(processes, initializer=_init_worker,
+                                  initargs=(grid, settings, returns_path)) as pool:
+            results = []
+            for row in pool.imap_unordered(_run_path, range(seed, seed + paths), chunksize=8):
+                results.append(row)
+                if len(results) % 500 == 0:
+                    print(f"⏳ {len(results)}/{paths} 경로 완료")
+            return results
+    finally:
+        if returns_path:
+            try:
+                os.remove(returns_path)
+            except OSError:
+                pass
+
+
+def summarize(results, grid, max_levels):
+    peak_capital = sorted(r[0] for r in results)
+    max_level = sorted(r[1] for r in results)
+    hold_sec = sorted(r[2] for r in results)
+    realized = sorted(r[4] for r in results)
+    total = sorted(r[5] for r in results)
+    n = len(results) or 1
+    return {
+        "paths": len(results),
+        "peak_capital": peak_capital,
+        "max_level": max_level,
+        "hold_hours": [s / 3600 for s in hold_sec],
+        "realized_profit": realized,
+        "total_profit": total,
+        "unrecovered_ratio": sum(1 for r in results if r[3]) / n,
+        "exhausted_ratio": sum(1 for r in results if r[1] >= max_levels) / n,
+        "full_grid_capital": sum(
+            b * v * (1 + FEE_RATE) for b, v in zip(grid["buy_prices"], grid["volumes"])
+        ),
+    }
+
+
+def print_summary(summary, elapsed):
+    qs = (0.05, 0.5, 0.95, 0.99)
+    header = '  '.join(f"{'p' + str(int(q * 100)):>14}" for q in qs)
+    print(f"\n{'='*80}")
+    print(f"🎲 몬테카를로 결과 - {summary['paths']:,}개 경로 / {elapsed:.1f}초")
+    print(f"{'='*80}")
+    print(f"{'항목':<22}{header}  {'최대':>14}")
+
+    def row(label, values, fmt):
+        cells = '  '.join(f"{fmt.format(percentile(values, q)):>14}" for q in qs)
+        print(f"{label:<22}{cells}  {fmt.format(values[-1] if values else 0):>14}")
+
+    row("최대 묶인 원화(원)", summary["peak_capital"], "{:,.0f}")
+    row("최대 도달 차수", summary["max_level"], "{:,.0f}")
+    row("최장 보유 구간(시간)", summary["hold_hours"], "{:,.1f}")
+    row("실현 수익(원)", summary["realized_profit"], "{:,.0f}")
+    row("실현+평가 손익(원)", summary["total_profit"], "{:,.0f}")
+    print(f"\n🔒 전 차수 체결 시 필요 원화: {summary['full_grid_capital']:,.0f}원")
+    print(f"⚠️ 최대차수 소진 확률: {summary['exhausted_ratio'] * 100:.1f}%")
+    print(f"⏳ 종료 시점 미회복(보유분 남음) 비율: {summary['unrecovered_ratio'] * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='bithumbSplit 그리드 원화 노출 몬테카를로 시뮬레이터')
+    parser.add_argument('--market', default='BTC', help='코인 (기본값: BTC)')
+    parser.add_argument('--start-price', type=float, required=True, help='시작가 (경로 시작 가격)')
+    parser.add_argument('--krw-amount', type=float, default=1000000, help='매수금액')
+    parser.add_argument('--max-levels', type=int, default=60, help='최대차수')
+    parser.add_argument('--buy-gap', type=float, default=0.2, help='매수 간격')
+    parser.add_argument('--sell-gap', type=float, default=0.3, help='매도 간격')
+    parser.add_argument('--buy-mode', choices=['percent', 'price'], default='percent', help='매수 간격 모드 (% or price)')
+    parser.add_argument('--sell-mode', choices=['percent', 'price'], default='percent', help='매도 간격 모드 (% or price)')
+    parser.add_argument('--paths', type=int, default=2000, help='경로 수')
+    parser.add_argument('--days', type=float, default=30, help='경로 길이(일)')
+    parser.add_argument('--step-sec', type=int, default=60, help='스텝 간격(초)')
+    parser.add_argument('--model', choices=['gbm', 'bootstrap'], default='gbm', help='경로 생성 방식')
+    parser.add_argument('--vol', type=float, default=0.6, help='GBM 연 변동성 (0.6 = 60%%)')
+    parser.add_argument('--drift', type=float, default=0.0, help='GBM 연 기대수익률')
+    parser.add_argument('--data', help='부트스트랩용 체결/현재가 CSV 또는 기록 저장소 (예: store:trade:20261001-20261019) - --step-sec 간격으로 다시 묶음')
+    parser.add_argument('--block', type=int, default=60, help='부트스트랩 블록 길이(스텝)')
+    parser.add_argument('--processes', type=int, help='프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드')
+    parser.add_argument('--fee', type=float, default=FEE_RATE, help=f'수수료율 (기본값: {FEE_RATE})')
+    args = parser.parse_args()
+
+    market = f"KRW-{args.market.upper()}"
+    grid = prepare_grid(market, args.start_price, args.krw_amount, args.max_levels,
+                        args.buy_gap, args.buy_mode, args.sell_gap, args.sell_mode)
+
+    returns = None
+    if args.model == 'bootstrap':
+        if not args.data:
+            parser.error("--model bootstrap 에는 --data 가 필요합니다.")
+        if not is_store_source(args.data) and is_candle_csv(args.data):
+            parser.error("부트스트랩에는 캔들 CSV를 쓸 수 없습니다 (봉 내부 4점 경로는 실제 가격 간격이 아님). "
+                         "체결/현재가 CSV 또는 store:... 를 지정하세요.")
+        timestamps, prices = load_prices(args.data, market)
+        returns = step_log_returns(timestamps, prices, args.step_sec)
+        if len(returns) < args.block:
+            parser.error("부트스트랩에 쓸 가격 데이터가 너무 짧습니다.")
+
+    dt = args.step_sec / YEAR_SEC
+    settings = {
+        "model": args.model,
+        "start_price": args.start_price,
+        "steps": int(args.days * 86400 / args.step_sec),
+        "step_sec": args.step_sec,
+        "sigma": args.vol * math.sqrt(dt),
+        "mu": args.drift * dt,
+        "block": args.block,
+        "fee_rate": args.fee,
+    }
+
+    print(f"🚀 {market} / {args.paths:,}개 경로 × {settings['steps']:,}스텝 ({args.days}일, {args.model}) / "
+          f"프로세스 {args.processes or os.cpu_count()}개")
+    started = time.perf_counter()
+    results = run_montecarlo(grid, settings, args.paths, seed=args.seed, returns=returns, processes=args.processes)
+    print_summary(summarize(results, grid, args.max_levels), time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    main()
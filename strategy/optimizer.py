@@ -0,0 +1,319 @@
+# bithumbSplit/strategy/optimizer.py
+# 그리드 설정 파라미터 스윕 (멀티프로세스 백테스트)
+# 가격 데이터는 한 번만 바이너리 파일로 기록하고, 각 워커 프로세스는 mmap으로 읽기 전용 공유한다.
+# 결과는 도착하는 대로 CSV에 스트리밍하고, 종료 시 순위 리포트를 만든다.
+#
+# 사용 예:
+#   python strategy/optimizer.py --market BTC --data data/BTC_1m.csv --krw-amount 50000 \
+#       --start-prices 140000000 --buy-gaps 0.1:0.5:0.05 --sell-gaps 0.2:0.8:0.1 --max-levels 40,60,80 \
+#       --write-config
+
+import os
+import csv
+import sys
+import json
+import mmap
+import heapq
+import time
+import argparse
+import itertools
+import multiprocessing
+from pathlib import Path
+
+# 프로젝트 루트를 sys.path에 추가
+if getattr(sys, 'frozen', False):
+    base_path = Path(sys.executable).parent
+else:
+    base_path = Path(__file__).parent.parent
+
+if str(base_path) not in sys.path:
+    sys.path.insert(0, str(base_path))
+
+from strategy.grid import FEE_RATE
+from strategy.backtest import load_prices, prepare_grid, simulate
+
+LOGS_DIR = os.path.join(base_path, 'logs')
+CONFIG_DIR = os.path.join(base_path, 'config')
+DIST_CONFIG_DIR = os.path.join(base_path, 'dist', 'config')
+
+REPORT_FIELDS = [
+    'rank', 'score', 'realized_profit', 'unrealized_profit', 'peak_capital', 'max_level',
+    'buy_fills', 'sell_fills', 'start_price', 'buy_gap', 'buy_mode', 'sell_gap', 'sell_mode', 'max_levels',
+]
+
+# 워커 프로세스 전역 (initializer에서 한 번만 채움)
+_worker = {}
+
+
+def write_price_file(prices, path):
+    """가격 배열을 float64 바이너리로 기록 (워커 mmap 공유용)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        prices.tofile(f)
+    return path
+
+
+def open_price_file(path):
+    """float64 바이너리 파일을 복사 없이 memoryview로 연다. (mmap, 읽기 전용)"""
+    f = open(path, 'rb')
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return f, mm, memoryview(mm).cast('d')
+
+
+def _init_worker(price_path, market, krw_amount, fee_rate):
+    f, mm, prices = open_price_file(price_path)
+    _worker.update({
+        "file": f,
+        "mmap": mm,
+        "prices": prices,
+        "market": market,
+        "krw_amount": krw_amount,
+        "fee_rate": fee_rate,
+    })
+
+
+def _evaluate(params):
+    """워커에서 한 조합을 백테스트하고 요약만 돌려준다."""
+    start_price, buy_gap, buy_mode, sell_gap, sell_mode, max_levels = params
+    try:
+        grid = prepare_grid(
+            _worker["market"], start_price, _worker["krw_amount"], max_levels,
+            buy_gap, buy_mode, sell_gap, sell_mode,
+        )
+        result = simulate(
+            _worker["prices"], grid["buy_prices"], grid["sell_prices"], grid["volumes"],
+            fee_rate=_worker["fee_rate"],
+        )
+    except (ValueError, ZeroDivisionError) as e:
+        # 가격 모드 간격이 커서 매수가가 0 이하가 되는 등 무효 조합
+        return {"params": params, "error": str(e)}
+
+    return {
+        "params": params,
+        "realized_profit": result["realized_profit"],
+        "unrealized_profit": result["unrealized_profit"],
+        "peak_capital": result["peak_capital"],
+        "max_level": result["max_level"],
+        "buy_fills": result["buy_fills"],
+        "sell_fills": result["sell_fills"],
+    }
+
+
+def _score(row, rank_by):
+    if rank_by == 'roi':
+        return row["realized_profit"] / row["peak_capital"] if row["peak_capital"] > 0 else 0.0
+    if rank_by == 'total':
+        return row["realized_profit"] + row["unrealized_profit"]
+    return row["realized_profit"]
+
+
+def _row_to_record(row, score, rank=''):
+    start_price, buy_gap, buy_mode, sell_gap, sell_mode, max_levels = row["params"]
+    return {
+        'rank': rank,
+        'score': round(score, 6),
+        'realized_profit': round(row["realized_profit"]),
+        'unrealized_profit': round(row["unrealized_profit"]),
+        'peak_capital': round(row["peak_capital"]),
+        'max_level': row["max_level"],
+        'buy_fills': row["buy_fills"],
+        'sell_fills': row["sell_fills"],
+        'start_price': start_price,
+        'buy_gap': buy_gap,
+        'buy_mode': buy_mode,
+        'sell_gap': sell_gap,
+        'sell_mode': sell_mode,
+        'max_levels': max_levels,
+    }
+
+
+def parse_values(text, cast=float):
+    """'0.1,0.2' 목록 또는 '시작:끝:간격' 범위(끝 포함)를 값 목록으로 변환"""
+    values = []
+    for part in str(text).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if ':' in part:
+            start, stop, step = (float(x) for x in part.split(':'))
+            if step <= 0:
+                raise ValueError(f"범위 간격은 0보다 커야 합니다: {part}")
+            count = int(round((stop - start) / step)) + 1
+            values.extend(cast(round(start + step * i, 10)) for i in range(count))
+        else:
+            values.append(cast(part))
+    return values
+
+
+def build_combinations(start_prices, buy_gaps, buy_modes, sell_gaps, sell_modes, max_levels):
+    return itertools.product(start_prices, buy_gaps, buy_modes, sell_gaps, sell_modes, max_levels)
+
+
+def run_sweep(price_path, market, krw_amount, combinations, report_path,
+              rank_by='profit', top_n=20, max_capital=None, fee_rate=FEE_RATE, processes=None):
+    """
+    프로세스 풀로 조합을 평가한다.
+    모든 결과는 report_path(CSV)에 도착 순으로 기록하고, 상위 top_n은 힙으로 유지해 반환한다.
+    """
+    processes = processes or os.cpu_count() or 1
+    top = []  # (score, seq, row) 최소 힙
+    evaluated = 0
+    skipped = 0
+
+    os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8', newline='') as f, \
+            multiprocessing.Pool(processes, initializer=_init_worker,
+                                 initargs=(price_path, market, krw_amount, fee_rate)) as pool:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+
+        for row in pool.imap_unordered(_evaluate, combinations, chunksize=16):
+            evaluated += 1
+            if row.get("error") or (max_capital and row["peak_capital"] > max_capital):
+                skipped += 1
+                continue
+
+            score = _score(row, rank_by)
+            writer.writerow(_row_to_record(row, score))
+
+            item = (score, evaluated, row)
+            if len(top) < top_n:
+                heapq.heappush(top, item)
+            elif score > top[0][0]:
+                heapq.heapreplace(top, item)
+
+            if evaluated % 500 == 0:
+                f.flush()
+                print(f"⏳ {evaluated}개 조합 평가 완료 (현재 최고 점수: {max(t[0] for t in top):,.4f})")
+
+    ranked = [(score, row) for score, _, row in sorted(top, key=lambda t: (-t[0], t[1]))]
+    return ranked, evaluated, skipped
+
+
+def write_ranked_report(ranked, path):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        for rank, (score, row) in enumerate(ranked, start=1):
+            writer.writerow(_row_to_record(row, score, rank))
+
+
+def write_markets_config(market_code, krw_amount, params):
+    """
+    최적 조합을 watchdog이 읽는 markets_config.json 형식으로 기록한다.
+    다른 마켓 설정은 그대로 두고, GUI와 같이 config/와 dist/config/ 모두에 저장한다.
+    """
+    start_price, buy_gap, buy_mode, sell_gap, sell_mode, max_levels = params
+    saved = []
+    for cfg_dir in (CONFIG_DIR, DIST_CONFIG_DIR):
+        cfg_file = os.path.join(cfg_dir, 'markets_config.json')
+        if cfg_dir == DIST_CONFIG_DIR and not os.path.isdir(os.path.dirname(cfg_dir)):
+            continue  # dist 빌드가 없으면 건너뜀
+        try:
+            configs = {}
+            if os.path.exists(cfg_file):
+                with open(cfg_file, 'r', encoding='utf-8') as f:
+                    configs = json.load(f)
+            prev = configs.get(market_code, {})
+            configs[market_code] = {
+                'enabled': prev.get('enabled', True),
+                'start_price': start_price,
+                'krw_amount': krw_amount,
+                'max_levels': max_levels,
+                'resume': 0,
+                'buy_gap': buy_gap,
+                'buy_mode': buy_mode,
+                'sell_gap': sell_gap,
+                'sell_mode': sell_mode,
+            }
+            os.makedirs(cfg_dir, exist_ok=True)
+            with open(cfg_file, 'w', encoding='utf-8') as f:
+                json.dump(configs, f, indent=2, ensure_ascii=False)
+            saved.append(cfg_file)
+            print(f"💾 설정 저장: {cfg_file}")
+        except Exception as e:
+            print(f"⚠️ 설정 저장 실패 ({cfg_dir}): {e}")
+    return saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description='bithumbSplit 그리드 설정 파라미터 스윕')
+    parser.add_argument('--market', default='BTC', help='코인 (기본값: BTC)')
+    parser.add_argument('--data', required=True, help='캔들/체결 CSV 경로 또는 기록 저장소 (예: store:trade:20261001-20261019)')
+    parser.add_argument('--krw-amount', type=float, default=1000000, help='매수금액 (고정)')
+    parser.add_argument('--start-prices', required=True, help='시작가 목록/범위 (예: 140000000,139000000)')
+    parser.add_argument('--buy-gaps', default='0.2', help='매수 간격 목록/범위 (예: 0.1:0.5:0.05)')
+    parser.add_argument('--sell-gaps', default='0.3', help='매도 간격 목록/범위')
+    parser.add_argument('--buy-modes', default='percent', help='매수 간격 모드 목록 (percent,price)')
+    parser.add_argument('--sell-modes', default='percent', help='매도 간격 모드 목록 (percent,price)')
+    parser.add_argument('--max-levels', default='60', help='최대차수 목록/범위')
+    parser.add_argument('--rank-by', choices=['profit', 'roi', 'total'], default='profit',
+                        help='순위 기준: 실현수익 / 최대묶인원화 대비 수익률 / 실현+평가 손익')
+    parser.add_argument('--max-capital', type=float, help='최대 묶인 원화 한도 (초과 조합 제외)')
+    parser.add_argument('--top', type=int, default=20, help='순위 리포트 개수')
+    parser.add_argument('--processes', type=int, help='프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--fee', type=float, default=FEE_RATE, help=f'수수료율 (기본값: {FEE_RATE})')
+    parser.add_argument('--write-config', action='store_true', help='1위 조합을 markets_config.json에 기록')
+    args = parser.parse_args()
+
+    market_code = args.market.upper()
+    market = f"KRW-{market_code}"
+
+    modes = {'percent', 'price'}
+    buy_modes = parse_values(args.buy_modes, str)
+    sell_modes = parse_values(args.sell_modes, str)
+    if not set(buy_modes) <= modes or not set(sell_modes) <= modes:
+        parser.error("모드는 'percent' 또는 'price' 여야 합니다.")
+
+    start_prices = parse_values(args.start_prices)
+    buy_gaps = parse_values(args.buy_gaps)
+    sell_gaps = parse_values(args.sell_gaps)
+    max_levels = parse_values(args.max_levels, int)
+    total = len(start_prices) * len(buy_gaps) * len(buy_modes) * len(sell_gaps) * len(sell_modes) * len(max_levels)
+
+    _, prices = load_prices(args.data, market)
+    stamp = time.strftime('%Y%m%d_%H%M%S')
+    price_path = write_price_file(prices, os.path.join(LOGS_DIR, 'sweep', f'prices_{market_code}_{stamp}.bin'))
+    stream_path = os.path.join(LOGS_DIR, 'sweep', f'sweep_{market_code}_{stamp}.csv')
+    ranked_path = os.path.join(LOGS_DIR, 'sweep', f'sweep_{market_code}_{stamp}_ranked.csv')
+
+    print(f"🚀 스윕 시작: {market} / {total:,}개 조합 / 가격 샘플 {len(prices):,}개 / 프로세스 {args.processes or os.cpu_count()}개")
+    started = time.perf_counter()
+    try:
+        ranked, evaluated, skipped = run_sweep(
+            price_path, market, args.krw_amount,
+            build_combinations(start_prices, buy_gaps, buy_modes, sell_gaps, sell_modes, max_levels),
+            stream_path,
+            rank_by=args.rank_by,
+            top_n=args.top,
+            max_capital=args.max_capital,
+            fee_rate=args.fee,
+            processes=args.processes,
+        )
+    finally:
+        try:
+            os.remove(price_path)
+        except OSError:
+            pass
+    elapsed = time.perf_counter() - started
+
+    write_ranked_report(ranked, ranked_path)
+    print(f"\n✅ {evaluated:,}개 평가 / {skipped:,}개 제외 / {elapsed:.1f}초")
+    print(f"📝 전체 결과: {stream_path}")
+    print(f"🏆 순위 리포트: {ranked_path}\n")
+
+    for rank, (score, row) in enumerate(ranked[:10], start=1):
+        start_price, buy_gap, buy_mode, sell_gap, sell_mode, levels = row["params"]
+        print(f"{rank:>2}. 수익 {row['realized_profit']:>12,.0f}원 / 최대묶임 {row['peak_capital']:>12,.0f}원 / "
+              f"시작가 {start_price:,.0f} / 매수 {buy_gap}({buy_mode}) / 매도 {sell_gap}({sell_mode}) / {levels}차")
+
+    if args.write_config:
+        if ranked:
+            write_markets_config(market_code, args.krw_amount, ranked[0][1]["params"])
+        else:
+            print("⚠️ 유효한 조합이 없어 설정을 기록하지 않습니다.")
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    main()
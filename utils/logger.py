@@ -0,0 +1,228 @@
+# bithumbSplit/utils/logger.py
+# 매매 루프용 비동기 구조화 로거 (JSONL + 크기/날짜 기준 회전)
+# log.info()는 (시각, 레벨, 메시지 템플릿, 필드)를 큐에 넣기만 하고 즉시 반환한다.
+# 메시지 포맷팅(str.format), JSON 직렬화, 파일 쓰기, 콘솔 출력은 백그라운드 스레드가 묶어서 처리한다.
+#
+# 한 줄 예:
+#   {"ts": "2026-10-19T12:00:00.123", "lvl": "INFO", "market": "KRW-BTC", "event": "buy_filled",
+#    "level": 3, "price": 139500000, "msg": "✅ [3차] 매수 체결 완료: 139500000원"}
+#
+# 조회 예: jq -c 'select(.event == "sell_filled")' logs/trade_KRW_BTC.jsonl
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+
+# 회전 기준: 파일 크기(바이트) 또는 날짜가 바뀌면 새 파일. 보관 개수를 넘는 오래된 파일은 지운다
+LOG_MAX_BYTES = int(os.getenv('BITHUMBSPLIT_LOG_MAX_BYTES', str(20 * 1024 * 1024)))
+LOG_BACKUPS = int(os.getenv('BITHUMBSPLIT_LOG_BACKUPS', '14'))
+# 콘솔(표준출력)에도 사람이 읽는 형식으로 출력할지 (Watchdog이 띄운 워커는 0 → 파일에만 기록)
+LOG_CONSOLE = os.getenv('BITHUMBSPLIT_LOG_CONSOLE', '1') != '0'
+LOG_LEVEL = DEBUG if os.getenv('BITHUMBSPLIT_LOG_DEBUG') == '1' else INFO
+
+QUEUE_MAX = 10000
+BATCH_MAX = 500  # 한 번에 꺼내 쓰는 최대 줄 수
+FLUSH_TIMEOUT = 5  # 프로세스 종료 시 남은 로그 기록 대기 (초)
+
+_queue = queue.Queue(maxsize=QUEUE_MAX)  # (path, ts, levelno, fields, template, values) 또는 flush 이벤트
+_files = {}  # 경로 -> RotatingFile (쓰기 스레드 전용)
+_dropped = 0
+_worker_lock = threading.Lock()
+_worker_thread = None
+
+
+def rotate_file(path, backups=LOG_BACKUPS):
+    """path → path.1 → path.2 ... 로 밀어내고 backups개를 넘는 파일은 지운다"""
+    if not os.path.exists(path):
+        return
+    oldest = f"{path}.{backups}"
+    if os.path.exists(oldest):
+        os.remove(oldest)
+    for index in range(backups - 1, 0, -1):
+        src = f"{path}.{index}"
+        if os.path.exists(src):
+            os.replace(src, f"{path}.{index + 1}")
+    if backups > 0:
+        os.replace(path, f"{path}.1")
+    else:
+        os.remove(path)
+
+
+class RotatingFile:
+    """크기 또는 날짜가 바뀌면 회전하는 추가 전용 텍스트 파일"""
+
+    def __init__(self, path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = None
+        self._size = 0
+        self._day = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._size = self._file.tell()
+        try:
+            self._day = datetime.fromtimestamp(os.path.getmtime(self.path)).date() if self._size else None
+        except OSError:
+            self._day = None
+
+    def write(self, text, day):
+        if self._file is None:
+            self._open()
+        size = len(text.encode('utf-8'))
+        if self._size and (self._size + size > self.max_bytes or (self._day and day != self._day)):
+            self._file.close()
+            rotate_file(self.path, self.backups)
+            self._open()
+        self._file.write(text)
+        self._size += size
+        self._day = day
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _render(template, values, fields):
+    if not values and not fields:
+        return template
+    try:
+        return template.format(*values, **fields)
+    except (IndexError, KeyError, ValueError):
+        return f"{template} {values or ''}"
+
+
+def _write_batch(batch):
+    touched = set()
+    for path, ts, levelno, fields, template, values in batch:
+        when = datetime.fromtimestamp(ts)
+        msg = _render(template, values, fields)
+        record = {"ts": when.isoformat(timespec='milliseconds'), "lvl": LEVEL_NAMES.get(levelno, str(levelno))}
+        record.update(fields)
+        record["msg"] = msg
+        line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+        rotating = _files.get(path)
+        if rotating is None:
+            rotating = _files[path] = RotatingFile(path)
+        try:
+            rotating.write(line, when.date())
+            touched.add(rotating)
+        except OSError as e:
+            print(f"⚠️ 로그 파일 기록 실패: {path} / {e}")
+        if LOG_CONSOLE:
+            sys.stdout.write(msg + '\n')  # 한 번에 써서 다른 스레드 출력과 줄이 섞이지 않게
+    for rotating in touched:
+        rotating.flush()
+    if LOG_CONSOLE:
+        sys.stdout.flush()
+
+
+def _worker_loop():
+    global _dropped
+    while True:
+        item = _queue.get()
+        batch = []
+        events = []
+        while True:
+            if isinstance(item, threading.Event):
+                events.append(item)
+            else:
+                batch.append(item)
+            if len(batch) >= BATCH_MAX:
+                break
+            try:
+                item = _queue.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            if _dropped:
+                dropped, _dropped = _dropped, 0
+                print(f"⚠️ 로그 대기열이 가득 차 {dropped}줄을 버렸습니다")
+            _write_batch(batch)
+        except Exception as e:
+            print(f"🚫 로그 기록 스레드 오류: {e}")
+        finally:
+            for event in events:
+                event.set()
+
+
+def _ensure_worker():
+    global _worker_thread
+    if _worker_thread and _worker_thread.is_alive():
+        return
+    with _worker_lock:
+        if _worker_thread and _worker_thread.is_alive():
+            return
+        _worker_thread = threading.Thread(target=_worker_loop, name="log-writer", daemon=True)
+        _worker_thread.start()
+
+
+class TradeLogger:
+    """
+    마켓별 구조화 로거
+    :param path: JSONL 파일 경로
+    :param fields: 모든 줄에 붙는 고정 필드 (예: market)
+    메시지는 str.format 템플릿이며 위치 인자와 키워드 필드로 쓰기 스레드에서 포맷한다.
+    키워드 필드는 JSON 필드로도 그대로 남는다. (차수는 level=, 이벤트 종류는 event=)
+    """
+
+    def __init__(self, path, **fields):
+        self.path = path
+        self.fields = fields
+
+    def log(self, levelno, template, *values, **fields):
+        global _dropped
+        if levelno < LOG_LEVEL:
+            return
+        _ensure_worker()
+        merged = {**self.fields, **fields} if fields else self.fields
+        try:
+            _queue.put_nowait((self.path, time.time(), levelno, merged, template, values))
+        except queue.Full:
+            _dropped += 1
+
+    def debug(self, template, *values, **fields):
+        self.log(DEBUG, template, *values, **fields)
+
+    def info(self, template, *values, **fields):
+        self.log(INFO, template, *values, **fields)
+
+    def warning(self, template, *values, **fields):
+        self.log(WARNING, template, *values, **fields)
+
+    def error(self, template, *values, **fields):
+        self.log(ERROR, template, *values, **fields)
+
+
+def flush(timeout=FLUSH_TIMEOUT):
+    """큐에 쌓인 로그를 모두 기록할 때까지 최대 timeout초 기다린다"""
+    if not (_worker_thread and _worker_thread.is_alive()):
+        return
+    done = threading.Event()
+    try:
+        _queue.put(done, timeout=timeout)
+    except queue.Full:
+        return
+    done.wait(timeout)
+
+
+# 종료 직전 로그(오류/중단)가 데몬 스레드와 함께 사라지지 않도록
+atexit.register(flush)
@@ -0,0 +1,162 @@
+# bithumbSplit/utils/startup.py
+# 빠른 기동용 도우미: 무거운 모듈 지연 import, .env 지연 로드, 기동 시간 보고
+# - lazy_import('requests')는 처음 속성에 접근할 때 실제로 import 한다.
+#   (워커 --help / 기록 재생 모의투자 / GUI 창 표시 전에는 requests·jwt를 읽지 않음)
+# - load_env()는 .env를 프로세스당 한 번만 읽는다. API 키/텔레그램 토큰이 처음 필요할 때 호출된다.
+#   import 시점에 환경변수를 읽는 설정(TELEGRAM_*, BITHUMBSPLIT_API_*, BITHUMBSPLIT_LOG_* 등)도 .env에 둘 수 있도록
+#   엔트리 스크립트(worker.py/watchdog.py/main.py)는 그 모듈들을 import하기 전에 load_env()를 먼저 호출한다.
+# - enable()을 켜면 이후 import되는 모듈별 실행 시간(-X importtime 형식: 자기 시간/누적 시간)을 모으고,
+#   ready()에서 단계별 경과 시간과 함께 한 번 출력한다.
+#   켜는 방법: worker.py/main.py --startup-report 또는 환경변수 BITHUMBSPLIT_STARTUP_REPORT=1
+
+import os
+import sys
+import time
+import importlib
+import threading
+
+STARTUP_REPORT = os.getenv('BITHUMBSPLIT_STARTUP_REPORT') == '1'
+REPORT_TOP = 15  # 보고서에 보여줄 모듈 수 (누적 시간 순)
+
+_t0 = time.perf_counter()  # 이 모듈을 처음 import한 시각 (엔트리 스크립트 맨 앞에서 import)
+_phases = []  # [(단계 이름, _t0 기준 초)]
+_imports = []  # [(모듈, 자기 시간, 누적 시간, 깊이)] import 완료 순
+_stack = []  # 실행 중인 import의 하위 import 누적 시간
+_enabled = False
+_reported = False
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+class _LazyModule:
+    """속성에 처음 접근할 때 import 하는 모듈 대리 객체"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """이미 import된 모듈이면 그대로, 아니면 처음 사용할 때 import 하는 대리 객체"""
+    return sys.modules.get(name) or _LazyModule(name)
+
+
+def load_env():
+    """.env 파일을 한 번만 읽는다 (python-dotenv가 없으면 환경변수만 사용)"""
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if _env_loaded:
+            return
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        _env_loaded = True
+
+
+def report_requested():
+    """BITHUMBSPLIT_STARTUP_REPORT=1 인지 (.env에 둔 값 포함 - load_env() 뒤에 호출)"""
+    return STARTUP_REPORT or os.getenv('BITHUMBSPLIT_STARTUP_REPORT') == '1'
+
+
+def getenv(name, default=None):
+    load_env()
+    return os.getenv(name, default)
+
+
+class _TimedLoader:
+    """실제 로더의 exec_module 실행 시간을 잰다 (나머지 속성은 그대로 위임)"""
+
+    def __init__(self, loader, name):
+        self._loader = loader
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        depth = len(_stack)
+        _stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = _stack.pop()
+            if _stack:
+                _stack[-1] += elapsed
+            _imports.append((self._name, elapsed - children, elapsed, depth))
+
+
+class _TimingFinder:
+    """다른 finder가 찾은 spec의 로더를 _TimedLoader로 감싼다"""
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, name)
+            return spec
+        return None
+
+
+def enable():
+    """이후 import 시간 측정 시작 (엔트리 스크립트에서 무거운 import 전에 호출)"""
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+    sys.meta_path.insert(0, _TimingFinder())
+    mark('측정 시작')
+
+
+def is_enabled():
+    return _enabled
+
+
+def mark(phase):
+    """단계 경과 시간 기록"""
+    _phases.append((phase, time.perf_counter() - _t0))
+
+
+def ready(phase):
+    """기동 완료 지점. 측정 중이면 보고서를 한 번 출력하고 측정을 끈다"""
+    global _reported
+    if not _enabled or _reported:
+        return
+    mark(phase)
+    _reported = True
+    sys.meta_path[:] = [f for f in sys.meta_path if not isinstance(f, _TimingFinder)]
+    print(format_report())
+
+
+def format_report(top=REPORT_TOP):
+    lines = ["⏱️ [기동 시간 보고]"]
+    prev = 0.0
+    for phase, at in _phases:
+        lines.append(f"  {at * 1000:8.1f} ms  (+{(at - prev) * 1000:7.1f})  {phase}")
+        prev = at
+    if _imports:
+        total = sum(cumulative for _, _, cumulative, depth in _imports if depth == 0)
+        lines.append(f"  import 합계 {total * 1000:.1f} ms / {len(_imports)}개 모듈 — 누적 시간 상위 {top}개:")
+        lines.append("      자기(ms) |   누적(ms) | 모듈")
+        ranked = sorted(_imports, key=lambda item: item[2], reverse=True)[:top]
+        for name, self_time, cumulative, depth in ranked:
+            lines.append(f"    {self_time * 1000:8.1f} | {cumulative * 1000:10.1f} | {'  ' * depth}{name}")
+    return '\n'.join(lines)
@@ -1,38 +1,382 @@
 # bitsplit/utils/telegram.py
 # 텔레그램 알림 전송 유틸리티
+# send_telegram_message()는 큐에 넣기만 하고 즉시 반환한다.
+# 실제 전송은 백그라운드 스레드가 연결을 재사용하는 세션으로 처리한다. (타임아웃 + 재시도)
+# 같은 마켓의 일반 알림은 짧은 창 안에서 한 건으로 묶고, 중요 알림을 먼저 보내며, 채팅방 속도 제한을 지킨다.
+# enable_outbox()를 호출한 프로세스(워커/워치독)는 알림을 logs/ 아래 outbox 파일에 남기고,
+# 전송 실패나 비정상 종료로 못 보낸 알림을 다음 시작 때 다시 보낸다.
 
 import os
-import requests
-from dotenv import load_dotenv
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+from collections import deque
 
-# .env 파일에서 토큰과 채팅 ID 로드
-load_dotenv()
-TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+from utils.startup import lazy_import, getenv
 
+# requests는 전송 스레드가 처음 보낼 때 import
+requests = lazy_import('requests')
 
-def send_telegram_message(message):
+if getattr(sys, 'frozen', False):
+    _BASE_DIR = os.path.dirname(sys.executable)
+else:
+    _BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTBOX_DIR = os.path.join(_BASE_DIR, 'logs')
+
+SEND_TIMEOUT = (3, 10)  # (연결, 응답) 초
+SEND_RETRIES = 3
+SEND_BACKOFF = 1  # 초, 재시도마다 2배
+QUEUE_MAX = 1000
+FLUSH_TIMEOUT = 10  # 프로세스 종료 시 남은 메시지 전송 대기 (초)
+MAX_MESSAGE_LEN = 4000  # 텔레그램 한 메시지 한도(4096자) 이하로 묶음
+
+# 같은 마켓의 일반 알림은 이 시간(초) 동안 모아 한 메시지로 보낸다 (0이면 묶지 않음)
+DIGEST_WINDOW = float(os.getenv("TELEGRAM_DIGEST_WINDOW", "10"))
+# 채팅방 전송 속도 제한: 최소 간격(초) / 분당 최대 건수
+MIN_SEND_INTERVAL = float(os.getenv("TELEGRAM_MIN_INTERVAL", "1"))
+MAX_PER_MINUTE = int(os.getenv("TELEGRAM_MAX_PER_MINUTE", "20"))
+
+RETRY_DELAY = 60  # 전송 실패한 알림을 같은 프로세스에서 다시 시도하기까지 대기 (초)
+OUTBOX_COMPACT_BYTES = 1024 * 1024  # outbox 파일이 이보다 커지면 미전송분만 남기고 정리
+
+_inbox = queue.Queue(maxsize=QUEUE_MAX)  # (critical, market, message, msg_id, created)
+_outbox = None
+_msg_seq = 0
+_flush_requested = threading.Event()
+_pending_lock = threading.Lock()
+_pending = 0  # 접수됐지만 아직 전송(또는 포기)되지 않은 메시지 수
+_worker_lock = threading.Lock()
+_worker_thread = None
+_session = None
+_credentials = None  # (토큰, 채팅 ID) - 처음 알림을 보낼 때 .env에서 읽는다
+
+
+def _get_credentials():
+    global _credentials
+    if _credentials is None:
+        _credentials = (getenv("TELEGRAM_TOKEN"), getenv("TELEGRAM_CHAT_ID"))
+    return _credentials
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2))
+    return _session
+
+
+def _post(message):
     """
-    텔레그램 메시지 전송 함수
-    :param message: 전송할 문자열 메시지
+    텔레그램 API 호출 (재시도 포함)
+    :return: True 성공 / False 일시적 실패(나중에 재시도) / None 재시도해도 실패할 메시지
     """
-    if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
-        print("⚠️ TELEGRAM_TOKEN 또는 TELEGRAM_CHAT_ID가 설정되지 않았습니다.")
-        return
-
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
+    token, chat_id = _get_credentials()
+    url = f"https://api.telegram.org/bot{token}/sendMessage"
     data = {
-        "chat_id": TELEGRAM_CHAT_ID,
+        "chat_id": chat_id,
         "text": message,
         "parse_mode": "HTML"
     }
 
+    delay = SEND_BACKOFF
+    for attempt in range(1, SEND_RETRIES + 1):
+        try:
+            response = _get_session().post(url, data=data, timeout=SEND_TIMEOUT)
+            if response.status_code == 200:
+                return True
+            if response.status_code == 429:
+                # 속도 제한: 서버가 알려준 시간만큼 대기 후 재시도
+                try:
+                    delay = float(response.json().get("parameters", {}).get("retry_after", delay))
+                except ValueError:
+                    pass
+            elif 400 <= response.status_code < 500:
+                # 메시지 형식 오류 등은 재시도해도 실패
+                print(f"❌ 텔레그램 전송 실패: {response.text}")
+                return None
+            print(f"⚠️ 텔레그램 전송 실패({attempt}/{SEND_RETRIES}): {response.status_code}")
+        except Exception as e:
+            print(f"🚫 텔레그램 요청 중 오류 발생({attempt}/{SEND_RETRIES}): {e}")
+        if attempt < SEND_RETRIES:
+            time.sleep(delay)
+            delay *= 2
+    return False
+
+
+class _Outbox:
+    """
+    알림 outbox (append-only JSON Lines)
+    접수 시 {"id", "t", "m", "market", "c"}, 전송 완료 시 {"id", "done": 1}을 덧붙인다.
+    파일 쓰기는 전송 스레드만 하며, 받은 만큼 모아서 한 번에 쓴다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.undelivered = {}  # id -> 접수 기록
+        self._buffer = []
+
+    def load(self):
+        """미전송 알림을 읽어 오래된 순으로 돌려주고, 파일은 미전송분만 남기도록 정리한다."""
+        records = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # 쓰다가 끊긴 마지막 줄
+                    if rec.get('done'):
+                        records.pop(rec.get('id'), None)
+                    elif 'm' in rec:
+                        records[rec['id']] = rec
+        except FileNotFoundError:
+            pass
+        self.undelivered = records
+        self._compact()
+        return sorted(records.values(), key=lambda r: r.get('t', 0))
+
+    def add(self, msg_id, created, market, critical, message):
+        rec = {"id": msg_id, "t": created, "m": message, "market": market, "c": critical}
+        self.undelivered[msg_id] = rec
+        self._buffer.append(json.dumps(rec, ensure_ascii=False))
+
+    def write_pending(self):
+        if not self._buffer:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(self._buffer) + '\n')
+        self._buffer.clear()
+
+    def mark_done(self, ids):
+        for msg_id in ids:
+            if self.undelivered.pop(msg_id, None) is not None:
+                self._buffer.append(json.dumps({"id": msg_id, "done": 1}))
+        self.write_pending()
+        try:
+            if os.path.getsize(self.path) > OUTBOX_COMPACT_BYTES:
+                self._compact()
+        except OSError:
+            pass
+
+    def _compact(self):
+        self.write_pending()
+        if not os.path.exists(self.path):
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for rec in sorted(self.undelivered.values(), key=lambda r: r.get('t', 0)):
+                f.write(json.dumps(rec, ensure_ascii=False) + '\n')
+        os.replace(tmp, self.path)
+
+
+def _done(count):
+    global _pending
+    with _pending_lock:
+        _pending -= count
+
+
+class _RateLimiter:
+    """최소 간격 + 분당 건수 제한 (단일 전송 스레드 전용)"""
+
+    def __init__(self, min_interval, per_minute):
+        self.min_interval = min_interval
+        self.per_minute = per_minute
+        self.sent = deque()
+
+    def wait_time(self, now):
+        while self.sent and now - self.sent[0] >= 60:
+            self.sent.popleft()
+        wait = 0.0
+        if self.sent:
+            wait = max(wait, self.min_interval - (now - self.sent[-1]))
+        if self.per_minute and len(self.sent) >= self.per_minute:
+            wait = max(wait, 60 - (now - self.sent[0]))
+        return wait
+
+    def record(self, now):
+        self.sent.append(now)
+
+
+def _build_digest(market, items):
+    """
+    같은 마켓 알림 여러 건을 한 메시지로 합친다. 길이 한도를 넘으면 여러 개로 나눈다.
+    :param items: [(메시지, msg_id)]
+    :return: [(묶은 메시지, [msg_id])]
+    """
+    if len(items) == 1:
+        return [(items[0][0], [items[0][1]])]
+    chunks = []
+    header = f"📦 <b>[{market}] 알림 {len(items)}건</b>\n\n"
+    body, ids = header, []
+    for msg, msg_id in items:
+        if len(body) + len(msg) + 2 > MAX_MESSAGE_LEN and ids:
+            chunks.append((body.rstrip(), ids))
+            body, ids = header, []
+        body += msg + "\n\n"
+        ids.append(msg_id)
+    chunks.append((body.rstrip(), ids))
+    return chunks
+
+
+def _worker_loop():
+    limiter = _RateLimiter(MIN_SEND_INTERVAL, MAX_PER_MINUTE)
+    digests = {}  # market -> (첫 접수 시각, [(메시지, msg_id)])
+    critical = deque()  # (메시지, [msg_id], 남은 _pending 차감 건수)
+    routine = deque()
+    retry = deque()  # (재시도 시각, 메시지, [msg_id])
+
+    while True:
+        now = time.time()
+        # 다음에 처리할 일이 생길 때까지만 대기
+        timeouts = [1.0]
+        if digests:
+            timeouts.append(min(first for first, _ in digests.values()) + DIGEST_WINDOW - now)
+        if critical or routine:
+            timeouts.append(limiter.wait_time(now))
+        try:
+            is_critical, market, message, msg_id, created = _inbox.get(timeout=max(0.0, min(timeouts)))
+            if _outbox is not None and created is not None:
+                _outbox.add(msg_id, created, market, is_critical, message)
+            if is_critical:
+                critical.append((message, [msg_id], 1))
+            elif market and DIGEST_WINDOW > 0:
+                first, items = digests.setdefault(market, (time.time(), []))
+                items.append((message, msg_id))
+            else:
+                routine.append((message, [msg_id], 1))
+            # 같은 순간 들어온 메시지를 한꺼번에 받기 위해 바로 다음 루프로
+            continue
+        except queue.Empty:
+            pass
+
+        # 받은 알림을 전송 전에 outbox에 한 번에 기록
+        if _outbox is not None:
+            try:
+                _outbox.write_pending()
+            except OSError as e:
+                print(f"⚠️ 텔레그램 outbox 기록 실패: {e}")
+
+        # 창이 끝난(또는 flush 요청된) 마켓 묶음을 전송 대기열로
+        now = time.time()
+        flushing = _flush_requested.is_set()
+        for market in [m for m, (first, _) in digests.items() if flushing or now - first >= DIGEST_WINDOW]:
+            _, items = digests.pop(market)
+            for text, ids in _build_digest(market, items):
+                routine.append((text, ids, len(ids)))
+        if flushing and not digests:
+            _flush_requested.clear()
+        while retry and retry[0][0] <= now:
+            _, text, ids = retry.popleft()
+            routine.append((text, ids, 0))
+
+        # 중요 알림(실패/재시작)을 일반 알림보다 먼저, 속도 제한 안에서 전송
+        target = critical if critical else routine
+        if target and limiter.wait_time(now) <= 0:
+            message, ids, count = target.popleft()
+            try:
+                ok = _post(message)
+                if ok is False and _outbox is not None:
+                    # outbox에 남아 있으므로 잠시 후 다시 시도 (프로세스가 죽어도 다음 시작 때 재전송)
+                    retry.append((time.time() + RETRY_DELAY, message, ids))
+                elif _outbox is not None:
+                    _outbox.mark_done(ids)
+            except Exception as e:
+                print(f"🚫 텔레그램 전송 스레드 오류: {e}")
+            finally:
+                limiter.record(time.time())
+                _done(count)
+
+
+def _ensure_worker():
+    global _worker_thread
+    if _worker_thread and _worker_thread.is_alive():
+        return
+    with _worker_lock:
+        if _worker_thread and _worker_thread.is_alive():
+            return
+        _worker_thread = threading.Thread(target=_worker_loop, name="telegram-sender", daemon=True)
+        _worker_thread.start()
+
+
+def send_telegram_message(message, market=None, critical=False):
+    """
+    텔레그램 메시지 전송 요청 (비동기)
+    :param message: 전송할 문자열 메시지
+    :param market: 지정하면 같은 마켓 일반 알림을 DIGEST_WINDOW 동안 모아 한 건으로 보낸다
+    :param critical: 실패/재시작 등 중요 알림. 묶지 않고 대기 중인 일반 알림보다 먼저 보낸다
+    매매 루프는 큐에 넣는 비용만 부담하고, 전송은 백그라운드 스레드가 처리한다.
+    """
+    global _pending, _msg_seq
+    if not all(_get_credentials()):
+        print("⚠️ TELEGRAM_TOKEN 또는 TELEGRAM_CHAT_ID가 설정되지 않았습니다.")
+        return
+
+    _ensure_worker()
     try:
-        response = requests.post(url, data=data)
-        if response.status_code != 200:
-            print(f"❌ 텔레그램 전송 실패: {response.text}")
-    except Exception as e:
-        print(f"🚫 텔레그램 요청 중 오류 발생: {e}")
+        with _pending_lock:
+            _pending += 1
+            _msg_seq += 1
+            msg_id = f"{os.getpid()}-{int(time.time())}-{_msg_seq}"
+        _inbox.put_nowait((critical, market, message, msg_id, time.time()))
+    except queue.Full:
+        _done(1)
+        print(f"⚠️ 텔레그램 전송 대기열이 가득 차 메시지를 버립니다: {message[:40]}")
+
+
+def enable_outbox(name):
+    """
+    이 프로세스의 알림을 logs/telegram_outbox_{name}.jsonl 에 남기고,
+    이전 실행에서 전송하지 못한 알림을 다시 보낸다. 다시 보낸 건수 반환
+    :param name: 프로세스별 이름 (예: KRW_BTC, watchdog) - 프로세스마다 파일을 따로 쓴다
+    """
+    global _outbox, _pending
+    if not all(_get_credentials()):
+        return 0
+    outbox = _Outbox(os.path.join(OUTBOX_DIR, f'telegram_outbox_{name}.jsonl'))
+    try:
+        pending = outbox.load()
+    except OSError as e:
+        print(f"⚠️ 텔레그램 outbox 로드 실패: {e}")
+        return 0
+    _outbox = outbox
+
+    _ensure_worker()
+    for rec in pending:
+        created = datetime.fromtimestamp(rec.get('t', 0)).strftime('%m-%d %H:%M:%S')
+        message = f"♻️ <i>미전송 알림 재전송 ({created})</i>\n{rec['m']}"
+        try:
+            with _pending_lock:
+                _pending += 1
+            # 이미 파일에 있는 기록이므로 created=None으로 넣어 다시 쓰지 않는다
+            _inbox.put_nowait((rec.get('c', False), rec.get('market'), message, rec['id'], None))
+        except queue.Full:
+            _done(1)
+            break
+    if pending:
+        print(f"♻️ 미전송 텔레그램 알림 {len(pending)}건 재전송")
+    return len(pending)
+
+
+def flush(timeout=FLUSH_TIMEOUT):
+    """모아 둔 묶음까지 즉시 보내고, 모두 전송될 때까지 최대 timeout초 기다린다. 남은 건수 반환"""
+    deadline = time.time() + timeout
+    _flush_requested.set()
+    while _pending > 0 and time.time() < deadline:
+        if not (_worker_thread and _worker_thread.is_alive()):
+            break
+        _flush_requested.set()
+        time.sleep(0.05)
+    return _pending
+
+
+# 종료 직전 메시지(워커 종료/오류 알림)가 데몬 스레드와 함께 사라지지 않도록
+atexit.register(flush)
 
 # 텔레그램 메시지 템플릿 모음
 MSG_AUTO_TRADE_START = (
@@ -1,13 +1,22 @@
 # watchdog.py
 # 자동매매 프로세스 감시 및 자동 재시작 스크립트
-# 30초마다 heartbeat 파일을 확인하고, stale하면 프로세스 재시작
+# 워커가 매 루프 보내는 하트비트 데이터그램을 받아 수 초 안에 멈춤/종료를 감지하고 재시작
+# (소켓을 쓸 수 없거나 하트비트가 오지 않는 워커는 30초마다 공유 상태판으로 확인)
 # 1시간마다 진행 현황 요약 메시지 전송 (주문 리스트 포함)
 
 import os
 import json
 import time
+import random
+import select
+import signal
+import socket
 import subprocess
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from datetime import datetime
 from pathlib import Path
 
@@ -20,15 +29,43 @@ else:
 if str(base_path) not in sys.path:
     sys.path.insert(0, str(base_path))
 
-from utils.telegram import send_telegram_message
+# .env의 설정(TELEGRAM_*, BITHUMBSPLIT_* 포트/로그 등)은 아래 모듈들이 import 시점에 읽으므로 먼저 로드
+from utils import startup
+startup.load_env()
+
+from utils.telegram import send_telegram_message, enable_outbox
 from api.api import get_order_list
+from shared.heartbeat import HeartbeatListener
+from shared.metrics import PrometheusWriter
+from shared.status_board import get_board, as_heartbeat
+from utils.logger import rotate_file
 
 LOGS_DIR = os.path.join(base_path, 'logs')
+# 워커 표준출력 로그(worker_*.log)는 시작 시 이 크기를 넘으면 회전 (매매 기록은 trade_*.jsonl)
+WORKER_LOG_MAX_BYTES = 10 * 1024 * 1024
 CONFIG_DIR = os.path.join(base_path, 'config')
 DIST_CONFIG_FILE = os.path.join(base_path, 'dist', 'config', 'markets_config.json')
 MARKETS_CONFIG_FILE = os.path.join(CONFIG_DIR, 'markets_config.json')
-HEARTBEAT_TIMEOUT = 120  # 2분 이상 응답 없으면 재시작
-CHECK_INTERVAL = 30  # 30초마다 체크
+HEARTBEAT_TIMEOUT = 120  # 2분 이상 응답 없으면 재시작 (상태판)
+CHECK_INTERVAL = 30  # 30초마다 체크 (상태판 / 상태 출력)
+STALL_TIMEOUT = 45  # 소켓 하트비트(워커 백그라운드 스레드가 5초마다 보냄)가 이 시간 동안 안 오면 프로세스가 멈춘 것으로 판단
+# 매매 루프 진행(progress_ts)이 이 시간 동안 없으면 루프가 멈춘 것으로 판단. 한 루프의 최악 시간 기준:
+#   주문 1건 = 쓰기 타임아웃 최대 10초 × 3회 + 재시도 대기 ~3초 + 클라이언트 주문 ID 조회(8초 × 2회 + 대기) ≈ 50초
+#   체결 처리 = 취소(~33초) + 주문 목록 조회(8초 × 3회 + 대기 ≈ 26초) + 주문 2건(~100초) ≈ 160초
+#   헬스체크가 같은 루프에 겹치면(pending 조회 + 목록 조회 + 주문쌍) ≈ +150초 → 최악 약 5분, 2배 여유
+PROGRESS_TIMEOUT = 600
+POLL_INTERVAL = 1  # 소켓 하트비트 확인 주기 (초)
+STARTUP_GRACE = 120  # 재시작 직후 첫 하트비트까지 기다리는 시간 (초기 주문 복구 포함)
+STOP_TIMEOUT = 10  # 기존 워커 종료 요청 후 강제 종료까지 대기 (초)
+# 재시작 정책 (마켓별): 짧게 죽을 때마다 대기를 2배로 늘리고(±지터), 크래시 루프면 보류(park)
+BACKOFF_BASE = 5  # 첫 재시작 대기 (초)
+BACKOFF_MAX = 600  # 재시작 대기 상한 (초)
+BACKOFF_JITTER = 0.2  # 대기 시간 ±20% 무작위 (여러 마켓이 같은 원인으로 죽었을 때 동시 재시작 방지)
+CRASH_LOOP_WINDOW = 900  # 이 시간(초) 안에
+CRASH_LOOP_THRESHOLD = 5  # 이 횟수 이상 실패하면 크래시 루프로 보고 보류
+PARK_DURATION = 1800  # 보류 후 시험 재시작까지 대기 (초)
+HEALTHY_PERIOD = 300  # 이 시간 이상 정상 가동하면 실패 기록 초기화 / 보류 해제
+METRICS_PORT = int(os.getenv('BITHUMBSPLIT_METRICS_PORT', '9108'))  # Prometheus 지표 포트 (0이면 끔)
 SUMMARY_INTERVAL = 3600  # 1시간마다 요약 전송 (초)
 
 # 시작할 자동매매 프로세스 정보
@@ -38,8 +75,149 @@ DEFAULT_MARKETS = ['BTC', 'USDT', 'XRP']  # 기본 모니터링 코인들
 # Watchdog 시작 시간
 WATCHDOG_START_TIME = datetime.now()
 
-# 활성 프로세스 저장 (market -> PID)
+# 활성 프로세스 저장 (market -> WorkerProcess)
 active_processes = {}
+# 마켓별 재시작 횟수 (최초 시작 제외)
+restart_counts = {}
+# 예약된 재시작 시각 (market -> time.time())
+restart_retry_at = {}
+# 재시작 대기 중인 마켓 (market -> 사유)
+pending_restarts = {}
+# 마켓별 재시작 정책 (market -> RestartPolicy)
+restart_policies = {}
+# 소켓 하트비트 수신기 (check_and_restart에서 생성, 실패 시 None → 파일 감시)
+heartbeat_listener = None
+# SIGCHLD 수신 시 대기(select)를 바로 깨우는 소켓 (POSIX 전용)
+_wake_sock = None
+
+
+class WorkerProcess:
+    """Watchdog이 띄운 워커 프로세스 핸들 (Popen 보관, 종료 회수, 가동 시간)"""
+
+    def __init__(self, market, proc, log_path):
+        self.market = market
+        self.proc = proc
+        self.pid = proc.pid
+        self.log_path = log_path
+        self.started = time.time()
+        self.ended = None
+        self.exit_code = None
+
+    def poll(self):
+        """종료됐으면 exit code (이때 자식 프로세스를 회수한다), 실행 중이면 None"""
+        if self.exit_code is None:
+            self.exit_code = self.proc.poll()
+            if self.exit_code is not None:
+                self.ended = time.time()
+        return self.exit_code
+
+    def uptime(self):
+        """가동 시간 (종료된 워커는 종료 시점까지)"""
+        return (self.ended or time.time()) - self.started
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """종료 요청 후 timeout초 안에 끝나지 않으면 강제 종료"""
+        if self.poll() is not None:
+            return
+        print(f"🛑 [{self.market}] 기존 워커 종료 중 (PID: {self.pid})")
+        try:
+            self.proc.terminate()
+            self.exit_code = self.proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            print(f"⚠️ [{self.market}] 응답 없어 강제 종료 (PID: {self.pid})")
+            self.proc.kill()
+            self.exit_code = self.proc.wait()
+        except OSError as e:
+            print(f"⚠️ [{self.market}] 워커 종료 실패 (PID: {self.pid}): {e}")
+        if self.exit_code is not None and self.ended is None:
+            self.ended = time.time()
+
+
+class RestartPolicy:
+    """
+    마켓별 재시작 간격 결정
+    - 가동 HEALTHY_PERIOD 미만으로 죽으면 연속 실패로 보고 BACKOFF_BASE × 2^(n-1) (상한 BACKOFF_MAX, ±지터) 후 재시작
+    - CRASH_LOOP_WINDOW 안에 CRASH_LOOP_THRESHOLD회 실패하면 보류(park): PARK_DURATION 후 한 번씩 시험 재시작
+    - HEALTHY_PERIOD 이상 정상 가동하면 실패 기록을 지우고 보류를 해제한다
+    """
+
+    def __init__(self, market):
+        self.market = market
+        self.streak = 0  # 연속 실패 횟수
+        self.failures = deque()  # 최근 실패 시각
+        self.parked = False
+
+    def record_failure(self, now, uptime):
+        """실패 기록 후 (재시작까지 대기 초, 이번에 새로 보류됐는지) 반환"""
+        if uptime >= HEALTHY_PERIOD:
+            self.streak = 0
+            self.failures.clear()
+        self.streak += 1
+        self.failures.append(now)
+        while self.failures and now - self.failures[0] > CRASH_LOOP_WINDOW:
+            self.failures.popleft()
+
+        if self.parked:
+            return PARK_DURATION, False  # 시험 재시작도 실패 → 다시 보류 (알림은 처음 한 번만)
+        if len(self.failures) >= CRASH_LOOP_THRESHOLD:
+            self.parked = True
+            return PARK_DURATION, True
+
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.streak - 1))
+        return delay * random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER), False
+
+    def record_healthy(self):
+        """정상 가동 확인. 보류 중이던 마켓이 회복됐으면 True"""
+        was_parked = self.parked
+        self.streak = 0
+        self.failures.clear()
+        self.parked = False
+        return was_parked
+
+
+def get_restart_policy(market):
+    policy = restart_policies.get(market)
+    if policy is None:
+        policy = restart_policies[market] = RestartPolicy(market)
+    return policy
+
+
+def format_duration(seconds):
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    return f"{hours}시간 {minutes}분"
+
+
+def _install_sigchld_wakeup():
+    """POSIX: 자식 종료(SIGCHLD) 시 대기 중인 select를 바로 깨운다. Windows는 매 초 poll()로 확인"""
+    global _wake_sock
+    if not hasattr(signal, 'SIGCHLD'):
+        return
+    try:
+        reader, writer = socket.socketpair()
+        reader.setblocking(False)
+        writer.setblocking(False)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.set_wakeup_fd(writer.fileno(), warn_on_full_buffer=False)
+        _wake_sock = (reader, writer)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ SIGCHLD 감지 설정 실패 (1초 주기 확인으로 대체): {e}")
+
+
+def wait_for_events(timeout):
+    """하트비트 수신 또는 자식 종료 신호가 올 때까지 최대 timeout초 대기"""
+    wake = _wake_sock[0] if _wake_sock else None
+    if heartbeat_listener:
+        heartbeat_listener.poll(timeout, wake=wake)
+    elif wake:
+        ready, _, _ = select.select([wake], [], [], timeout)
+        if ready:
+            try:
+                wake.recv(512)
+            except OSError:
+                pass
+    else:
+        time.sleep(timeout)
 
 def load_markets_config():
     """markets_config.json에서 마켓 설정 로드 (dist/config fallback)"""
@@ -68,29 +246,70 @@ def load_markets_config():
         print(f"⚠️ 설정 파일 로드 실패: {e}")
         return {}
 
-def get_heartbeat_file(market):
-    """마켓별 하트비트 파일 경로"""
-    return os.path.join(LOGS_DIR, f'heartbeat_KRW_{market}.json')
+def current_socket_heartbeat(market):
+    """현재 워커 프로세스가 보낸 소켓 하트비트 (경과 초, payload). 종료시킨 이전 프로세스의 것은 무시"""
+    if not heartbeat_listener:
+        return None
+    entry = heartbeat_listener.get(f'KRW-{market}')
+    worker = active_processes.get(market)
+    if entry and worker and entry[1].get('pid') not in (None, worker.pid):
+        return None
+    return entry
 
 def read_heartbeat(market):
-    """하트비트 파일 읽기"""
+    """최신 하트비트 (소켓 수신분 우선, 없으면 상태판)"""
+    if heartbeat_listener:
+        entry = current_socket_heartbeat(market)
+        if entry:
+            hb = dict(entry[1])
+            hb.setdefault('timestamp', datetime.fromtimestamp(hb.get('ts', time.time())).isoformat())
+            return hb
+    return read_status_board(market)
+
+def read_status_board(market):
+    """공유 상태판의 마켓 슬롯을 하트비트 형식으로 읽기 (메모리 읽기, 파일 파싱 없음)"""
     try:
-        hb_file = get_heartbeat_file(market)
-        if not os.path.exists(hb_file):
-            return None
-        
-        with open(hb_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
+        slot = get_board(LOGS_DIR).read(f'KRW-{market}')
+        return as_heartbeat(slot) if slot else None
     except Exception as e:
-        print(f"⚠️ [{market}] 하트비트 읽기 실패: {e}")
+        print(f"⚠️ [{market}] 상태판 읽기 실패: {e}")
         return None
 
-def is_heartbeat_stale(market):
-    """하트비트가 stale인지 확인 (타임스탐프 기반)"""
-    hb = read_heartbeat(market)
+def is_heartbeat_stale(market, hb=None):
+    """
+    하트비트가 stale인지 확인 (소켓: 마지막 수신 시각 / 상태판: 마지막 갱신 시각)
+    :param hb: 이미 읽은 상태판 하트비트가 있으면 넘겨서 다시 읽지 않는다
+    """
+    entry = current_socket_heartbeat(market)
+    if entry:
+        age, hb = entry
+        if hb.get('status') == 'stopped':
+            print(f"⚠️ [{market}] 워커가 종료를 알림")
+            return True
+        if age > STALL_TIMEOUT:
+            print(f"⚠️ [{market}] 하트비트 끊김 감지: {age:.0f}초 응답 없음")
+            return True
+        progress_ts = hb.get('progress_ts') or hb.get('ts')
+        if progress_ts and time.time() - progress_ts > PROGRESS_TIMEOUT:
+            print(f"⚠️ [{market}] 매매 루프 진행 없음: {time.time() - progress_ts:.0f}초 (프로세스는 응답 중)")
+            return True
+        return False
+
+    # 방금 (재)시작한 워커는 첫 하트비트를 보낼 때까지 기다린다
+    worker = active_processes.get(market)
+    if worker and worker.uptime() < STARTUP_GRACE:
+        return False
+
+    if hb is None:
+        hb = read_status_board(market)
     if not hb:
-        return True  # 파일 없으면 stale
+        return True  # 슬롯 없으면 stale
+    if worker and hb.get('pid') not in (None, worker.pid):
+        print(f"⚠️ [{market}] 상태판이 이전 프로세스 기록입니다 (PID {hb.get('pid')})")
+        return True
+    if hb.get('status') == 'stopped':
+        print(f"⚠️ [{market}] 워커가 종료를 알림")
+        return True
     
     try:
         ts_str = hb.get('timestamp', '')
@@ -105,10 +324,46 @@ def is_heartbeat_stale(market):
         print(f"⚠️ [{market}] 타임스탐프 파싱 실패: {e}")
         return True
 
-def restart_worker(market, config):
-    """워커 프로세스 재시작"""
+def schedule_restart(market, reason):
+    """
+    재시작 정책에 따라 재시작을 예약한다. 멈춘 워커는 같은 그리드를 두 프로세스가 거래하지 않도록 바로 종료한다.
+    알림은 연속 실패의 첫 번째와 보류 시작 때만 보낸다.
+    """
+    now = time.time()
+    worker = active_processes.get(market)
+    if worker and worker.poll() is None:
+        worker.stop()
+    policy = get_restart_policy(market)
+    delay, parked_now = policy.record_failure(now, worker.uptime() if worker else 0)
+    restart_retry_at[market] = now + delay
+    pending_restarts[market] = reason
+
+    if parked_now:
+        print(f"🅿️ [{market}] 크래시 루프 감지 ({len(policy.failures)}회 / {CRASH_LOOP_WINDOW // 60}분) "
+              f"→ {format_duration(delay)} 후 시험 재시작")
+        send_telegram_message(
+            f"🅿️ [{market}] 크래시 루프 감지 - 재시작 보류\n"
+            f"💥 최근 {CRASH_LOOP_WINDOW // 60}분간 {len(policy.failures)}회 실패 (마지막: {reason})\n"
+            f"⏳ {format_duration(delay)}마다 시험 재시작, {HEALTHY_PERIOD // 60}분 정상 가동 시 자동 해제\n"
+            f"📝 로그: logs/worker_{market}.log",
+            critical=True,
+        )
+    elif policy.parked:
+        print(f"🅿️ [{market}] 시험 재시작 실패 ({reason}) → {format_duration(delay)} 후 다시 시도")
+    else:
+        print(f"⏳ [{market}] {delay:.0f}초 후 재시작 (연속 실패 {policy.streak}회, {reason})")
+
+
+def restart_worker(market, config, reason='하트비트 타임아웃', notify=True):
+    """워커 프로세스 (재)시작. 기존 워커가 살아 있으면 먼저 종료해 같은 그리드를 두 프로세스가 거래하지 않게 한다."""
+    previous = active_processes.get(market)
+    pending_restarts.pop(market, None)
     try:
-        print(f"🔄 [{market}] 프로세스 재시작 중...")
+        if previous:
+            print(f"🔄 [{market}] 프로세스 재시작 중... ({reason})")
+            previous.stop()
+        else:
+            print(f"🚀 [{market}] 프로세스 시작 중...")
         
         # Windows에서 python 실행파일 경로
         python_exe = sys.executable
@@ -136,37 +391,62 @@ def restart_worker(market, config):
             '--sell-mode', sell_mode,
             '--resume-level', str(int(resume_level)),
         ]
+        if config.get('paper'):
+            cmd.append('--paper')  # GUI 모의투자 토글
         
         # 백그라운드에서 실행
         log_path = os.path.join(LOGS_DIR, f'worker_{market}.log')
         os.makedirs(LOGS_DIR, exist_ok=True)
+        try:
+            if os.path.getsize(log_path) > WORKER_LOG_MAX_BYTES:
+                rotate_file(log_path, backups=3)
+        except OSError:
+            pass
+
+        # 매매 기록은 워커가 logs/trade_KRW_*.jsonl 에 직접 남기므로 콘솔 출력은 끈다
+        env = dict(os.environ, BITHUMBSPLIT_LOG_CONSOLE='0')
 
         # 로그 파일에 표준출력/표준에러를 기록하여 크래시 원인 파악
-        log_file = open(log_path, 'a', encoding='utf-8')
-
-        if sys.platform == 'win32':
-            proc = subprocess.Popen(
-                cmd,
-                stdout=log_file,
-                stderr=log_file,
-                creationflags=subprocess.CREATE_NEW_CONSOLE
-            )
-        else:
-            proc = subprocess.Popen(cmd, stdout=log_file, stderr=log_file)
+        # (자식은 복제된 핸들을 쓰므로 Watchdog 쪽 핸들은 바로 닫는다)
+        with open(log_path, 'a', encoding='utf-8') as log_file:
+            if sys.platform == 'win32':
+                proc = subprocess.Popen(
+                    cmd,
+                    stdout=log_file,
+                    stderr=log_file,
+                    env=env,
+                    creationflags=subprocess.CREATE_NEW_CONSOLE
+                )
+            else:
+                proc = subprocess.Popen(cmd, stdout=log_file, stderr=log_file, env=env)
         
-        active_processes[market] = proc.pid
-        print(f"✅ [{market}] 프로세스 재시작 완료 (PID: {proc.pid})")
+        active_processes[market] = WorkerProcess(market, proc, log_path)
+        restart_retry_at.pop(market, None)
+        if heartbeat_listener:
+            heartbeat_listener.forget(f'KRW-{market}')  # 이전 프로세스의 하트비트는 버림
+        print(f"✅ [{market}] 프로세스 시작 완료 (PID: {proc.pid})")
         print(f"📝 로그: {log_path}")
-        send_telegram_message(f"🔄 [{market}] 워커 프로세스 재시작됨 (하트비트 타임아웃)")
+        if previous:
+            restart_counts[market] = restart_counts.get(market, 0) + 1
+        if previous and notify:
+            send_telegram_message(
+                f"🔄 [{market}] 워커 프로세스 재시작됨 ({reason})\n"
+                f"🔁 재시작 {restart_counts[market]}회 / 직전 가동 {format_duration(previous.uptime())}",
+                critical=True,
+            )
         return True
     except Exception as e:
         print(f"❌ [{market}] 프로세스 재시작 실패: {e}")
-        send_telegram_message(f"❌ [{market}] 워커 재시작 실패: {e}")
+        if notify:
+            send_telegram_message(f"❌ [{market}] 워커 재시작 실패: {e}", critical=True)
+        schedule_restart(market, f"시작 실패: {e}")
         return False
 
 def check_and_restart(markets_config):
     """하트비트 확인 및 필요 시 재시작"""
+    global heartbeat_listener
     os.makedirs(LOGS_DIR, exist_ok=True)
+    _install_sigchld_wakeup()
     
     # 모니터링할 마켓 결정 (enabled=True만)
     if markets_config:
@@ -179,7 +459,14 @@ def check_and_restart(markets_config):
         return
     
     print(f"\n📍 모니터링 마켓: {', '.join(markets)}")
-    print(f"⏱️ 타임아웃: {HEARTBEAT_TIMEOUT}초")
+    try:
+        heartbeat_listener = HeartbeatListener()
+        print(f"📡 하트비트 소켓 수신: {heartbeat_listener.sock.getsockname()} (멈춤 판단 {STALL_TIMEOUT}초 / 루프 진행 없음 {PROGRESS_TIMEOUT}초)")
+    except OSError as e:
+        heartbeat_listener = None
+        print(f"⚠️ 하트비트 소켓을 열 수 없어 파일로 감시합니다: {e}")
+    start_metrics_server(markets)
+    print(f"⏱️ 타임아웃: {HEARTBEAT_TIMEOUT}초 (상태판)")
     print(f"📊 체크 주기: {CHECK_INTERVAL}초")
     print(f"📈 정기 리포트: {SUMMARY_INTERVAL//3600}시간마다\n")
     
@@ -191,17 +478,52 @@ def check_and_restart(markets_config):
             print(f"⚠️ [{market}] 설정이 없거나 비활성화되었습니다.")
     
     last_summary_time = time.time()
+    last_check_time = 0.0
     
     while True:
         try:
+            # 소켓 하트비트 / 자식 종료 신호 대기 (최대 POLL_INTERVAL)
+            wait_for_events(POLL_INTERVAL)
             current_time = time.time()
             
+            # 종료된 워커 회수 → 재시작 예약, 예약 시각이 된 마켓 재시작
+            for market in markets:
+                if market in pending_restarts:
+                    if current_time >= restart_retry_at.get(market, 0):
+                        policy = get_restart_policy(market)
+                        restart_worker(market, markets_config[market], reason=pending_restarts[market],
+                                       notify=policy.streak <= 1 and not policy.parked)
+                    continue
+                worker = active_processes.get(market)
+                if not worker:
+                    continue
+                if worker.poll() is None:
+                    # 충분히 오래 정상 가동하면 실패 기록 초기화 / 보류 해제
+                    policy = restart_policies.get(market)
+                    if policy and policy.streak and worker.uptime() >= HEALTHY_PERIOD and policy.record_healthy():
+                        print(f"✅ [{market}] {HEALTHY_PERIOD // 60}분 정상 가동 → 재시작 보류 해제")
+                        send_telegram_message(f"✅ [{market}] 워커 정상 가동 확인 - 재시작 보류 해제", critical=True)
+                    continue
+                print(f"\n💥 [{market}] 워커 프로세스 종료 감지 (PID: {worker.pid}, exit code: {worker.exit_code}, "
+                      f"가동 {format_duration(worker.uptime())})")
+                schedule_restart(market, f"프로세스 종료, exit code {worker.exit_code}")
+            
             # 1시간마다 정기 리포트 전송
             if current_time - last_summary_time >= SUMMARY_INTERVAL:
                 send_summary_report(markets, markets_config)
                 last_summary_time = current_time
             
+            # 소켓 하트비트가 오는 마켓은 매 초, 나머지(파일)는 CHECK_INTERVAL마다 확인
+            full_check = current_time - last_check_time >= CHECK_INTERVAL
+            if full_check:
+                last_check_time = current_time
+            
             for market in markets:
+                on_socket = current_socket_heartbeat(market) is not None
+                if not (on_socket or full_check):
+                    continue
+                if market in pending_restarts:
+                    continue
                 if is_heartbeat_stale(market):
                     hb = read_heartbeat(market)
                     if hb:
@@ -209,19 +531,110 @@ def check_and_restart(markets_config):
                         pending = hb.get('pending_orders', 0)
                         print(f"\n⚠️ [{market}] 응답 없음 (누적수익: {profit:,.0f}원, 미체결: {pending}개)")
                     
-                    # 재시작
+                    # 재시작 예약
                     if market in markets_config and markets_config[market].get('enabled', True):
-                        restart_worker(market, markets_config[market])
-                else:
+                        schedule_restart(market, '하트비트 타임아웃')
+                elif full_check:
                     hb = read_heartbeat(market)
-                    if hb:
+                    worker = active_processes.get(market)
+                    if hb and worker:
+                        print(f"✅ [{market}] 정상 작동 (수익: {hb.get('realized_profit', 0):,.0f}원, PID {worker.pid}, "
+                              f"가동 {format_duration(worker.uptime())}, 재시작 {restart_counts.get(market, 0)}회)")
+                    elif hb:
                         print(f"✅ [{market}] 정상 작동 (수익: {hb.get('realized_profit', 0):,.0f}원)")
         
         except Exception as e:
             print(f"⚠️ Watchdog 오류: {e}")
-        
-        # 지정된 주기로 체크
-        time.sleep(CHECK_INTERVAL)
+            time.sleep(POLL_INTERVAL)
+
+# 워커가 하트비트로 보내는 지표 → (Prometheus 이름, 라벨 키, 설명)
+WORKER_METRICS = {
+    'api_latency_seconds': ('bithumbsplit_api_latency_seconds', 'endpoint', 'API 요청 응답 시간'),
+    'api_retries_total': ('bithumbsplit_api_retries_total', 'endpoint', 'API 재시도 횟수'),
+    'api_errors_total': ('bithumbsplit_api_errors_total', 'endpoint', '재시도 후에도 실패한 API 요청 수'),
+    'api_circuit_open_total': ('bithumbsplit_api_circuit_open_total', 'endpoint', '연속 실패로 API 회로가 열린 횟수'),
+    'api_circuit_rejected_total': ('bithumbsplit_api_circuit_rejected_total', 'endpoint', '회로가 열려 보내지 않은 요청 수'),
+    'api_hedged_total': ('bithumbsplit_api_hedged_total', 'endpoint', 'p95 안에 응답이 없어 한 번 더 보낸 조회 요청 수'),
+    'api_retry_budget_exhausted_total': ('bithumbsplit_api_retry_budget_exhausted_total', 'endpoint',
+                                         '재시도 예산이 소진되어 재시도하지 않은 실패 수'),
+    'order_cache_total': ('bithumbsplit_order_cache_total', 'result', '주문 조회 캐시 결과 (memory/disk/miss)'),
+    'loop_duration_seconds': ('bithumbsplit_loop_duration_seconds', None, '매매 루프 1회 처리 시간 (대기 제외)'),
+    'fill_detection_seconds': ('bithumbsplit_fill_detection_seconds', 'side', '거래소 체결 시각부터 체결 감지까지 걸린 시간'),
+}
+
+def render_metrics(markets):
+    """마켓별 하트비트/프로세스 상태를 Prometheus 텍스트 형식으로"""
+    out = PrometheusWriter()
+    for market in markets:
+        labels = {"market": market}
+        worker = active_processes.get(market)
+        out.sample('bithumbsplit_worker_up', 'gauge', '워커 프로세스 실행 여부', labels,
+                   1 if worker and worker.poll() is None else 0)
+        out.sample('bithumbsplit_worker_restarts_total', 'counter', '워커 재시작 횟수', labels,
+                   restart_counts.get(market, 0))
+        if worker:
+            out.sample('bithumbsplit_worker_uptime_seconds', 'gauge', '현재 워커 가동 시간', labels, worker.uptime())
+        policy = restart_policies.get(market)
+        out.sample('bithumbsplit_worker_parked', 'gauge', '크래시 루프로 재시작 보류 중 여부', labels,
+                   1 if policy and policy.parked else 0)
+
+        entry = current_socket_heartbeat(market)
+        hb = entry[1] if entry else read_status_board(market)
+        if not hb:
+            continue
+        if entry:
+            out.sample('bithumbsplit_heartbeat_age_seconds', 'gauge', '마지막 하트비트 이후 경과 시간', labels, entry[0])
+        out.sample('bithumbsplit_realized_profit_krw', 'gauge', '누적 실현 수익 (원)', labels, hb.get('realized_profit', 0))
+        out.sample('bithumbsplit_level', 'gauge', '현재 매수 체결 차수', labels, hb.get('last_buy_level', 0))
+        out.sample('bithumbsplit_open_orders', 'gauge', '미체결 주문 수', labels,
+                   len(hb['open_orders']) if 'open_orders' in hb else hb.get('pending_orders', 0))
+
+        worker_metrics = hb.get('metrics') or {}
+        for name, series in worker_metrics.get('h', {}).items():
+            prom_name, label_key, help_text = WORKER_METRICS.get(name, (f'bithumbsplit_{name}', 'label', name))
+            for label, snap in series.items():
+                out.histogram(prom_name, help_text, {**labels, label_key: label} if label_key else labels, snap)
+        for name, series in worker_metrics.get('c', {}).items():
+            prom_name, label_key, help_text = WORKER_METRICS.get(name, (f'bithumbsplit_{name}', 'label', name))
+            for label, value in series.items():
+                out.sample(prom_name, 'counter', help_text, {**labels, label_key: label} if label_key else labels, value)
+    return out.text()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    markets = []
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_metrics(self.markets).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 수집 요청마다 콘솔에 찍지 않음
+
+def start_metrics_server(markets, port=METRICS_PORT):
+    """로컬 Prometheus 지표 엔드포인트 (http://127.0.0.1:{port}/metrics) 를 백그라운드 스레드로 시작"""
+    if not port:
+        return None
+    _MetricsHandler.markets = list(markets)
+    try:
+        server = ThreadingHTTPServer(('127.0.0.1', port), _MetricsHandler)
+    except OSError as e:
+        print(f"⚠️ 지표 엔드포인트를 열 수 없습니다 (포트 {port}): {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    print(f"📈 지표 엔드포인트: http://127.0.0.1:{port}/metrics")
+    return server
+
+def stop_all_workers():
+    """Watchdog 종료 시 띄운 워커를 모두 정리 (다음 Watchdog이 중복 워커를 띄우지 않도록)"""
+    for worker in active_processes.values():
+        worker.stop()
 
 def log_status(markets):
     """현재 상태 로깅"""
@@ -239,23 +652,70 @@ def log_status(markets):
             print(f"   현재 차수: {hb.get('last_buy_level', 0)}차")
             print(f"   미체결 주문: {hb.get('pending_orders', 0)}개")
         else:
-            print(f"\n📊 {market}: 하트비트 파일 없음")
+            print(f"\n📊 {market}: 상태판 기록 없음")
+
+def fetch_order_lists(markets):
+    """주문 스냅샷을 쓸 수 없는 마켓의 주문 목록을 동시에 조회. {market: 주문 목록 또는 예외}"""
+    if not markets:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(8, len(markets))) as pool:
+        futures = {m: pool.submit(get_order_list, market=f'KRW-{m}', limit=100) for m in markets}
+    results = {}
+    for market, future in futures.items():
+        try:
+            results[market] = future.result()
+        except Exception as e:
+            results[market] = e
+    return results
+
+def _format_order_lines(orders):
+    """주문 목록(워커 스냅샷 [side, 가격, 수량, 차수] 또는 API 응답)을 리포트 문자열로"""
+    lines = f"   📋 주문 목록:\n"
+    for order in orders[:5]:  # 최근 5개만 표시
+        if isinstance(order, dict):
+            side = order.get('side')
+            price = float(order.get('price', 0))
+            volume = float(order.get('volume', 0))
+            created = order.get('created_at', '')
+            if 'T' in str(created):
+                created = created.split('T')[1].split('.')[0]
+        else:
+            side, price, volume, level = order
+            created = f"{level}차"
+        label = "🛒 매수" if side == 'bid' else "📤 매도"
+        lines += f"      {label} {price:,.0f}원 x {volume:.8f} ({created})\n"
+    if len(orders) > 5:
+        lines += f"      ... 외 {len(orders) - 5}개\n"
+    return lines
 
 def send_summary_report(markets, markets_config):
-    """1시간마다 진행 현황 요약 메시지 전송 (주문 리스트 포함)"""
+    """
+    1시간마다 진행 현황 요약 메시지 전송 (주문 리스트 포함)
+    주문 목록은 워커가 하트비트로 보내는 미체결 주문 스냅샷을 쓰고,
+    스냅샷이 없거나 오래된 마켓만 API로 한꺼번에 조회한다.
+    """
     try:
         uptime = datetime.now() - WATCHDOG_START_TIME
-        hours = int(uptime.total_seconds() // 3600)
-        minutes = int((uptime.total_seconds() % 3600) // 60)
-        
-        summary = f"📊 [Watchdog 정기 리포트]\n⏱️ 운영 시간: {hours}시간 {minutes}분\n\n"
+        summary = f"📊 [Watchdog 정기 리포트]\n⏱️ 운영 시간: {format_duration(uptime.total_seconds())}\n\n"
         
         total_profit = 0
         active_markets = 0
         issues = []
         
+        # 마켓별 하트비트는 한 번만 읽는다
+        heartbeats = {}
+        stale = {}
         for market in markets:
             hb = read_heartbeat(market)
+            heartbeats[market] = hb
+            if hb:
+                stale[market] = is_heartbeat_stale(market, hb)
+        need_fetch = [m for m, hb in heartbeats.items()
+                      if hb and (stale[m] or 'open_orders' not in hb)]
+        fetched = fetch_order_lists(need_fetch)
+        
+        for market in markets:
+            hb = heartbeats[market]
             if hb:
                 active_markets += 1
                 profit = hb.get('realized_profit', 0)
@@ -267,34 +727,27 @@ def send_summary_report(markets, markets_config):
                 summary += f"   현재 차수: {level}차\n"
                 summary += f"   누적 수익: {profit:,.0f}원\n"
                 summary += f"   미체결 주문: {pending}개\n"
+                worker = active_processes.get(market)
+                if worker:
+                    summary += f"   가동: {format_duration(worker.uptime())} / 재시작 {restart_counts.get(market, 0)}회\n"
                 
-                # 실제 주문 리스트 조회 및 추가
-                try:
-                    order_list = get_order_list(market=f'KRW-{market}', limit=100)
-                    if isinstance(order_list, list) and order_list:
-                        summary += f"   📋 주문 목록:\n"
-                        for order in order_list[:5]:  # 최근 5개만 표시
-                            side = "🛒 매수" if order.get('side') == 'bid' else "📤 매도"
-                            price = float(order.get('price', 0))
-                            volume = float(order.get('volume', 0))
-                            created = order.get('created_at', '')
-                            if 'T' in str(created):
-                                created = created.split('T')[1].split('.')[0]
-                            summary += f"      {side} {price:,.0f}원 x {volume:.8f} ({created})\n"
-                        if len(order_list) > 5:
-                            summary += f"      ... 외 {len(order_list) - 5}개\n"
-                    else:
-                        summary += f"   📋 주문 목록: 없음\n"
-                except Exception as e:
-                    summary += f"   ⚠️ 주문 조회 실패: {e}\n"
+                order_list = fetched.get(market, hb.get('open_orders'))
+                if isinstance(order_list, Exception):
+                    summary += f"   ⚠️ 주문 조회 실패: {order_list}\n"
+                elif isinstance(order_list, list) and order_list:
+                    summary += _format_order_lines(order_list)
+                else:
+                    summary += f"   📋 주문 목록: 없음\n"
                 
                 summary += "\n"
                 
-                # stale 여부 확인
-                if is_heartbeat_stale(market):
+                if stale[market]:
                     issues.append(f"⚠️ {market} - 응답 없음")
             else:
                 issues.append(f"❌ {market} - 하트비트 없음")
+            policy = restart_policies.get(market)
+            if policy and policy.parked:
+                issues.append(f"🅿️ {market} - 크래시 루프로 재시작 보류 중")
         
         summary += f"💰 총 누적 수익: {total_profit:,.0f}원\n"
         summary += f"📍 활성 마켓: {active_markets}/{len(markets)}개\n"
@@ -335,8 +788,11 @@ if __name__ == "__main__":
             print("   4. start_watchdog.bat 다시 실행\n")
             sys.exit(1)
         
+        enable_outbox('watchdog')
         try:
             check_and_restart(markets_config)
         except KeyboardInterrupt:
-            print("\n\n🛑 Watchdog 종료됨")
+            print("\n\n🛑 Watchdog 종료 중... 워커 정리")
+            stop_all_workers()
+            print("🛑 Watchdog 종료됨")
             sys.exit(0)
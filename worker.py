@@ -15,8 +15,9 @@ else:
 if str(base_path) not in sys.path:
     sys.path.insert(0, str(base_path))
 
-from strategy.auto_trade import run_auto_trade
-from utils.telegram import send_telegram_message
+from utils import startup
+
+# 매매 모듈(requests/jwt 포함)은 인자 확인 뒤 main()에서 import 한다 (--help, 잘못된 인자는 즉시 응답)
 
 def load_config(market_code):
     """설정 파일에서 마켓별 매매 설정 로드"""
@@ -47,12 +48,26 @@ def main():
     parser.add_argument('--max-levels', type=int, help='최대차수')
     parser.add_argument('--buy-gap', type=float, help='매수 간격')
     parser.add_argument('--sell-gap', type=float, help='매도 간격')
-    parser.add_argument('--buy-mode', choices=['percent', 'price'], help='매수 간격 모드 (% or price)')
-    parser.add_argument('--sell-mode', choices=['percent', 'price'], help='매도 간격 모드 (% or price)')
+    parser.add_argument('--buy-mode', choices=['percent', 'price'], help='매수 간격 모드 (%% or price)')
+    parser.add_argument('--sell-mode', choices=['percent', 'price'], help='매도 간격 모드 (%% or price)')
     parser.add_argument('--resume-level', type=int, default=0, help='재시작 차수 (0=새시작)')
+    parser.add_argument('--paper', action='store_true', help='모의투자 모드 (가상 거래소, 실계좌 주문 없음)')
+    parser.add_argument('--paper-data', help='모의투자 재생용 가격 CSV 또는 기록 저장소 (예: store:trade:20261019, 없으면 실시간 시세)')
+    parser.add_argument('--paper-speed', type=float, default=0, help='재생 배속 (0=최대 속도, --paper-data 사용 시)')
+    parser.add_argument('--paper-krw', type=float, default=10000000, help='모의투자 원화 잔고 (기본값: 1천만원)')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='기동 시간 보고 (모듈별 import 시간 + 매매 루프 진입까지 단계별 경과)')
     
     args = parser.parse_args()
     market = args.market.upper()
+    # .env의 설정(텔레그램 묶음/API 타임아웃/로그 등)은 매매 모듈이 import 시점에 읽으므로 먼저 로드
+    startup.load_env()
+    if args.startup_report or startup.report_requested():
+        startup.enable()
+
+    from strategy.auto_trade import run_auto_trade
+    from utils.telegram import send_telegram_message, enable_outbox
+    startup.mark('매매 모듈 import')
     
     # 설정 로드
     config = load_config(market)
@@ -73,6 +88,24 @@ def main():
     if args.sell_mode:
         config['sell_mode'] = args.sell_mode
     
+    notify = send_telegram_message
+    stop_condition = None
+    paper_exchange = None
+    if args.paper:
+        from api.paper import start_paper_session, paper_notify
+        paper_exchange, stop_condition = start_paper_session(
+            f"KRW-{market}",
+            data_path=args.paper_data,
+            speed=args.paper_speed,
+            krw_balance=args.paper_krw,
+        )
+        notify = paper_notify
+        feed_name = args.paper_data or '실시간 시세'
+        print(f"🧪 모의투자 모드: {feed_name} / 모의 원화 {args.paper_krw:,.0f}원 (실계좌 주문 없음)")
+    else:
+        # 이전 실행에서 못 보낸 알림(체결 직후 종료 등) 재전송
+        enable_outbox(f"KRW_{market}")
+
     print(f"""
 ╔════════════════════════════════════════════╗
 ║   bithumbSplit 자동매매 워커 시작         ║
@@ -85,11 +118,12 @@ def main():
     """)
     
     try:
-        send_telegram_message(
+        notify(
             f"🚀 [워커 시작]\n"
             f"📍 코인: {market}\n"
             f"💰 시작가: {config['start_price']:,.0f}원\n"
-            f"📊 최대차수: {config['max_levels']}차"
+            f"📊 최대차수: {config['max_levels']}차",
+            market=f"KRW-{market}",  # run_auto_trade 알림과 같은 묶음 키
         )
         
         run_auto_trade(
@@ -103,14 +137,23 @@ def main():
             sell_mode=config['sell_mode'],
             sleep_sec=5,
             resume_level=args.resume_level,
+            stop_condition=stop_condition,
         )
     except KeyboardInterrupt:
         print("\n\n🛑 워커 종료됨")
-        send_telegram_message(f"🛑 [{market}] 워커 종료")
+        notify(f"🛑 [{market}] 워커 종료", critical=True)
     except Exception as e:
         print(f"\n❌ 오류 발생: {e}")
-        send_telegram_message(f"❌ [{market}] 워커 오류: {e}")
+        notify(f"❌ [{market}] 워커 오류: {e}", critical=True)
         sys.exit(1)
+    finally:
+        if paper_exchange:
+            paper_exchange.save()
+            result = paper_exchange.summary()
+            print(
+                f"\n🧪 모의투자 결과: 체결 {result['fills']}회 / 미체결 {result['open_orders']}개 / "
+                f"원화 {result['krw']:,.0f}원 / {market} {result['coin']:.8f} / 평가액 {result['equity']:,.0f}원"
+            )
 
 if __name__ == '__main__':
     main()